@@ -1,47 +1,197 @@
+import asyncio
 import os
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from collections.abc import AsyncIterator
+
+from sqlalchemy import Connection, event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+ASYNC_DRIVERS = {
+    "sqlite://": "sqlite+aiosqlite://",
+    "postgresql://": "postgresql+asyncpg://",
+    "postgres://": "postgresql+asyncpg://",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap a plain DATABASE_URL scheme for its asyncio driver."""
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+# "default" keeps driver defaults; "performance" enables WAL and the SQLite
+# pragmas below, which suit concurrent submit + read traffic.
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
+
+SQLITE_PERFORMANCE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    # Negative values are KiB, so this is a 64MB page cache per connection.
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-64000"),
+    "temp_store": "MEMORY",
+}
+
+engine_kwargs: dict = {}
+if not DATABASE_URL.startswith("sqlite"):
+    engine_kwargs = {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+engine = create_async_engine(to_async_url(DATABASE_URL), **engine_kwargs)
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PERFORMANCE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+if DATABASE_URL.startswith("sqlite") and DB_PROFILE == "performance":
+    event.listen(engine.sync_engine, "connect", apply_sqlite_pragmas)
 
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# expire_on_commit=False keeps loaded attributes usable after commit, since
+# an implicit refresh cannot run outside of an awaited call.
+SessionLocal = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
+)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def ensure_forms_user_id_column() -> None:
-    if not DATABASE_URL.startswith("sqlite"):
+async def init_db(attempts: int = 3) -> None:
+    # Every worker runs this at startup. When several start together, the
+    # losers of a CREATE/ALTER race retry and find the schema in place.
+    for attempt in range(attempts):
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            async with engine.connect() as connection:
+                await connection.run_sync(ensure_forms_user_id_column)
+                await connection.run_sync(ensure_search_index)
+            return
+        except DBAPIError:
+            if attempt == attempts - 1:
+                raise
+            await asyncio.sleep(0.2 * (attempt + 1))
+
+
+def table_columns(connection: Connection, table: str) -> set[str]:
+    if connection.dialect.name == "postgresql":
+        result = connection.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table"
+            ),
+            {"table": table},
+        )
+        return {row[0] for row in result.fetchall()}
+    result = connection.execute(text(f"PRAGMA table_info({table})"))
+    return {row[1] for row in result.fetchall()}
+
+
+def ensure_forms_user_id_column(connection: Connection) -> None:
+    # create_all only adds missing tables, so columns added since are
+    # patched in here; the statements are valid on SQLite and PostgreSQL.
+    if connection.dialect.name not in ("sqlite", "postgresql"):
         return
 
-    with engine.connect() as connection:
-        result = connection.execute(text("PRAGMA table_info(forms)"))
-        columns = {row[1] for row in result.fetchall()}
-        if "user_id" not in columns:
-            connection.execute(text("ALTER TABLE forms ADD COLUMN user_id INTEGER"))
-            connection.commit()
-        if "logo_url" not in columns:
-            connection.execute(text("ALTER TABLE forms ADD COLUMN logo_url VARCHAR(512) DEFAULT ''"))
-            connection.commit()
-        if "cover_url" not in columns:
-            connection.execute(text("ALTER TABLE forms ADD COLUMN cover_url VARCHAR(512) DEFAULT ''"))
-            connection.commit()
-        if "cover_height" not in columns:
-            connection.execute(text("ALTER TABLE forms ADD COLUMN cover_height INTEGER DEFAULT 200"))
-            connection.commit()
+    columns = table_columns(connection, "forms")
+    if "user_id" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN user_id INTEGER"))
+        connection.commit()
+    if "logo_url" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN logo_url VARCHAR(512) DEFAULT ''"))
+        connection.commit()
+    if "cover_url" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN cover_url VARCHAR(512) DEFAULT ''"))
+        connection.commit()
+    if "cover_height" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN cover_height INTEGER DEFAULT 200"))
+        connection.commit()
+    if "response_count" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN response_count INTEGER NOT NULL DEFAULT 0"))
+        connection.execute(
+            text(
+                "UPDATE forms SET response_count = "
+                "(SELECT COUNT(*) FROM submissions WHERE submissions.form_id = forms.id)"
+            )
+        )
+        connection.commit()
+    if "submission_rate_limit" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN submission_rate_limit INTEGER"))
+        connection.commit()
+    if "version" not in columns:
+        connection.execute(text("ALTER TABLE forms ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+        connection.commit()
+    user_columns = table_columns(connection, "users")
+    if "token_version" not in user_columns:
+        connection.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
+        connection.commit()
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_submissions_form_created_id "
+            "ON submissions (form_id, created_at, id)"
+        )
+    )
+    connection.commit()
+
+
+# Full-text index over form titles/blocks and text answers. Rows are keyed
+# by doc id: a submission's id, or the negated id for a form document.
+# ``owner`` holds a "u<user_id>" token so searches are scoped inside MATCH.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5("
+    "kind UNINDEXED, form_id UNINDEXED, user_id UNINDEXED, owner, title, body, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+)
+
+POSTGRES_SEARCH_DDL = (
+    "CREATE TABLE IF NOT EXISTS search_documents ("
+    "doc_id BIGINT PRIMARY KEY, kind VARCHAR(16) NOT NULL, "
+    "form_id INTEGER NOT NULL, user_id INTEGER, "
+    "title TEXT NOT NULL DEFAULT '', body TEXT NOT NULL DEFAULT '', "
+    "document TSVECTOR GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', title), 'A') || "
+    "setweight(to_tsvector('simple', body), 'B')) STORED)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_document "
+    "ON search_documents USING GIN (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_user_id "
+    "ON search_documents (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_search_documents_form_id "
+    "ON search_documents (form_id)",
+)
+
+
+def ensure_search_index(connection: Connection) -> None:
+    if connection.dialect.name == "postgresql":
+        statements = POSTGRES_SEARCH_DDL
+    else:
+        statements = SQLITE_SEARCH_DDL
+        columns = table_columns(connection, "search_documents")
+        if columns and "owner" not in columns:
+            # FTS5 tables cannot be altered; the startup backfill refills it.
+            connection.execute(text("DROP TABLE search_documents"))
+    for statement in statements:
+        connection.execute(text(statement))
+    connection.commit()
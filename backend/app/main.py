@@ -1,15 +1,29 @@
+import secrets
+
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
-from .db import Base, SessionLocal, engine, ensure_forms_user_id_column
+from . import metrics, query_debug
+from .db import SessionLocal, engine, init_db
 from .routers import auth as auth_router
 from .routers import debug as debug_router
 from .routers import forms as forms_router
 from .routers import public as public_router
-from .services import auth_service
+from .routers import search as search_router
+from .services import (
+    auth_service,
+    invalidation,
+    rate_limit,
+    recaptcha,
+    search_service,
+    submission_ingest,
+)
+from .services.password_hasher import hasher_pool
+from .services.upload_service import UPLOADS_DIR
 
 # Load environment variables from .env file
 load_dotenv()
@@ -24,30 +38,126 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.instrument_engine(engine.sync_engine)
+
+if query_debug.QUERY_DEBUG:
+    app.add_middleware(query_debug.QueryDebugMiddleware)
+    query_debug.instrument_engine(engine.sync_engine)
+
+
+def collect_service_metrics() -> list[str]:
+    hasher = hasher_pool.stats()
+    return [
+        *metrics.gauge_lines(
+            "password_hasher",
+            "Password hashing pool state.",
+            {
+                stat: hasher[stat]
+                for stat in ("workers", "max_pending", "in_flight", "queued")
+            },
+            "stat",
+        ),
+        *metrics.counter_lines(
+            "password_hasher_completed_total",
+            "Password hashes and verifications that finished successfully.",
+            hasher["completed"],
+        ),
+        *metrics.counter_lines(
+            "password_hasher_rejected_total",
+            "Authentication requests refused because the hashing pool was full.",
+            hasher["rejected"],
+        ),
+        *metrics.gauge_lines(
+            "submission_ingest_queue_depth",
+            "Submissions waiting for the batched writer.",
+            {"queue": submission_ingest.ingestor.queue_depth()},
+            "ingest",
+        ),
+        *metrics.counter_lines(
+            "submission_ingest_dead_lettered_total",
+            "Queued submissions that failed to insert and were written to the dead-letter file.",
+            submission_ingest.ingestor.dead_lettered,
+        ),
+        *metrics.gauge_lines(
+            "recaptcha_breaker_state",
+            "Current reCAPTCHA circuit breaker state (1 for the active state).",
+            {
+                state: int(state == recaptcha.breaker.state)
+                for state in ("closed", "open", "half-open")
+            },
+            "state",
+        ),
+        *metrics.counter_lines(
+            "recaptcha_short_circuited_total",
+            "reCAPTCHA verifications refused while the circuit breaker was open.",
+            recaptcha.breaker.short_circuited,
+        ),
+        *metrics.counter_lines(
+            "submission_rate_limited_total",
+            "Public submissions rejected by the rate limiter.",
+            rate_limit.rejected,
+        ),
+    ]
+
+
+metrics.registry.add_collector(collect_service_metrics)
+
+
+async def require_metrics_token(authorization: str | None = Header(default=None)) -> None:
+    # Metrics describe routes, queues and database timings, so they are
+    # never served without a token.
+    if not metrics.METRICS_TOKEN:
+        raise HTTPException(status_code=403, detail="Set METRICS_TOKEN to expose metrics")
+    if not secrets.compare_digest(authorization or "", f"Bearer {metrics.METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+
 # Serve static files (uploads)
-uploads_dir = "uploads"
-if not os.path.exists(uploads_dir):
-    os.makedirs(uploads_dir)
-app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+if not os.path.exists(UPLOADS_DIR):
+    os.makedirs(UPLOADS_DIR)
+app.mount("/uploads", StaticFiles(directory=UPLOADS_DIR), name="uploads")
 
 
 @app.on_event("startup")
-def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
-    ensure_forms_user_id_column()
-    db = SessionLocal()
-    try:
-        auth_service.ensure_demo_user(db)
-    finally:
-        db.close()
+async def on_startup() -> None:
+    await init_db()
+    async with SessionLocal() as db:
+        await auth_service.ensure_demo_user(db)
+        await search_service.ensure_index_populated(db)
+    await invalidation.get_bus().start()
+    if submission_ingest.is_batched():
+        submission_ingest.ingestor.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await submission_ingest.ingestor.stop()
+    await recaptcha.close()
+    await invalidation.get_bus().close()
 
 
 @app.get("/health")
-def health() -> dict:
+async def health() -> dict:
     return {"status": "ok"}
 
 
+if metrics.METRICS_ENABLED:
+
+    @app.get(
+        "/metrics",
+        response_class=PlainTextResponse,
+        dependencies=[Depends(require_metrics_token)],
+    )
+    async def prometheus_metrics() -> PlainTextResponse:
+        return PlainTextResponse(
+            metrics.registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
+
 app.include_router(forms_router.router)
 app.include_router(public_router.router)
 app.include_router(auth_router.router)
+app.include_router(search_router.router)
 app.include_router(debug_router.router)
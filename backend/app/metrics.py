@@ -0,0 +1,298 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Off by default: /metrics exposes routes and internal queue state.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+# When set, scrapers must send "Authorization: Bearer <token>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *values: str, amount: float = 1) -> None:
+        self.inc(*values, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (values, (list(counts), total[0]))
+                for values, (counts, total) in self._series.items()
+            )
+        lines = self.header()
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list[str]]) -> None:
+        """Register a callable rendering extra samples at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time from request start to the last response byte.",
+        ("method", "route"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being handled.", ("method",))
+)
+db_queries_per_request = registry.register(
+    Histogram(
+        "db_queries_per_request",
+        "Database statements executed while handling a request.",
+        ("route",),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+db_time_per_request_seconds = registry.register(
+    Histogram(
+        "db_time_per_request_seconds",
+        "Total database statement time while handling a request.",
+        ("route",),
+    )
+)
+db_query_duration_seconds = registry.register(
+    Histogram("db_query_duration_seconds", "Duration of individual database statements.")
+)
+submission_validation_seconds = registry.register(
+    Histogram("submission_validation_seconds", "Time spent validating submission answers.")
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_time: float = 0.0
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> RequestStats | None:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed = time.perf_counter() - started
+    db_query_duration_seconds.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += elapsed
+
+
+def instrument_engine(sync_engine) -> None:
+    """Time every statement on ``sync_engine`` (pass ``AsyncEngine.sync_engine``)."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_label(scope: Scope) -> str:
+    """Path template of the route that handled ``scope``, or "unmatched".
+
+    Call after the app has run; routing records the endpoint in the scope.
+    """
+    state = scope["app"].state
+    labels = getattr(state, "route_labels", None)
+    if labels is None:
+        # Mounted apps (static files) are reported as their endpoint.
+        labels = state.route_labels = {
+            route.app if isinstance(route, Mount) else route.endpoint: route.path
+            for route in scope["app"].routes
+            if isinstance(route, Mount) or hasattr(route, "endpoint")
+        }
+    return labels.get(scope.get("endpoint"), "unmatched")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and DB usage.
+
+    Routes are labelled by their path template (``/forms/{form_id}``), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        http_requests_in_flight.inc(method)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_stats.reset(token)
+            http_requests_in_flight.dec(method)
+            route = route_label(scope)
+            http_requests_total.inc(method, route, str(status))
+            http_request_duration_seconds.observe(elapsed, method, route)
+            db_queries_per_request.observe(stats.queries, route)
+            db_time_per_request_seconds.observe(stats.query_time, route)
+
+
+def counter_lines(name: str, help: str, value: float) -> list[str]:
+    """Render a counter for a monotonic value read at scrape time."""
+    return [
+        f"# HELP {name} {help}",
+        f"# TYPE {name} counter",
+        f"{name} {_format_value(value)}",
+    ]
+
+
+def gauge_lines(name: str, help: str, samples: dict[str, float], label: str) -> list[str]:
+    """Render a labelled gauge for values read at scrape time."""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+    for value_label, value in samples.items():
+        lines.append(f'{name}{{{label}="{_escape(value_label)}"}} {_format_value(value)}')
+    return lines
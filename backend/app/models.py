@@ -1,10 +1,23 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, JSON, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, JSON, String, Text, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .db import Base
 
+# SQLite's CURRENT_TIMESTAMP has second precision; storing Python-supplied
+# datetimes in the same format keeps keyset comparisons on created_at exact.
+KeysetDateTime = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format=(
+            "%(year)04d-%(month)02d-%(day)02d "
+            "%(hour)02d:%(minute)02d:%(second)02d"
+        )
+    ),
+    "sqlite",
+)
+
 
 class Form(Base):
     __tablename__ = "forms"
@@ -19,6 +32,12 @@ class Form(Base):
     cover_height: Mapped[int] = mapped_column(Integer, default=200)
     blocks: Mapped[list] = mapped_column(JSON, default=list)
     share_id: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    response_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    # Public submissions per minute; NULL uses SUBMISSION_RATE_LIMIT_PER_FORM.
+    submission_rate_limit: Mapped[int] = mapped_column(Integer, nullable=True)
+    # Bumped on every edit; block patches must name the version they were
+    # made against.
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -35,6 +54,8 @@ class User(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     username: Mapped[str] = mapped_column(String(120), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255))
+    # Embedded in access tokens; bumping it revokes every token issued so far.
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -42,10 +63,24 @@ class User(Base):
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("ix_submissions_form_created_id", "form_id", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     form_id: Mapped[int] = mapped_column(ForeignKey("forms.id"), index=True)
     data: Mapped[dict] = mapped_column(JSON, default=dict)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        KeysetDateTime, server_default=func.now()
     )
+
+
+class InsightRollup(Base):
+    """Materialized insights tally for one (form, block, bucket) triple."""
+
+    __tablename__ = "insight_rollups"
+
+    form_id: Mapped[int] = mapped_column(ForeignKey("forms.id"), primary_key=True)
+    block_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    bucket: Mapped[str] = mapped_column(Text, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
@@ -0,0 +1,175 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: meant for development, staging and test runs, not production.
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "0") == "1"
+QUERY_DEBUG_SLOW_MS = float(os.getenv("QUERY_DEBUG_SLOW_MS", "100"))
+QUERY_DEBUG_N_PLUS_ONE = int(os.getenv("QUERY_DEBUG_N_PLUS_ONE", "5"))
+# Default per-request query budget; 0 means no budget.
+QUERY_DEBUG_BUDGET = int(os.getenv("QUERY_DEBUG_BUDGET", "0"))
+# Raise instead of logging, so test runs fail on N+1 shapes or budget overruns.
+QUERY_DEBUG_STRICT = os.getenv("QUERY_DEBUG_STRICT", "0") == "1"
+
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|UPDATE|DELETE)\b", re.IGNORECASE)
+PARAMETER_LIST = re.compile(r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))*\s*\)")
+NUMBER_LITERAL = re.compile(r"\b\d+\b")
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryLog:
+    count: int = 0
+    elapsed: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    examples: dict[str, str] = field(default_factory=dict)
+
+
+_query_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+_route_budgets: dict[str, int] = {}
+
+
+def set_query_budget(route: str, max_queries: int | None) -> None:
+    """Cap the statements one request to ``route`` (a path template) may run.
+
+    ``None`` restores the ``QUERY_DEBUG_BUDGET`` default.
+    """
+    if max_queries is None:
+        _route_budgets.pop(route, None)
+    else:
+        _route_budgets[route] = max_queries
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse a statement to its shape: IN lists and literals folded."""
+    shape = PARAMETER_LIST.sub("(?)", statement)
+    shape = NUMBER_LITERAL.sub("N", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = "EXPLAIN " if conn.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_debug_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_debug_start"].pop()
+    log = _query_log.get()
+    if log is not None:
+        log.count += 1
+        log.elapsed += elapsed
+        if not executemany:
+            shape = statement_shape(statement)
+            log.shapes[shape] += 1
+            log.examples.setdefault(shape, statement)
+
+    if elapsed * 1000 < QUERY_DEBUG_SLOW_MS:
+        return
+    plan = "(not explained)"
+    if not executemany and EXPLAINABLE.match(statement):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as exc:  # the plan is best effort
+            plan = f"(EXPLAIN failed: {exc})"
+    logger.warning(
+        "Slow query (%.1f ms): %s\nParameters: %r\nPlan:\n%s",
+        elapsed * 1000,
+        statement,
+        parameters,
+        plan,
+    )
+
+
+def instrument_engine(sync_engine) -> None:
+    """Attach the debug listeners (pass ``AsyncEngine.sync_engine``)."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def report(method: str, route: str, log: QueryLog) -> list[str]:
+    """Problems found in one request's queries, as human-readable lines."""
+    problems = []
+    for shape, count in log.shapes.most_common():
+        if count < QUERY_DEBUG_N_PLUS_ONE:
+            break
+        problems.append(
+            f"Possible N+1 in {method} {route}: {count} executions of "
+            f"{log.examples[shape]!r}"
+        )
+    budget = _route_budgets.get(route, QUERY_DEBUG_BUDGET)
+    if budget and log.count > budget:
+        problems.append(
+            f"{method} {route} ran {log.count} queries, over its budget of {budget}"
+        )
+    return problems
+
+
+class QueryDebugMiddleware:
+    """Per-request query accounting for QUERY_DEBUG mode.
+
+    Adds ``X-Query-Count`` / ``X-Query-Time-Ms`` headers and, once the
+    response is sent, logs N+1 shapes and budget overruns, or raises
+    ``QueryBudgetExceeded`` when ``QUERY_DEBUG_STRICT`` is set.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _query_log.set(log)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(log.count).encode()))
+                headers.append(
+                    (b"x-query-time-ms", f"{log.elapsed * 1000:.2f}".encode())
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _query_log.reset(token)
+
+        method = scope["method"]
+        route = route_label(scope)
+        logger.debug(
+            "%s %s: %d queries in %.1f ms", method, route, log.count, log.elapsed * 1000
+        )
+        problems = report(method, route, log)
+        if problems and QUERY_DEBUG_STRICT:
+            raise QueryBudgetExceeded("\n".join(problems))
+        for problem in problems:
+            logger.warning(problem)
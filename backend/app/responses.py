@@ -0,0 +1,24 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Matches Pydantic's JSON output: UTC datetimes end in "Z", naive ones are
+# left as-is.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-encoded response for payloads built from trusted stored data.
+
+    Returning it from a route skips FastAPI's ``response_model``
+    validation, so only pass dicts whose shape already matches the
+    declared model (see ``form_service.form_payload``).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
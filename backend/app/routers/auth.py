@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..models import User
-from ..schemas import Token, UserCreate, UserOut, UserUpdate
+from ..schemas import Token, UserCreate, UserOut, UserUpdate, UserUpdated
 from ..services import auth_service
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -16,72 +15,48 @@ oauth2_scheme_optional = OAuth2PasswordBearer(
 )
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
     token: str = Depends(oauth2_scheme),
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token,
-            auth_service.SECRET_KEY,
-            algorithms=[auth_service.ALGORITHM],
-        )
-        username: str | None = payload.get("sub")
-        if not username:
-            raise credentials_exception
-    except JWTError as exc:
-        raise credentials_exception from exc
-
-    user = auth_service.get_user_by_username(db, username)
+    user = await auth_service.get_user_for_token(db, token)
     if not user:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
-def get_optional_user(
-    db: Session = Depends(get_db),
+async def get_optional_user(
+    db: AsyncSession = Depends(get_db),
     token: str | None = Depends(oauth2_scheme_optional),
 ) -> User | None:
     if not token:
         return None
-
-    try:
-        payload = jwt.decode(
-            token,
-            auth_service.SECRET_KEY,
-            algorithms=[auth_service.ALGORITHM],
-        )
-        username: str | None = payload.get("sub")
-        if not username:
-            return None
-    except JWTError:
-        return None
-
-    return auth_service.get_user_by_username(db, username)
+    return await auth_service.get_user_for_token(db, token)
 
 
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)) -> Token:
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)) -> Token:
     try:
-        user = auth_service.create_user(db, payload.username, payload.password)
+        user = await auth_service.create_user(db, payload.username, payload.password)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    access_token = auth_service.create_access_token({"sub": user.username})
+    access_token = auth_service.create_user_token(user)
     return Token(access_token=access_token)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Token:
-    user = auth_service.authenticate_user(db, form_data.username, form_data.password)
+    user = await auth_service.authenticate_user(
+        db, form_data.username, form_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -89,26 +64,31 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = auth_service.create_access_token({"sub": user.username})
+    access_token = auth_service.create_user_token(user)
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> UserOut:
+async def me(current_user: User = Depends(get_current_user)) -> UserOut:
     return UserOut.model_validate(current_user)
 
 
-@router.patch("/me", response_model=UserOut)
-def update_me(
+@router.patch("/me", response_model=UserUpdated)
+async def update_me(
     payload: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> UserOut:
+    db: AsyncSession = Depends(get_db),
+) -> UserUpdated:
     try:
-        user = auth_service.update_user(
+        user = await auth_service.update_user(
             db, current_user, payload.username, payload.password
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return UserOut.model_validate(user)
+    return UserUpdated(
+        id=user.id,
+        username=user.username,
+        created_at=user.created_at,
+        access_token=auth_service.create_user_token(user),
+    )
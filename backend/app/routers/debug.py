@@ -1,15 +1,17 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
 from ..models import Form, Submission, User
+from ..services.password_hasher import hasher_pool
 
 router = APIRouter(prefix="/debug", tags=["debug"])
 
 
 @router.get("/users")
-def list_users(db: Session = Depends(get_db)) -> dict:
-    users = db.query(User).all()
+async def list_users(db: AsyncSession = Depends(get_db)) -> dict:
+    users = list(await db.scalars(select(User)))
     return {
         "count": len(users),
         "users": [
@@ -24,8 +26,8 @@ def list_users(db: Session = Depends(get_db)) -> dict:
 
 
 @router.get("/forms")
-def list_all_forms(db: Session = Depends(get_db)) -> dict:
-    forms = db.query(Form).all()
+async def list_all_forms(db: AsyncSession = Depends(get_db)) -> dict:
+    forms = list(await db.scalars(select(Form)))
     return {
         "count": len(forms),
         "forms": [
@@ -42,8 +44,8 @@ def list_all_forms(db: Session = Depends(get_db)) -> dict:
 
 
 @router.get("/submissions")
-def list_all_submissions(db: Session = Depends(get_db)) -> dict:
-    submissions = db.query(Submission).all()
+async def list_all_submissions(db: AsyncSession = Depends(get_db)) -> dict:
+    submissions = list(await db.scalars(select(Submission)))
     return {
         "count": len(submissions),
         "submissions": [
@@ -56,3 +58,8 @@ def list_all_submissions(db: Session = Depends(get_db)) -> dict:
             for s in submissions
         ],
     }
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats() -> dict:
+    return hasher_pool.stats()
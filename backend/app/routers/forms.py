@@ -1,88 +1,271 @@
-from fastapi import APIRouter, Depends, Request, status, UploadFile, File
-from sqlalchemy.orm import Session
-import os
-import uuid
+import binascii
+from datetime import datetime
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from ..db import get_db
 from ..models import User
+from ..responses import FastJSONResponse
 from ..routers.auth import get_current_user, get_optional_user
-from ..schemas import FormCreate, FormOut, FormUpdate, SubmissionOut
-from ..services import form_service, submission_service
+from ..schemas import (
+    FormBlocksPatch,
+    FormBlocksPatched,
+    FormCreate,
+    FormInsights,
+    FormOut,
+    FormUpdate,
+    SubmissionImportResult,
+    SubmissionPage,
+)
+from ..services import (
+    blob_store,
+    form_service,
+    insights_service,
+    invalidation,
+    submission_export,
+    submission_filters,
+    submission_import,
+    submission_service,
+    upload_service,
+)
 
 router = APIRouter(prefix="/forms", tags=["forms"])
 
 
 @router.post("", response_model=FormOut, status_code=status.HTTP_201_CREATED)
-def create_form(
+async def create_form(
     payload: FormCreate,
     request: Request,
     current_user: User | None = Depends(get_optional_user),
-    db: Session = Depends(get_db),
-) -> FormOut:
+    db: AsyncSession = Depends(get_db),
+) -> Response:
     user_id = current_user.id if current_user else None
-    form = form_service.create_form(db, payload, user_id)
-    return form_service.form_to_out(form, request, db)
+    form = await form_service.create_form(db, payload, user_id)
+    return FastJSONResponse(
+        form_service.form_payload(form, request), status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.get("", response_model=list[FormOut])
-def list_forms(
+async def list_forms(
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> list[FormOut]:
-    forms = form_service.list_forms(db, current_user.id)
-    return [form_service.form_to_out(form, request, db) for form in forms]
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    forms = await form_service.list_forms(db, current_user.id)
+    return FastJSONResponse([form_service.form_payload(form, request) for form in forms])
 
 
 @router.get("/{form_id}", response_model=FormOut)
-def get_form(
+async def get_form(
     form_id: int,
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> FormOut:
-    form = form_service.get_form_by_id(db, form_id, current_user.id)
-    return form_service.form_to_out(form, request, db)
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    return FastJSONResponse(form_service.form_payload(form, request))
 
 
 @router.patch("/{form_id}", response_model=FormOut)
-def update_form(
+async def update_form(
     form_id: int,
     payload: FormUpdate,
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> FormOut:
-    form = form_service.update_form(db, form_id, payload, current_user.id)
-    return form_service.form_to_out(form, request, db)
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    form = await form_service.update_form(db, form_id, payload, current_user.id)
+    return FastJSONResponse(form_service.form_payload(form, request))
+
+
+@router.patch("/{form_id}/blocks", response_model=FormBlocksPatched)
+async def patch_form_blocks(
+    form_id: int,
+    patch: FormBlocksPatch,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> FormBlocksPatched:
+    form = await form_service.patch_form_blocks(db, form_id, patch, current_user.id)
+    return FormBlocksPatched(version=form.version, updated_at=form.updated_at)
 
 
 @router.delete("/{form_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_form(
+async def delete_form(
     form_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> None:
-    form_service.delete_form(db, form_id, current_user.id)
+    await form_service.delete_form(db, form_id, current_user.id)
     return None
 
 
 @router.get("/{form_id}/share")
-def get_form_share(
+async def get_form_share(
     form_id: int,
     request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
-    return form_service.get_form_share(db, form_id, request, current_user.id)
+    return await form_service.get_form_share(db, form_id, request, current_user.id)
 
 
-@router.get("/{form_id}/submissions", response_model=list[SubmissionOut])
-def list_submissions(
+@router.get("/{form_id}/insights", response_model=FormInsights)
+async def get_form_insights(
     form_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> list[SubmissionOut]:
-    return submission_service.list_submissions_for_form(db, form_id, current_user.id)
+    db: AsyncSession = Depends(get_db),
+) -> FormInsights:
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    return await insights_service.load_insights(db, form)
+
+
+@router.get("/{form_id}/submissions", response_model=SubmissionPage)
+async def list_submissions(
+    form_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    filters: list[str] = Query(
+        default=[],
+        alias="filter",
+        description="Answer filter as block_id:op:value; repeatable",
+    ),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    items, next_cursor = await submission_service.list_submissions_for_form(
+        db,
+        form_id,
+        current_user.id,
+        limit=limit,
+        cursor=cursor,
+        filters=[submission_filters.parse_filter(raw) for raw in filters],
+        since=since,
+        until=until,
+    )
+    return FastJSONResponse(
+        {
+            "items": [submission_service.submission_payload(item) for item in items],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get("/{form_id}/submissions/export")
+async def export_submissions(
+    form_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    blocks = list(form.blocks or [])
+    if format == "ndjson":
+        body = submission_export.stream_ndjson(form.id, blocks)
+        media_type = "application/x-ndjson"
+    else:
+        body = submission_export.stream_csv(form.id, blocks)
+        media_type = "text/csv"
+    filename = f"form-{form.id}-submissions.{format}"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/{form_id}/submissions/import", response_model=SubmissionImportResult)
+async def import_submissions(
+    form_id: int,
+    request: Request,
+    dry_run: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> SubmissionImportResult:
+    """Bulk import submissions from an NDJSON body, one
+    ``{"data": {...}, "created_at": "..."}`` object per line."""
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    return await submission_import.import_submissions(
+        db, form, submission_import.iter_lines(request.stream()), dry_run=dry_run
+    )
+
+
+@router.get("/{form_id}/submissions/{submission_id}/files/{block_id}")
+async def download_submission_file(
+    form_id: int,
+    submission_id: int,
+    block_id: str,
+    range: str | None = Header(default=None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    value = await submission_service.get_submission_file(
+        db, form_id, submission_id, block_id, current_user.id
+    )
+    filename = (value.get("name") or block_id).replace('"', "")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    media_type = value.get("type") or "application/octet-stream"
+
+    if not value.get("blob_id"):
+        # Submissions stored before the blob store keep their payload inline.
+        raw = value["data"]
+        try:
+            if not isinstance(raw, str):
+                raise ValueError("file data is not a string")
+            content = submission_service.decode_file_data(raw)
+        except (binascii.Error, ValueError) as exc:
+            raise HTTPException(status_code=404, detail="File not found") from exc
+        byte_range = blob_store.parse_byte_range(range, len(content))
+        if byte_range is None:
+            return Response(content, media_type=media_type, headers=headers)
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{len(content)}"
+        return Response(
+            content[start : end + 1],
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    store = blob_store.get_blob_store()
+    try:
+        size = await store.size(value["blob_id"])
+    except blob_store.BlobNotFound as exc:
+        raise HTTPException(status_code=404, detail="File not found") from exc
+
+    byte_range = blob_store.parse_byte_range(range, size)
+    status_code = status.HTTP_200_OK
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        store.iter_range(value["blob_id"], start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
 
 
 @router.post("/{form_id}/logo")
@@ -90,42 +273,14 @@ async def upload_form_logo(
     form_id: int,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Upload a logo for a form. Max file size: 1MB. Allowed types: PNG, JPG, GIF, SVG."""
-    # Validate file size (1MB max)
-    MAX_FILE_SIZE = 1 * 1024 * 1024  # 1MB
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise ValueError(f"File size exceeds maximum of 1MB")
-    
-    # Validate file type
-    allowed_types = {"image/png", "image/jpeg", "image/gif", "image/svg+xml"}
-    if file.content_type not in allowed_types:
-        raise ValueError(f"File type not allowed. Allowed types: PNG, JPG, GIF, SVG")
-    
-    # Create uploads directory if it doesn't exist
-    uploads_dir = "uploads"
-    os.makedirs(uploads_dir, exist_ok=True)
-    
-    # Generate unique filename
-    file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(uploads_dir, unique_filename)
-    
-    # Save file
-    contents = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Store the file path in the form
-    form = form_service.get_form_by_id(db, form_id, current_user.id)
-    form.logo_url = f"/uploads/{unique_filename}"
-    db.commit()
-    
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    form.logo_url = await upload_service.save_image_upload(file, 1 * 1024 * 1024)
+    await db.commit()
+    await invalidation.form_changed(form.id, form.share_id)
+
     return {"logo_url": form.logo_url}
 
 
@@ -134,41 +289,12 @@ async def upload_form_cover(
     form_id: int,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """Upload a cover for a form. Max file size: 10MB. Allowed types: PNG, JPG, GIF, SVG."""
-    # Validate file size (10MB max)
-    MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    if file_size > MAX_FILE_SIZE:
-        raise ValueError(f"File size exceeds maximum of 10MB")
-    
-    # Validate file type
-    allowed_types = {"image/png", "image/jpeg", "image/gif", "image/svg+xml"}
-    if file.content_type not in allowed_types:
-        raise ValueError(f"File type not allowed. Allowed types: PNG, JPG, GIF, SVG")
-    
-    # Create uploads directory if it doesn't exist
-    uploads_dir = "uploads"
-    os.makedirs(uploads_dir, exist_ok=True)
-    
-    # Generate unique filename
-    file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = os.path.join(uploads_dir, unique_filename)
-    
-    # Save file
-    contents = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    # Store the file path in the form
-    form = form_service.get_form_by_id(db, form_id, current_user.id)
-    form.cover_url = f"/uploads/{unique_filename}"
-    db.commit()
-    
-    return {"cover_url": form.cover_url}
+    form = await form_service.get_form_by_id(db, form_id, current_user.id)
+    form.cover_url = await upload_service.save_image_upload(file, 10 * 1024 * 1024)
+    await db.commit()
+    await invalidation.form_changed(form.id, form.share_id)
 
+    return {"cover_url": form.cover_url}
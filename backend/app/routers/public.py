@@ -1,36 +1,80 @@
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..db import get_db
+from ..responses import dumps
 from ..schemas import (
     FormOut,
     PaymentSessionCreate,
     PaymentSessionOut,
+    SubmissionAccepted,
     SubmissionCreate,
     SubmissionOut,
 )
-from ..services import form_service, submission_service
+from ..services import (
+    form_service,
+    public_form_cache,
+    rate_limit,
+    submission_ingest,
+    submission_service,
+)
 
 router = APIRouter(tags=["public"])
 
 
 @router.get("/s/{share_id}", response_model=FormOut)
-def get_form_by_share_id(
+async def get_form_by_share_id(
+    share_id: str,
+    request: Request,
+    if_none_match: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    base_url = str(request.base_url)
+    cached = public_form_cache.get(share_id, base_url)
+    if cached is None:
+        form = await form_service.get_form_by_share_id(db, share_id)
+        body = dumps(form_service.form_payload(form, request))
+        cached = public_form_cache.put(share_id, base_url, body)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if public_form_cache.etag_matches(if_none_match, cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+async def submission_rate_limit(
     share_id: str,
     request: Request,
-    db: Session = Depends(get_db),
-) -> FormOut:
-    form = form_service.get_form_by_share_id(db, share_id)
-    return form_service.form_to_out(form, request, db)
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    await rate_limit.enforce_submission_limits(
+        db, share_id, rate_limit.client_ip(request)
+    )
 
 
-@router.post("/s/{share_id}/submissions", response_model=SubmissionOut)
-def submit_form(
+@router.post(
+    "/s/{share_id}/submissions",
+    response_model=SubmissionOut | SubmissionAccepted,
+    dependencies=[Depends(submission_rate_limit)],
+)
+async def submit_form(
     share_id: str,
     payload: SubmissionCreate,
-    db: Session = Depends(get_db),
-) -> SubmissionOut:
-    return submission_service.create_submission_for_share(db, share_id, payload)
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+) -> SubmissionOut | SubmissionAccepted:
+    if not submission_ingest.is_batched():
+        return await submission_service.create_submission_for_share(
+            db, share_id, payload
+        )
+
+    result = await submission_ingest.ingest_submission(db, share_id, payload)
+    if isinstance(result, submission_ingest.PendingSubmission):
+        response.status_code = status.HTTP_202_ACCEPTED
+        return SubmissionAccepted(
+            provisional_id=result.provisional_id, form_id=result.form_id
+        )
+    return SubmissionOut.model_validate(result)
 
 
 # PAYMENT FEATURE DISABLED - Endpoint commented out
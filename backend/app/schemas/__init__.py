@@ -1,23 +1,49 @@
-from .auth import Token, UserCreate, UserOut, UserUpdate
-from .form import FormBlock, FormCreate, FormOut, FormUpdate
+from .auth import Token, UserCreate, UserOut, UserUpdate, UserUpdated
+from .form import (
+    BlockOperation,
+    FormBlock,
+    FormBlocksPatch,
+    FormBlocksPatched,
+    FormCreate,
+    FormOut,
+    FormUpdate,
+)
+from .insights import BlockInsight, FormInsights
+from .search import SearchHit, SearchResults
 from .submission import (
+    ImportRowError,
     PaymentSessionCreate,
     PaymentSessionOut,
+    SubmissionAccepted,
     SubmissionCreate,
     SubmissionOut,
+    SubmissionImportResult,
+    SubmissionPage,
 )
 
 __all__ = [
+    "BlockInsight",
+    "BlockOperation",
     "FormBlock",
+    "FormBlocksPatch",
+    "FormBlocksPatched",
     "FormCreate",
+    "FormInsights",
     "FormOut",
     "FormUpdate",
+    "ImportRowError",
+    "SearchHit",
+    "SearchResults",
+    "SubmissionAccepted",
     "SubmissionCreate",
+    "SubmissionImportResult",
     "SubmissionOut",
+    "SubmissionPage",
     "PaymentSessionCreate",
     "PaymentSessionOut",
     "Token",
     "UserCreate",
     "UserOut",
     "UserUpdate",
+    "UserUpdated",
 ]
@@ -16,6 +16,13 @@ class UserOut(BaseModel):
     created_at: datetime
 
 
+class UserUpdated(UserOut):
+    # Changing the username or password revokes earlier tokens, so the
+    # caller gets a fresh one.
+    access_token: str
+    token_type: str = "bearer"
+
+
 class UserCreate(BaseModel):
     username: str
     password: str
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Any, Literal, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -37,6 +37,8 @@ class FormUpdate(BaseModel):
     cover_url: Optional[str] = None
     cover_height: Optional[int] = None
     blocks: Optional[list[FormBlock]] = None
+    # Explicitly sending null resets to the server default.
+    submission_rate_limit: Optional[int] = Field(default=None, ge=0)
 
 
 class FormOut(BaseModel):
@@ -51,5 +53,48 @@ class FormOut(BaseModel):
     share_id: str
     share_url: Optional[str] = None
     response_count: int = 0
+    submission_rate_limit: Optional[int] = None
+    version: int = 1
     created_at: datetime
     updated_at: datetime
+
+
+class InsertBlock(BaseModel):
+    op: Literal["insert"]
+    block: FormBlock
+    # Id of the block to place it after; None puts it first.
+    after: Optional[str] = None
+
+
+class MoveBlock(BaseModel):
+    op: Literal["move"]
+    id: str
+    after: Optional[str] = None
+
+
+class UpdateBlock(BaseModel):
+    op: Literal["update"]
+    id: str
+    # FormBlock fields to change; omitted fields keep their values.
+    changes: dict[str, Any]
+
+
+class DeleteBlock(BaseModel):
+    op: Literal["delete"]
+    id: str
+
+
+BlockOperation = Annotated[
+    Union[InsertBlock, MoveBlock, UpdateBlock, DeleteBlock], Field(discriminator="op")
+]
+
+
+class FormBlocksPatch(BaseModel):
+    # The form version the operations were made against.
+    version: int
+    ops: list[BlockOperation] = Field(min_length=1)
+
+
+class FormBlocksPatched(BaseModel):
+    version: int
+    updated_at: datetime
@@ -0,0 +1,22 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class BlockInsight(BaseModel):
+    block_id: str
+    type: str
+    label: str
+    responses: int = 0
+    # Option tallies for choice blocks, value histogram for rating/scale.
+    counts: Optional[dict[str, int]] = None
+    mean: Optional[float] = None
+    # row -> column -> count for matrix blocks.
+    matrix: Optional[dict[str, dict[str, int]]] = None
+
+
+class FormInsights(BaseModel):
+    form_id: int
+    total_submissions: int = 0
+    daily_counts: dict[str, int] = Field(default_factory=dict)
+    blocks: list[BlockInsight] = Field(default_factory=list)
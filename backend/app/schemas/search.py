@@ -0,0 +1,17 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SearchHit(BaseModel):
+    kind: Literal["form", "submission"]
+    form_id: int
+    form_title: str
+    submission_id: Optional[int] = None
+    snippet: str = ""
+    score: float
+
+
+class SearchResults(BaseModel):
+    items: list[SearchHit] = Field(default_factory=list)
+    next_offset: Optional[int] = None
@@ -18,6 +18,30 @@ class SubmissionOut(BaseModel):
     created_at: datetime
 
 
+class SubmissionAccepted(BaseModel):
+    provisional_id: str
+    form_id: int
+    status: str = "queued"
+
+
+class SubmissionPage(BaseModel):
+    items: list[SubmissionOut]
+    next_cursor: str | None = None
+
+
+class ImportRowError(BaseModel):
+    line: int
+    errors: list[dict[str, Any]]
+
+
+class SubmissionImportResult(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list)
+    # More rows failed than are listed in ``errors``.
+    errors_truncated: bool = False
+
+
 class PaymentSessionCreate(BaseModel):
     block_id: str
 
@@ -1,12 +1,17 @@
 import os
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..cache import TTLCache
 from ..models import User
+from .password_hasher import hasher_pool
 
 pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
@@ -14,40 +19,56 @@ SECRET_KEY = os.getenv("JWT_SECRET", "dev-secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
 
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
 
-def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    return db.query(User).filter(User.username == username).first()
+# token -> (user id, token version). The version is checked against the
+# user row on every request, so cached entries never outlive a revocation.
+_token_cache = TTLCache(maxsize=AUTH_TOKEN_CACHE_SIZE, ttl=AUTH_TOKEN_CACHE_TTL)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[User]:
+    return await db.scalar(select(User).where(User.username == username))
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# pbkdf2 is CPU-bound, so hashing runs in the bounded hasher pool.
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hasher_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_user_by_username(db, username)
+async def hash_password(password: str) -> str:
+    return await hasher_pool.run(pwd_context.hash, password)
+
+
+async def authenticate_user(
+    db: AsyncSession, username: str, password: str
+) -> Optional[User]:
+    user = await get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
 
 
-def create_user(db: Session, username: str, password: str) -> User:
-    existing = get_user_by_username(db, username)
+async def create_user(db: AsyncSession, username: str, password: str) -> User:
+    existing = await get_user_by_username(db, username)
     if existing:
         raise ValueError("Username already exists")
 
-    user = User(username=username, hashed_password=hash_password(password))
+    user = User(username=username, hashed_password=await hash_password(password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
+def create_user_token(user: User) -> str:
+    return create_access_token(
+        {"sub": user.username, "uid": user.id, "ver": user.token_version or 0}
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (
@@ -57,33 +78,86 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def ensure_demo_user(db: Session) -> User:
+async def _resolve_token(db: AsyncSession, token: str) -> Optional[tuple[int, int]]:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+    user_id = payload.get("uid")
+    if user_id is None:
+        # Tokens issued before the uid claim only carry the username.
+        username = payload.get("sub")
+        if not username:
+            return None
+        user = await get_user_by_username(db, username)
+        if not user:
+            return None
+        user_id = user.id
+
+    # Tokens issued before the ver claim count as version 0.
+    claims = (user_id, payload.get("ver", 0))
+    ttl = min(AUTH_TOKEN_CACHE_TTL, payload.get("exp", 0) - time.time())
+    if ttl > 0:
+        _token_cache.set(token, claims, ttl)
+    return claims
+
+
+async def get_user_for_token(db: AsyncSession, token: str) -> Optional[User]:
+    """Resolve a bearer token to its user.
+
+    Decoded tokens are cached briefly, so repeat requests skip signature
+    verification and load the user by primary key. A token is refused once
+    the user's ``token_version`` has moved past the one it was issued for.
+    """
+    claims = _token_cache.get(token) or await _resolve_token(db, token)
+    if claims is None:
+        return None
+    user_id, version = claims
+    user = await db.get(User, user_id)
+    if user is None or (user.token_version or 0) != version:
+        return None
+    return user
+
+
+async def ensure_demo_user(db: AsyncSession) -> User:
     username = "test-user"
     password = "test-user"
-    existing = get_user_by_username(db, username)
+    existing = await get_user_by_username(db, username)
     if existing:
         return existing
 
-    user = User(username=username, hashed_password=hash_password(password))
+    user = User(username=username, hashed_password=await hash_password(password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another worker seeded it first.
+        await db.rollback()
+        return await get_user_by_username(db, username)
+    await db.refresh(user)
     return user
 
 
-def update_user(
-    db: Session, user: User, username: str | None = None, password: str | None = None
+async def update_user(
+    db: AsyncSession,
+    user: User,
+    username: str | None = None,
+    password: str | None = None,
 ) -> User:
     if username is not None and username != user.username:
-        existing = get_user_by_username(db, username)
+        existing = await get_user_by_username(db, username)
         if existing:
             raise ValueError("Username already exists")
         user.username = username
 
     if password is not None:
-        user.hashed_password = hash_password(password)
+        user.hashed_password = await hash_password(password)
 
+    if username is not None or password is not None:
+        # Revokes every token issued before the change.
+        user.token_version = (user.token_version or 0) + 1
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
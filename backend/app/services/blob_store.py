@@ -0,0 +1,127 @@
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "blobs")
+CHUNK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+class BlobStore(ABC):
+    """Content-addressed storage for uploaded files, keyed by SHA-256."""
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Store ``data`` and return its blob id."""
+
+    @abstractmethod
+    async def size(self, blob_id: str) -> int:
+        """Return the blob's length in bytes, raising ``BlobNotFound``."""
+
+    @abstractmethod
+    def iter_range(self, blob_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yield the bytes in ``[start, end]`` (inclusive) in chunks."""
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str = BLOB_STORE_DIR) -> None:
+        self.root = root
+
+    def _path(self, blob_id: str) -> str:
+        if not re.fullmatch(r"[0-9a-f]{64}", blob_id):
+            raise BlobNotFound(blob_id)
+        return os.path.join(self.root, blob_id[:2], blob_id[2:4], blob_id)
+
+    def _write(self, blob_id: str, data: bytes) -> None:
+        path = self._path(blob_id)
+        if os.path.exists(path):
+            return
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".blob-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    async def put(self, data: bytes) -> str:
+        blob_id = hashlib.sha256(data).hexdigest()
+        await run_in_threadpool(self._write, blob_id, data)
+        return blob_id
+
+    async def size(self, blob_id: str) -> int:
+        try:
+            return await run_in_threadpool(os.path.getsize, self._path(blob_id))
+        except FileNotFoundError as exc:
+            raise BlobNotFound(blob_id) from exc
+
+    async def iter_range(
+        self, blob_id: str, start: int, end: int
+    ) -> AsyncIterator[bytes]:
+        handle = await run_in_threadpool(open, self._path(blob_id), "rb")
+        try:
+            await run_in_threadpool(handle.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(handle.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            await run_in_threadpool(handle.close)
+
+
+_blob_store: BlobStore = LocalBlobStore()
+
+
+def get_blob_store() -> BlobStore:
+    return _blob_store
+
+
+def set_blob_store(store: BlobStore) -> None:
+    """Swap the backend, e.g. for an object-storage implementation."""
+    global _blob_store
+    _blob_store = store
+
+
+def parse_byte_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """Resolve a single-range ``Range`` header to inclusive byte offsets.
+
+    Returns None when the whole blob should be sent.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
@@ -3,10 +3,19 @@ from typing import Optional
 import secrets
 
 from fastapi import HTTPException, Request
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Form, Submission
-from ..schemas import FormCreate, FormOut, FormUpdate
+from ..schemas import (
+    BlockOperation,
+    FormBlock,
+    FormBlocksPatch,
+    FormCreate,
+    FormUpdate,
+)
+from . import insights_service, invalidation, search_service
 
 
 def generate_share_id() -> str:
@@ -18,26 +27,35 @@ def build_share_url(request: Request, share_id: str) -> str:
     return f"{base}/s/{share_id}"
 
 
-def form_to_out(form: Form, request: Request, db: Session | None = None) -> FormOut:
-    response_count = 0
-    if db:
-        response_count = db.query(Submission).filter(Submission.form_id == form.id).count()
-    
-    return FormOut(
-        id=form.id,
-        title=form.title,
-        blocks=form.blocks or [],
-        share_id=form.share_id,
-        share_url=build_share_url(request, form.share_id),
-        response_count=response_count,
-        created_at=form.created_at,
-        updated_at=form.updated_at,
-    )
+def form_payload(form: Form, request: Request) -> dict:
+    """A form in the ``FormOut`` shape, as a plain dict for ``FastJSONResponse``.
+
+    Stored blocks were validated as ``FormBlock`` and dumped on write, so
+    they are emitted as-is instead of being re-validated per response.
+    """
+    return {
+        "id": form.id,
+        "title": form.title,
+        # Forms created before image uploads existed store "" or NULL.
+        "logo_url": form.logo_url or None,
+        "cover_url": form.cover_url or None,
+        "cover_height": 200 if form.cover_height is None else form.cover_height,
+        "blocks": form.blocks or [],
+        "share_id": form.share_id,
+        "share_url": build_share_url(request, form.share_id),
+        "response_count": form.response_count or 0,
+        "submission_rate_limit": form.submission_rate_limit,
+        "version": form.version,
+        "created_at": form.created_at,
+        "updated_at": form.updated_at,
+    }
 
 
-def create_form(db: Session, payload: FormCreate, user_id: Optional[int]) -> Form:
+async def create_form(
+    db: AsyncSession, payload: FormCreate, user_id: Optional[int]
+) -> Form:
     share_id = generate_share_id()
-    while db.query(Form).filter(Form.share_id == share_id).first():
+    while await db.scalar(select(Form.id).where(Form.share_id == share_id)):
         share_id = generate_share_id()
 
     form = Form(
@@ -47,62 +65,203 @@ def create_form(db: Session, payload: FormCreate, user_id: Optional[int]) -> For
         share_id=share_id,
     )
     db.add(form)
-    db.commit()
-    db.refresh(form)
+    await db.flush()
+    await search_service.index_form(db, form)
+    await db.commit()
+    await db.refresh(form)
     return form
 
 
-def list_forms(db: Session, user_id: int) -> list[Form]:
-    return (
-        db.query(Form)
-        .filter(Form.user_id == user_id)
+async def list_forms(db: AsyncSession, user_id: int) -> list[Form]:
+    result = await db.scalars(
+        select(Form)
+        .where(Form.user_id == user_id)
         .order_by(Form.created_at.desc())
-        .all()
     )
+    return list(result)
 
 
-def get_form_by_id(db: Session, form_id: int, user_id: int) -> Form:
-    form = (
-        db.query(Form)
-        .filter(Form.id == form_id, Form.user_id == user_id)
-        .first()
+async def get_form_by_id(db: AsyncSession, form_id: int, user_id: int) -> Form:
+    form = await db.scalar(
+        select(Form).where(Form.id == form_id, Form.user_id == user_id)
     )
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
     return form
 
 
-def get_form_by_share_id(db: Session, share_id: str) -> Form:
-    form = db.query(Form).filter(Form.share_id == share_id).first()
+async def get_form_by_share_id(db: AsyncSession, share_id: str) -> Form:
+    form = await db.scalar(select(Form).where(Form.share_id == share_id))
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
     return form
 
 
-def update_form(db: Session, form_id: int, payload: FormUpdate, user_id: int) -> Form:
-    form = get_form_by_id(db, form_id, user_id)
+async def update_form(
+    db: AsyncSession, form_id: int, payload: FormUpdate, user_id: int
+) -> Form:
+    form = await get_form_by_id(db, form_id, user_id)
 
     if payload.title is not None:
         form.title = payload.title
+    rebuild_rollups = False
     if payload.blocks is not None:
-        form.blocks = [block.model_dump() for block in payload.blocks]
+        blocks = [block.model_dump() for block in payload.blocks]
+        rebuild_rollups = await insights_service.apply_block_changes(
+            db, form.id, form.blocks, blocks
+        )
+        form.blocks = blocks
+    if "submission_rate_limit" in payload.model_fields_set:
+        form.submission_rate_limit = payload.submission_rate_limit
+    form.version = Form.version + 1
     form.updated_at = datetime.utcnow()
 
     db.add(form)
-    db.commit()
-    db.refresh(form)
+    await db.flush()
+    await search_service.index_form(db, form)
+    await db.commit()
+    await db.refresh(form)
+    if rebuild_rollups:
+        insights_service.schedule_rebuild(form.id)
+    await invalidation.form_changed(form.id, form.share_id)
+    return form
+
+
+def _block_position(blocks: list[dict], block_id: str) -> int:
+    for index, block in enumerate(blocks):
+        if block.get("id") == block_id:
+            return index
+    raise HTTPException(status_code=422, detail=f"Block {block_id!r} not found")
+
+
+def _insert_position(blocks: list[dict], after: Optional[str]) -> int:
+    return 0 if after is None else _block_position(blocks, after) + 1
+
+
+def apply_block_operations(
+    blocks: list[dict], ops: list[BlockOperation]
+) -> list[dict]:
+    """Return a copy of ``blocks`` with ``ops`` applied in order.
+
+    Only inserted and updated blocks go through ``FormBlock``; the rest
+    are carried over as stored.
+    """
+    blocks = list(blocks)
+    for op in ops:
+        if op.op == "insert":
+            if any(block.get("id") == op.block.id for block in blocks):
+                raise HTTPException(
+                    status_code=422, detail=f"Block {op.block.id!r} already exists"
+                )
+            blocks.insert(_insert_position(blocks, op.after), op.block.model_dump())
+        elif op.op == "move":
+            block = blocks.pop(_block_position(blocks, op.id))
+            blocks.insert(_insert_position(blocks, op.after), block)
+        elif op.op == "update":
+            index = _block_position(blocks, op.id)
+            if op.changes.get("id", op.id) != op.id:
+                raise HTTPException(
+                    status_code=422, detail="Block ids cannot be changed"
+                )
+            try:
+                block = FormBlock.model_validate({**blocks[index], **op.changes})
+            except ValidationError as exc:
+                raise HTTPException(
+                    status_code=422,
+                    detail=exc.errors(include_url=False, include_context=False),
+                ) from exc
+            blocks[index] = block.model_dump()
+        else:
+            blocks.pop(_block_position(blocks, op.id))
+    return blocks
+
+
+def _version_conflict(current: Optional[int]) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "The form was changed since this version. Reload and retry.",
+            "version": current,
+        },
+    )
+
+
+async def patch_form_blocks(
+    db: AsyncSession, form_id: int, patch: FormBlocksPatch, user_id: int
+) -> Form:
+    """Apply block operations if the form is still at ``patch.version``.
+
+    The version check and the write are one conditional UPDATE, so of two
+    concurrent patches against the same version exactly one wins and the
+    other gets a 409 carrying the current version.
+    """
+    form = await get_form_by_id(db, form_id, user_id)
+    if form.version != patch.version:
+        raise _version_conflict(form.version)
+
+    previous = form.blocks or []
+    blocks = apply_block_operations(previous, patch.ops)
+    written = await db.scalar(
+        update(Form)
+        .where(Form.id == form.id, Form.version == patch.version)
+        .values(blocks=blocks, version=Form.version + 1, updated_at=datetime.utcnow())
+        .returning(Form.version)
+    )
+    if written is None:
+        await db.rollback()
+        raise _version_conflict(
+            await db.scalar(select(Form.version).where(Form.id == form_id))
+        )
+
+    await db.refresh(form)
+    rebuild_rollups = await insights_service.apply_block_changes(
+        db, form.id, previous, blocks
+    )
+    await search_service.index_form(db, form)
+    await db.commit()
+    await db.refresh(form)
+    if rebuild_rollups:
+        insights_service.schedule_rebuild(form.id)
+    await invalidation.form_changed(form.id, form.share_id)
     return form
 
 
-def delete_form(db: Session, form_id: int, user_id: int) -> None:
-    form = get_form_by_id(db, form_id, user_id)
-    db.delete(form)
-    db.commit()
+async def delete_form(db: AsyncSession, form_id: int, user_id: int) -> None:
+    form = await get_form_by_id(db, form_id, user_id)
+    share_id = form.share_id
+    await insights_service.delete_rollups(db, form.id)
+    await search_service.remove_form(db, form.id)
+    await db.delete(form)
+    await db.commit()
+    await invalidation.form_changed(form_id, share_id)
 
 
-def get_form_share(db: Session, form_id: int, request: Request, user_id: int) -> dict:
-    form = get_form_by_id(db, form_id, user_id)
+async def get_form_share(
+    db: AsyncSession, form_id: int, request: Request, user_id: int
+) -> dict:
+    form = await get_form_by_id(db, form_id, user_id)
     return {
         "share_id": form.share_id,
         "share_url": build_share_url(request, form.share_id),
     }
+
+
+async def reconcile_response_counts(db: AsyncSession) -> int:
+    """Recompute the denormalized ``Form.response_count`` from submissions.
+
+    Returns the number of forms whose stored count was out of date.
+    """
+    result = await db.execute(
+        select(Submission.form_id, func.count(Submission.id)).group_by(
+            Submission.form_id
+        )
+    )
+    counts = dict(result.all())
+    fixed = 0
+    for form in await db.scalars(select(Form)):
+        actual = counts.get(form.id, 0)
+        if form.response_count != actual:
+            form.response_count = actual
+            fixed += 1
+    await db.commit()
+    return fixed
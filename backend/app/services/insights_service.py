@@ -0,0 +1,314 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import SessionLocal
+from ..models import Form, InsightRollup, Submission
+from ..schemas import BlockInsight, FormInsights
+from .submission_export import NON_ANSWER_BLOCK_TYPES
+
+logger = logging.getLogger(__name__)
+
+CHOICE_BLOCK_TYPES = {"multiple-choice", "dropdown", "checkboxes"}
+NUMERIC_BLOCK_TYPES = {"rating", "linear-scale"}
+
+# Aggregates are tallies of (block_id, bucket) pairs. Daily submission
+# counts live under a pseudo block, and every answered block also counts
+# one RESPONSES_BUCKET hit per submission.
+SUBMISSIONS_KEY = "__submissions__"
+RESPONSES_BUCKET = "\x00responses"
+MATRIX_SEPARATOR = "\x1f"
+
+INSIGHTS_BATCH_SIZE = 1000
+ROLLUP_WRITE_CHUNK = 500
+
+
+def _is_answered(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip() != ""
+    if isinstance(value, (list, dict)):
+        return len(value) > 0
+    return True
+
+
+def _numeric_bucket(value: Any) -> str | None:
+    try:
+        return format(float(value), "g")
+    except (TypeError, ValueError):
+        return None
+
+
+def answer_buckets(block_type: str, value: Any) -> Iterator[str]:
+    """Yield the aggregate buckets a single answer contributes to."""
+    yield RESPONSES_BUCKET
+    if block_type in CHOICE_BLOCK_TYPES:
+        for option in value if isinstance(value, list) else [value]:
+            if isinstance(option, str):
+                yield option
+    elif block_type in NUMERIC_BLOCK_TYPES:
+        bucket = _numeric_bucket(value)
+        if bucket is not None:
+            yield bucket
+    elif block_type == "matrix" and isinstance(value, dict):
+        for row, column in value.items():
+            if isinstance(column, str) and column:
+                yield f"{row}{MATRIX_SEPARATOR}{column}"
+
+
+def answer_blocks(blocks: list[dict]) -> list[tuple[str, str]]:
+    return [
+        (block["id"], block.get("type") or "")
+        for block in blocks
+        if block.get("id") and block.get("type") not in NON_ANSWER_BLOCK_TYPES
+    ]
+
+
+def submission_buckets(
+    tracked: list[tuple[str, str]], data: dict, created_at: datetime
+) -> Iterator[tuple[str, str]]:
+    """Yield every (block_id, bucket) pair one submission contributes."""
+    yield SUBMISSIONS_KEY, created_at.date().isoformat()
+    for block_id, block_type in tracked:
+        value = data.get(block_id)
+        if _is_answered(value):
+            for bucket in answer_buckets(block_type, value):
+                yield block_id, bucket
+
+
+def build_insights(form: Form, counts: Counter) -> FormInsights:
+    """Shape raw (block_id, bucket) tallies into the insights response."""
+    by_block: dict[str, dict[str, int]] = {}
+    for (block_id, bucket), count in counts.items():
+        by_block.setdefault(block_id, {})[bucket] = count
+
+    daily_counts = dict(sorted(by_block.pop(SUBMISSIONS_KEY, {}).items()))
+    insights = FormInsights(
+        form_id=form.id,
+        total_submissions=sum(daily_counts.values()),
+        daily_counts=daily_counts,
+    )
+
+    for block in form.blocks or []:
+        block_id = block.get("id")
+        block_type = block.get("type") or ""
+        if not block_id or block_type in NON_ANSWER_BLOCK_TYPES:
+            continue
+        tallies = dict(by_block.get(block_id, {}))
+        item = BlockInsight(
+            block_id=block_id,
+            type=block_type,
+            label=(block.get("content") or "").strip() or block_id,
+            responses=tallies.pop(RESPONSES_BUCKET, 0),
+        )
+        if block_type in CHOICE_BLOCK_TYPES:
+            options = {option: 0 for option in block.get("options") or []}
+            options.update(tallies)
+            item.counts = options
+        elif block_type in NUMERIC_BLOCK_TYPES:
+            item.counts = dict(sorted(tallies.items(), key=lambda kv: float(kv[0])))
+            total = sum(tallies.values())
+            if total:
+                item.mean = sum(float(k) * v for k, v in tallies.items()) / total
+        elif block_type == "matrix":
+            matrix = {
+                row: {column: 0 for column in block.get("columns") or []}
+                for row in block.get("rows") or []
+            }
+            for bucket, count in tallies.items():
+                row, _, column = bucket.partition(MATRIX_SEPARATOR)
+                matrix.setdefault(row, {})[column] = count
+            item.matrix = matrix
+        insights.blocks.append(item)
+
+    return insights
+
+
+async def _aggregate_submissions(db: AsyncSession, form: Form) -> Counter:
+    tracked = answer_blocks(form.blocks or [])
+    counts: Counter = Counter()
+    result = await db.stream(
+        select(Submission.data, Submission.created_at)
+        .where(Submission.form_id == form.id)
+        .execution_options(yield_per=INSIGHTS_BATCH_SIZE)
+    )
+    async for data, created_at in result:
+        counts.update(submission_buckets(tracked, data or {}, created_at))
+    return counts
+
+
+def _bucketing(block_type: str) -> str:
+    """How ``answer_buckets`` tallies a block type's answers."""
+    if block_type in CHOICE_BLOCK_TYPES:
+        return "choice"
+    if block_type in NUMERIC_BLOCK_TYPES:
+        return "numeric"
+    if block_type == "matrix":
+        return "matrix"
+    return "responses"
+
+
+async def apply_block_changes(
+    db: AsyncSession, form_id: int, old_blocks: list[dict], new_blocks: list[dict]
+) -> bool:
+    """Adjust a form's rollups for a blocks edit, without scanning submissions.
+
+    Added blocks start with no tallies and removed blocks lose their rows.
+    Labels, options and matrix rows only affect presentation. A block
+    whose new type buckets answers differently (say, text to rating) has
+    its rows dropped too and True is returned: the caller should
+    ``schedule_rebuild`` once its transaction has committed.
+    """
+    old = dict(answer_blocks(old_blocks or []))
+    new = dict(answer_blocks(new_blocks or []))
+    removed = old.keys() - new.keys()
+    retyped = {
+        block_id
+        for block_id in old.keys() & new.keys()
+        if _bucketing(old[block_id]) != _bucketing(new[block_id])
+    }
+    if removed or retyped:
+        await db.execute(
+            delete(InsightRollup).where(
+                InsightRollup.form_id == form_id,
+                InsightRollup.block_id.in_(removed | retyped),
+            )
+        )
+    return bool(retyped)
+
+
+def _upsert(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def _write_rollups(db: AsyncSession, counts: Counter) -> None:
+    """Add ``{(form_id, block_id, bucket): n}`` onto the rollup table."""
+    rows = [
+        {"form_id": form_id, "block_id": block_id, "bucket": bucket, "count": count}
+        for (form_id, block_id, bucket), count in counts.items()
+    ]
+    insert = _upsert(db)
+    for start in range(0, len(rows), ROLLUP_WRITE_CHUNK):
+        statement = insert(InsightRollup).values(rows[start : start + ROLLUP_WRITE_CHUNK])
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=["form_id", "block_id", "bucket"],
+                set_={"count": InsightRollup.count + statement.excluded.count},
+            )
+        )
+
+
+async def apply_rollups(
+    db: AsyncSession, forms: dict[int, list[dict]], submissions: list[Submission]
+) -> None:
+    """Fold freshly inserted submissions into the rollup table.
+
+    ``forms`` maps form id to its blocks. Runs inside the caller's
+    transaction, after the form row has been updated (and so locked).
+    """
+    tracked = {form_id: answer_blocks(blocks or []) for form_id, blocks in forms.items()}
+    counts: Counter = Counter()
+    for submission in submissions:
+        for block_id, bucket in submission_buckets(
+            tracked.get(submission.form_id, []),
+            submission.data or {},
+            submission.created_at,
+        ):
+            counts[submission.form_id, block_id, bucket] += 1
+    await _write_rollups(db, counts)
+
+
+async def rebuild_rollups(db: AsyncSession, form: Form) -> Counter:
+    """Recompute a form's rollups from its submissions. Does not commit.
+
+    The form row is locked first so concurrent inserts, which update the
+    same row before touching rollups, either finish before the rescan or
+    wait until the rebuild commits.
+    """
+    await db.execute(select(Form.id).where(Form.id == form.id).with_for_update())
+    await delete_rollups(db, form.id)
+    counts = await _aggregate_submissions(db, form)
+    await _write_rollups(
+        db, Counter({(form.id, *key): count for key, count in counts.items()})
+    )
+    return counts
+
+
+# Keeps references to running rebuilds so they are not garbage collected.
+_rebuild_tasks: set[asyncio.Task] = set()
+
+
+async def _rebuild_in_background(form_id: int) -> None:
+    try:
+        async with SessionLocal() as db:
+            form = await db.get(Form, form_id)
+            if form is not None:
+                await rebuild_rollups(db, form)
+                await db.commit()
+    except Exception:
+        logger.exception(
+            "Rebuilding insights rollups for form %s failed; "
+            "run scripts/rebuild_insight_rollups.py",
+            form_id,
+        )
+
+
+def schedule_rebuild(form_id: int) -> None:
+    """Recompute a form's rollups off the request path, in its own session."""
+    task = asyncio.create_task(_rebuild_in_background(form_id))
+    _rebuild_tasks.add(task)
+    task.add_done_callback(_rebuild_tasks.discard)
+
+
+async def delete_rollups(db: AsyncSession, form_id: int) -> None:
+    await db.execute(delete(InsightRollup).where(InsightRollup.form_id == form_id))
+
+
+def rollup_total(counts: Counter) -> int:
+    """Submissions the rollups account for (the sum of the daily counts)."""
+    return sum(
+        count for (block_id, _), count in counts.items() if block_id == SUBMISSIONS_KEY
+    )
+
+
+async def load_insights(db: AsyncSession, form: Form) -> FormInsights:
+    """Serve insights from the rollup table.
+
+    When the rollups cover fewer or more submissions than
+    ``response_count``, for example history written before rollups
+    existed that a later submission only partly rolled up, the form is
+    rebuilt once from its submissions. The count is read in the same
+    statement as the rollups: ``form.response_count`` was loaded earlier
+    and may already trail a submission committed since.
+    """
+    result = await db.execute(
+        select(
+            Form.response_count,
+            InsightRollup.block_id,
+            InsightRollup.bucket,
+            InsightRollup.count,
+        )
+        .select_from(Form)
+        .outerjoin(InsightRollup, InsightRollup.form_id == Form.id)
+        .where(Form.id == form.id)
+    )
+    response_count = 0
+    counts: Counter = Counter()
+    for row in result:
+        response_count = row.response_count or 0
+        if row.block_id is not None:
+            counts[(row.block_id, row.bucket)] = row.count
+    if rollup_total(counts) != response_count:
+        counts = await rebuild_rollups(db, form)
+        await db.commit()
+    return build_insights(form, counts)
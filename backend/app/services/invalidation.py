@@ -0,0 +1,282 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# "local" for a single process; "sqlite" shares events between workers on
+# one host through a file; "redis" between hosts.
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "local")
+INVALIDATION_BUS_PATH = os.getenv("INVALIDATION_BUS_PATH", "invalidations.db")
+INVALIDATION_POLL_INTERVAL = float(os.getenv("INVALIDATION_POLL_INTERVAL", "0.5"))
+INVALIDATION_REDIS_URL = os.getenv("INVALIDATION_REDIS_URL", "redis://localhost:6379/0")
+INVALIDATION_REDIS_CHANNEL = "invalidations"
+# Events older than this are pruned from the SQLite log.
+EVENT_RETENTION_SECONDS = 3600
+
+# A form's blocks or settings changed, or it was deleted:
+# {"form_id": ..., "share_id": ...}.
+FORM_CHANGED = "form_changed"
+
+Handler = Callable[[dict], None]
+
+_handlers: dict[str, list[Handler]] = {}
+# Called instead of per-event handlers when events may have been missed.
+_resets: list[Callable[[], None]] = []
+
+
+def subscribe(topic: str, handler: Handler, reset: Callable[[], None] | None = None) -> None:
+    """Run ``handler(payload)`` for every ``topic`` event from any worker.
+
+    ``reset`` should drop the whole cache; it runs when the bus lost its
+    connection and may have missed events.
+    """
+    _handlers.setdefault(topic, []).append(handler)
+    if reset is not None:
+        _resets.append(reset)
+
+
+def dispatch(topic: str, payload: dict) -> None:
+    for handler in _handlers.get(topic, ()):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Invalidation handler failed for %s", topic)
+
+
+def reset_all() -> None:
+    for reset in _resets:
+        reset()
+
+
+class InvalidationBus(ABC):
+    """Carries invalidation events to the other worker processes.
+
+    The publishing process applies its own events directly, so a bus only
+    needs to deliver them to everyone else.
+    """
+
+    def __init__(self) -> None:
+        self.origin = uuid.uuid4().hex
+
+    @abstractmethod
+    async def broadcast(self, topic: str, payload: dict) -> None:
+        """Send an event to the other workers."""
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """Single process: nothing to deliver."""
+
+    async def broadcast(self, topic: str, payload: dict) -> None:
+        pass
+
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """Event log in a shared SQLite file, polled by every worker.
+
+    For several workers on one host (``uvicorn --workers N``). Events reach
+    other workers within ``poll_interval`` seconds; a failed poll is
+    retried from the last event seen, so none are skipped.
+    """
+
+    def __init__(
+        self,
+        path: str = INVALIDATION_BUS_PATH,
+        poll_interval: float = INVALIDATION_POLL_INTERVAL,
+    ) -> None:
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._conn: sqlite3.Connection | None = None
+        # The connection is used from worker threads, one call at a time.
+        self._lock = threading.Lock()
+        self._last_seen = 0
+        self._task: asyncio.Task | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS invalidations ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, "
+                "payload TEXT NOT NULL, origin TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _append(self, topic: str, payload: dict) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO invalidations (topic, payload, origin, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (topic, json.dumps(payload), self.origin, time.time()),
+            )
+
+    def _read_since(self, seq: int) -> list[tuple]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT seq, topic, payload, origin FROM invalidations "
+                "WHERE seq > ? ORDER BY seq",
+                (seq,),
+            ).fetchall()
+            conn.execute(
+                "DELETE FROM invalidations WHERE created_at < ?",
+                (time.time() - EVENT_RETENTION_SECONDS,),
+            )
+            return rows
+
+    def _latest_seq(self) -> int:
+        with self._lock:
+            return self._connect().execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM invalidations"
+            ).fetchone()[0]
+
+    async def broadcast(self, topic: str, payload: dict) -> None:
+        await asyncio.to_thread(self._append, topic, payload)
+
+    async def start(self) -> None:
+        # Caches start empty, so earlier events are irrelevant.
+        self._last_seen = await asyncio.to_thread(self._latest_seq)
+        self._task = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await asyncio.to_thread(self._read_since, self._last_seen)
+            except sqlite3.Error:
+                logger.exception("Reading invalidation events failed")
+                continue
+            for seq, topic, payload, origin in rows:
+                self._last_seen = seq
+                if origin != self.origin:
+                    dispatch(topic, json.loads(payload))
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Redis pub/sub, for workers spread over several hosts.
+
+    Pub/sub does not replay messages, so after a dropped connection every
+    subscribed cache is reset.
+    """
+
+    def __init__(
+        self, url: str = INVALIDATION_REDIS_URL, channel: str = INVALIDATION_REDIS_CHANNEL
+    ) -> None:
+        super().__init__()
+        try:
+            from redis import asyncio as redis
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "INVALIDATION_BUS=redis requires the redis package. Run pip install redis."
+            ) from exc
+        self._client = redis.from_url(url)
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+
+    async def broadcast(self, topic: str, payload: dict) -> None:
+        message = {"origin": self.origin, "topic": topic, "payload": payload}
+        await self._client.publish(self.channel, json.dumps(message))
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if connected_before:
+                        reset_all()
+                    connected_before = True
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        event = json.loads(message["data"])
+                        if event["origin"] != self.origin:
+                            dispatch(event["topic"], event["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Invalidation subscription lost; reconnecting")
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+
+def _default_bus() -> InvalidationBus:
+    if INVALIDATION_BUS == "sqlite":
+        return SQLiteInvalidationBus()
+    if INVALIDATION_BUS == "redis":
+        return RedisInvalidationBus()
+    return LocalInvalidationBus()
+
+
+_bus: InvalidationBus = _default_bus()
+
+
+def get_bus() -> InvalidationBus:
+    return _bus
+
+
+def set_bus(bus: InvalidationBus) -> None:
+    """Swap the transport, e.g. for a shared backend."""
+    global _bus
+    _bus = bus
+
+
+async def publish(topic: str, payload: dict) -> None:
+    """Apply an event to this worker's caches, then tell the others.
+
+    Call after the change is committed, so no worker can reload the old
+    state after dropping its copy.
+    """
+    dispatch(topic, payload)
+    try:
+        await _bus.broadcast(topic, payload)
+    except Exception:
+        # The change is committed; other workers fall back on cache TTLs.
+        logger.exception("Broadcasting %s failed", topic)
+
+
+async def form_changed(form_id: int, share_id: str) -> None:
+    await publish(FORM_CHANGED, {"form_id": form_id, "share_id": share_id})
+
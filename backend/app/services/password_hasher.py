@@ -0,0 +1,71 @@
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from fastapi import HTTPException
+
+T = TypeVar("T")
+
+PASSWORD_HASH_WORKERS = int(
+    os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+
+
+class PasswordHasherPool:
+    """Dedicated, bounded pool for password hashing and verification.
+
+    pbkdf2 runs in hashlib with the GIL released, so a small thread pool
+    gives real parallelism while keeping auth bursts away from the shared
+    threadpool. Once ``max_pending`` jobs are running or queued, new
+    requests are rejected with 429 instead of waiting.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        # Only touched from the event loop, so no lock is needed.
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many authentication requests. Please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(func, *args)
+        # A cancelled awaiter does not stop a job that already started, so
+        # the slot is released when the job itself finishes.
+        future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._release, done)
+        )
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Future) -> None:
+        self.pending -= 1
+        if not future.cancelled() and future.exception() is None:
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+hasher_pool = PasswordHasherPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
@@ -0,0 +1,60 @@
+import hashlib
+import os
+from dataclasses import dataclass
+
+from ..cache import TTLCache
+from . import invalidation
+
+PUBLIC_FORM_CACHE_TTL = float(os.getenv("PUBLIC_FORM_CACHE_TTL", "30"))
+PUBLIC_FORM_CACHE_SIZE = int(os.getenv("PUBLIC_FORM_CACHE_SIZE", "1024"))
+
+
+@dataclass(frozen=True)
+class CachedForm:
+    base_url: str
+    etag: str
+    body: bytes
+
+
+_cache = TTLCache(maxsize=PUBLIC_FORM_CACHE_SIZE, ttl=PUBLIC_FORM_CACHE_TTL)
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def get(share_id: str, base_url: str) -> CachedForm | None:
+    # share_url in the body is built from the request host, so an entry
+    # rendered for a different host is treated as a miss.
+    cached = _cache.get(share_id)
+    if cached is None or cached.base_url != base_url:
+        return None
+    return cached
+
+
+def put(share_id: str, base_url: str, body: bytes) -> CachedForm:
+    cached = CachedForm(base_url=base_url, etag=make_etag(body), body=body)
+    _cache.set(share_id, cached)
+    return cached
+
+
+def invalidate(share_id: str) -> None:
+    _cache.pop(share_id)
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def _on_form_changed(event: dict) -> None:
+    invalidate(event["share_id"])
+
+
+invalidation.subscribe(invalidation.FORM_CHANGED, _on_form_changed, reset=clear)
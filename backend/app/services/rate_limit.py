@@ -0,0 +1,204 @@
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..cache import TTLCache
+from ..models import Form
+from . import invalidation
+
+# Limits are submissions per minute; a bucket holds one minute's worth, so
+# that is also the largest burst. 0 disables a limit. The per-IP limit is
+# off by default: behind a proxy every client shares the proxy's address
+# unless RATE_LIMIT_TRUST_FORWARDED is set.
+SUBMISSION_RATE_LIMIT_PER_IP = int(os.getenv("SUBMISSION_RATE_LIMIT_PER_IP", "0"))
+SUBMISSION_RATE_LIMIT_PER_FORM = int(os.getenv("SUBMISSION_RATE_LIMIT_PER_FORM", "600"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+RATE_LIMIT_CONFIG_TTL = float(os.getenv("RATE_LIMIT_CONFIG_TTL", "60"))
+
+
+class RateLimitBackend(ABC):
+    """Token-bucket storage. Buckets refill at ``per_minute / 60`` tokens a
+    second up to ``per_minute`` tokens."""
+
+    @abstractmethod
+    async def take(self, key: str, per_minute: int) -> float:
+        """Spend one token; return 0 if allowed, else seconds until one is free."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, bounded to the ``max_keys`` most recently used."""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # Only touched from the event loop, so no lock is needed.
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, per_minute: int) -> float:
+        now = time.monotonic()
+        rate = per_minute / 60
+        tokens, updated = self._buckets.get(key, (float(per_minute), now))
+        tokens = min(float(per_minute), tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# Refill and spend atomically inside Redis so every app instance shares
+# the same buckets. KEYS[1] = bucket, ARGV = per_minute, now (seconds).
+REDIS_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local rate = capacity / 60
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Shared buckets in Redis, for running several app instances."""
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL) -> None:
+        try:
+            from redis import asyncio as redis
+        except ModuleNotFoundError as exc:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the redis package. Run pip install redis."
+            ) from exc
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(REDIS_TAKE_SCRIPT)
+
+    async def take(self, key: str, per_minute: int) -> float:
+        wait = await self._take(keys=[f"ratelimit:{key}"], args=[per_minute, time.time()])
+        return float(wait)
+
+
+def _default_backend() -> RateLimitBackend:
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend()
+    return MemoryRateLimitBackend()
+
+
+_backend: RateLimitBackend = _default_backend()
+_form_limits = TTLCache(maxsize=10_000, ttl=RATE_LIMIT_CONFIG_TTL)
+# Share ids with no form, kept apart so probing random ids cannot evict
+# the limits of real forms.
+_unknown_forms = TTLCache(maxsize=10_000, ttl=RATE_LIMIT_CONFIG_TTL)
+rejected = 0
+
+
+def get_backend() -> RateLimitBackend:
+    return _backend
+
+
+def set_backend(backend: RateLimitBackend) -> None:
+    """Swap the bucket store, e.g. for a shared backend."""
+    global _backend
+    _backend = backend
+
+
+def invalidate_form(share_id: str) -> None:
+    """Forget a form's cached limit after its settings change."""
+    _form_limits.pop(share_id)
+    _unknown_forms.pop(share_id)
+
+
+def _clear_form_limits() -> None:
+    _form_limits.clear()
+    _unknown_forms.clear()
+
+
+def _on_form_changed(event: dict) -> None:
+    invalidate_form(event["share_id"])
+
+
+invalidation.subscribe(
+    invalidation.FORM_CHANGED, _on_form_changed, reset=_clear_form_limits
+)
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def form_limit(db: AsyncSession, share_id: str) -> int | None:
+    """Per-minute limit for a form, or None if no form has this share id.
+
+    Both answers are cached, so only cache misses touch the database.
+    """
+    limit = _form_limits.get(share_id)
+    if limit is not None:
+        return limit
+    if _unknown_forms.get(share_id):
+        return None
+    row = (
+        await db.execute(
+            select(Form.id, Form.submission_rate_limit).where(Form.share_id == share_id)
+        )
+    ).first()
+    if row is None:
+        _unknown_forms.set(share_id, True)
+        return None
+    configured = row.submission_rate_limit
+    limit = SUBMISSION_RATE_LIMIT_PER_FORM if configured is None else configured
+    _form_limits.set(share_id, limit)
+    return limit
+
+
+async def _take_or_reject(key: str, per_minute: int) -> None:
+    global rejected
+    if per_minute <= 0:
+        return
+    wait = await _backend.take(key, per_minute)
+    if wait > 0:
+        rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Too many submissions. Please retry shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+async def enforce_submission_limits(db: AsyncSession, share_id: str, ip: str) -> None:
+    """Spend from the caller's per-IP bucket, then the form's bucket.
+
+    The per-IP check runs before anything reads the database, and the
+    form's limit (or the fact that the share id is unknown, which is
+    answered with 404) is served from memory once cached, so floods are
+    refused without touching the database.
+    """
+    await _take_or_reject(f"ip:{ip}", SUBMISSION_RATE_LIMIT_PER_IP)
+    limit = await form_limit(db, share_id)
+    if limit is None:
+        raise HTTPException(status_code=404, detail="Form not found")
+    await _take_or_reject(f"form:{share_id}", limit)
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+
+import httpx
+from fastapi import HTTPException
+
+from ..cache import TTLCache
+
+RECAPTCHA_VERIFIER = os.getenv("RECAPTCHA_VERIFIER", "google")
+RECAPTCHA_VERIFY_URL = os.getenv(
+    "RECAPTCHA_VERIFY_URL", "https://www.google.com/recaptcha/api/siteverify"
+)
+RECAPTCHA_TIMEOUT = float(os.getenv("RECAPTCHA_TIMEOUT", "3"))
+RECAPTCHA_MAX_CONNECTIONS = int(os.getenv("RECAPTCHA_MAX_CONNECTIONS", "20"))
+RECAPTCHA_BREAKER_THRESHOLD = int(os.getenv("RECAPTCHA_BREAKER_THRESHOLD", "5"))
+RECAPTCHA_BREAKER_COOLDOWN = float(os.getenv("RECAPTCHA_BREAKER_COOLDOWN", "30"))
+RECAPTCHA_REJECT_CACHE_TTL = float(os.getenv("RECAPTCHA_REJECT_CACHE_TTL", "300"))
+RECAPTCHA_STUB_LATENCY_MS = int(os.getenv("RECAPTCHA_STUB_LATENCY_MS", "0"))
+
+# Tokens are single-use, so only rejections are cached: a replayed bad
+# token is refused without another round trip, and a good one is never
+# accepted twice.
+_rejected_tokens = TTLCache(maxsize=10_000, ttl=RECAPTCHA_REJECT_CACHE_TTL)
+
+
+class VerifierUnavailable(Exception):
+    """The verifier could not give an answer (timeout, network, 5xx)."""
+
+
+class RecaptchaVerifier(ABC):
+    @abstractmethod
+    async def verify(self, token: str) -> bool:
+        """Return whether ``token`` is valid, raising ``VerifierUnavailable``."""
+
+    async def close(self) -> None:
+        pass
+
+
+class GoogleRecaptchaVerifier(RecaptchaVerifier):
+    """siteverify over a shared keep-alive connection pool."""
+
+    def __init__(
+        self,
+        url: str = RECAPTCHA_VERIFY_URL,
+        timeout: float = RECAPTCHA_TIMEOUT,
+        max_connections: int = RECAPTCHA_MAX_CONNECTIONS,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def verify(self, token: str) -> bool:
+        secret_key = os.getenv("RECAPTCHA_SECRET_KEY")
+        if not secret_key:
+            raise HTTPException(
+                status_code=500,
+                detail="reCAPTCHA is not configured on the server"
+            )
+        try:
+            response = await self._get_client().post(
+                self.url, data={"secret": secret_key, "response": token}
+            )
+            if response.status_code >= 500:
+                raise VerifierUnavailable(f"verifier returned {response.status_code}")
+            return bool(response.json().get("success", False))
+        except (httpx.HTTPError, ValueError) as exc:
+            raise VerifierUnavailable(str(exc)) from exc
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubRecaptchaVerifier(RecaptchaVerifier):
+    """Offline verifier for development and load tests.
+
+    Accepts every token except ones starting with ``invalid``, after an
+    optional simulated round trip.
+    """
+
+    def __init__(self, latency_ms: int = RECAPTCHA_STUB_LATENCY_MS) -> None:
+        self.latency_ms = latency_ms
+
+    async def verify(self, token: str) -> bool:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return not token.startswith("invalid")
+
+
+class CircuitBreaker:
+    """Stops calling a failing verifier for ``cooldown`` seconds.
+
+    After ``threshold`` consecutive failures the breaker opens; once the
+    cooldown passes a single trial call is let through, and its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        # Only touched from the event loop, so no lock is needed.
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trial_in_flight = False
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 0
+        return max(1, int(self.cooldown - (time.monotonic() - self.opened_at)))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "short_circuited": self.short_circuited,
+        }
+
+
+def _default_verifier() -> RecaptchaVerifier:
+    if RECAPTCHA_VERIFIER == "stub":
+        return StubRecaptchaVerifier()
+    return GoogleRecaptchaVerifier()
+
+
+_verifier: RecaptchaVerifier = _default_verifier()
+breaker = CircuitBreaker(RECAPTCHA_BREAKER_THRESHOLD, RECAPTCHA_BREAKER_COOLDOWN)
+
+
+def get_verifier() -> RecaptchaVerifier:
+    return _verifier
+
+
+def set_verifier(verifier: RecaptchaVerifier) -> None:
+    """Swap the verification backend, e.g. for the stub in load tests."""
+    global _verifier
+    _verifier = verifier
+
+
+async def verify_recaptcha(token: str) -> bool:
+    """Verify a reCAPTCHA token, failing fast while the verifier is down."""
+    if _rejected_tokens.get(token):
+        return False
+    if not breaker.allow():
+        raise HTTPException(
+            status_code=503,
+            detail="reCAPTCHA verification is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(breaker.retry_after())},
+        )
+    try:
+        valid = await _verifier.verify(token)
+    except VerifierUnavailable as exc:
+        breaker.record_failure()
+        raise HTTPException(
+            status_code=503,
+            detail="reCAPTCHA verification is temporarily unavailable. Please retry shortly.",
+            headers={"Retry-After": str(max(breaker.retry_after(), 1))},
+        ) from exc
+    except BaseException:
+        # Configuration errors and cancellations say nothing about the
+        # verifier's health; release a half-open trial slot.
+        breaker.trial_in_flight = False
+        raise
+    breaker.record_success()
+    if not valid:
+        _rejected_tokens.set(token, True)
+    return valid
+
+
+async def close() -> None:
+    await _verifier.close()
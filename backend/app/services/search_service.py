@@ -0,0 +1,239 @@
+import logging
+import re
+from typing import Any
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Form, Submission
+from ..schemas import SearchHit, SearchResults
+from .submission_export import NON_ANSWER_BLOCK_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Answers that are binary payloads or tokens rather than text.
+UNSEARCHABLE_BLOCK_TYPES = {"signature", "recaptcha"}
+
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+MAX_QUERY_TOKENS = 16
+SNIPPET_WORDS = 12
+REINDEX_BATCH_SIZE = 1000
+
+SQLITE_UPSERT = text(
+    "INSERT OR REPLACE INTO search_documents "
+    "(rowid, kind, form_id, user_id, owner, title, body) "
+    "VALUES (:doc_id, :kind, :form_id, :user_id, 'u' || :user_id, :title, :body)"
+)
+POSTGRES_UPSERT = text(
+    "INSERT INTO search_documents (doc_id, kind, form_id, user_id, title, body) "
+    "VALUES (:doc_id, :kind, :form_id, :user_id, :title, :body) "
+    "ON CONFLICT (doc_id) DO UPDATE SET kind = excluded.kind, "
+    "form_id = excluded.form_id, user_id = excluded.user_id, "
+    "title = excluded.title, body = excluded.body"
+)
+
+# bm25() is lower-is-better; title matches weigh ten times body matches.
+# The owner filter is part of :query (see ``scope_match_query``).
+SQLITE_SEARCH = text(
+    "SELECT rowid AS doc_id, kind, form_id, CASE WHEN body <> '' "
+    f"THEN snippet(search_documents, 5, '', '', '…', {SNIPPET_WORDS}) "
+    f"ELSE snippet(search_documents, 4, '', '', '…', {SNIPPET_WORDS}) END AS snippet, "
+    "-bm25(search_documents, 0, 0, 0, 0, 10.0, 1.0) AS score "
+    "FROM search_documents "
+    "WHERE search_documents MATCH :query "
+    "ORDER BY score DESC, doc_id DESC LIMIT :limit OFFSET :offset"
+)
+POSTGRES_SEARCH = text(
+    "SELECT doc_id, kind, form_id, "
+    "ts_headline('simple', CASE WHEN body <> '' THEN body ELSE title END, query, "
+    f"'StartSel=\"\", StopSel=\"\", MaxWords={SNIPPET_WORDS}, MinWords=4') AS snippet, "
+    "ts_rank(document, query) AS score "
+    "FROM search_documents, to_tsquery('simple', :query) AS query "
+    "WHERE user_id = :user_id AND document @@ query "
+    "ORDER BY score DESC, doc_id DESC LIMIT :limit OFFSET :offset"
+)
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _strings(value: Any) -> list[str]:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, bool) or value is None:
+        return []
+    if isinstance(value, (int, float)):
+        return [str(value)]
+    if isinstance(value, list):
+        return [part for item in value for part in _strings(item)]
+    if isinstance(value, dict):
+        return [part for item in value.values() for part in _strings(item)]
+    return []
+
+
+def form_document(form: Form) -> dict:
+    parts: list[str] = []
+    for block in form.blocks or []:
+        for key in ("content", "placeholder"):
+            parts.extend(_strings(block.get(key)))
+        for key in ("options", "rows", "columns"):
+            parts.extend(_strings(block.get(key)))
+    return {
+        "doc_id": -form.id,
+        "kind": "form",
+        "form_id": form.id,
+        "user_id": form.user_id,
+        "title": form.title or "",
+        "body": " · ".join(parts),
+    }
+
+
+def submission_document(
+    user_id: int | None, blocks: list[dict], submission: Submission
+) -> dict:
+    data = submission.data or {}
+    parts: list[str] = []
+    for block in blocks or []:
+        block_type = block.get("type")
+        if block_type in NON_ANSWER_BLOCK_TYPES or block_type in UNSEARCHABLE_BLOCK_TYPES:
+            continue
+        value = data.get(block.get("id"))
+        if block_type == "file-upload":
+            value = value.get("name") if isinstance(value, dict) else None
+        parts.extend(_strings(value))
+    return {
+        "doc_id": submission.id,
+        "kind": "submission",
+        "form_id": submission.form_id,
+        "user_id": user_id,
+        "title": "",
+        "body": " · ".join(parts),
+    }
+
+
+async def _upsert(db: AsyncSession, documents: list[dict]) -> None:
+    if documents:
+        await db.execute(POSTGRES_UPSERT if _is_postgres(db) else SQLITE_UPSERT, documents)
+
+
+async def index_form(db: AsyncSession, form: Form) -> None:
+    """Refresh a form's own search document. Does not commit."""
+    await _upsert(db, [form_document(form)])
+
+
+async def index_submissions(
+    db: AsyncSession,
+    forms: dict[int, tuple[int | None, list[dict]]],
+    submissions: list[Submission],
+) -> None:
+    """Add new submissions to the index; ``forms`` maps id to (user_id, blocks)."""
+    documents = []
+    for submission in submissions:
+        user_id, blocks = forms.get(submission.form_id, (None, []))
+        documents.append(submission_document(user_id, blocks, submission))
+    await _upsert(db, documents)
+
+
+async def remove_form(db: AsyncSession, form_id: int) -> None:
+    """Drop a form and all of its submissions from the index."""
+    await db.execute(
+        text("DELETE FROM search_documents WHERE form_id = :form_id"),
+        {"form_id": form_id},
+    )
+
+
+async def ensure_index_populated(db: AsyncSession) -> None:
+    """Build the index on first startup, when it is empty but forms exist."""
+    indexed = await db.scalar(text("SELECT 1 FROM search_documents LIMIT 1"))
+    if indexed or not await db.scalar(select(Form.id).limit(1)):
+        return
+    try:
+        total = await rebuild_index(db)
+    except Exception:
+        # Another worker may be backfilling too; search fills in as forms change.
+        await db.rollback()
+        logger.exception("Backfilling the search index failed")
+        return
+    logger.info("Backfilled the search index with %d document(s)", total)
+
+
+async def rebuild_index(db: AsyncSession) -> int:
+    """Re-index every form and submission. Returns the number of documents."""
+    await db.execute(text("DELETE FROM search_documents"))
+    forms = list(await db.scalars(select(Form)))
+    await _upsert(db, [form_document(form) for form in forms])
+    owners = {form.id: (form.user_id, form.blocks or []) for form in forms}
+
+    total = len(forms)
+    result = await db.stream_scalars(
+        select(Submission).execution_options(yield_per=REINDEX_BATCH_SIZE)
+    )
+    async for batch in result.partitions():
+        await index_submissions(db, owners, batch)
+        total += len(batch)
+    await db.commit()
+    return total
+
+
+def build_match_query(query: str, postgres: bool) -> str | None:
+    """Turn free text into a prefix-matching AND query, or None if empty.
+
+    Only word characters survive, so user input never reaches the FTS
+    query syntax.
+    """
+    tokens = SEARCH_TOKEN_PATTERN.findall(query.lower())[:MAX_QUERY_TOKENS]
+    if not tokens:
+        return None
+    if postgres:
+        return " & ".join(f"{token}:*" for token in tokens)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def scope_match_query(match: str, user_id: int) -> str:
+    """Restrict an FTS5 query to one owner's documents.
+
+    Filtering inside MATCH lets FTS5 intersect the owner token's posting
+    list instead of checking every user's hits afterwards.
+    """
+    return f"owner : u{user_id} AND {{title body}} : ({match})"
+
+
+async def search(
+    db: AsyncSession, user_id: int, query: str, limit: int = 20, offset: int = 0
+) -> SearchResults:
+    postgres = _is_postgres(db)
+    match = build_match_query(query, postgres)
+    if match is None:
+        return SearchResults()
+    if not postgres:
+        match = scope_match_query(match, user_id)
+
+    result = await db.execute(
+        POSTGRES_SEARCH if postgres else SQLITE_SEARCH,
+        {"query": match, "user_id": user_id, "limit": limit + 1, "offset": offset},
+    )
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    titles: dict[int, str] = {}
+    if rows:
+        form_ids = {row.form_id for row in rows}
+        titles = dict(
+            (await db.execute(select(Form.id, Form.title).where(Form.id.in_(form_ids)))).all()
+        )
+
+    items = [
+        SearchHit(
+            kind=row.kind,
+            form_id=row.form_id,
+            form_title=titles[row.form_id] or "",
+            submission_id=row.doc_id if row.kind == "submission" else None,
+            snippet=row.snippet or "",
+            score=float(row.score),
+        )
+        for row in rows
+        if row.form_id in titles
+    ]
+    return SearchResults(items=items, next_offset=offset + limit if has_more else None)
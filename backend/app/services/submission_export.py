@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from sqlalchemy import select
+
+from ..db import SessionLocal
+from ..models import Submission
+
+EXPORT_BATCH_SIZE = 500
+
+NON_ANSWER_BLOCK_TYPES = {
+    "text",
+    "title",
+    "label",
+    "heading1",
+    "heading2",
+    "heading3",
+    "paragraph",
+    "divider",
+    "image",
+    "video",
+    "audio",
+    "embed",
+    "page-break",
+    "new-page",
+    "thank-you-page",
+    "conditional-logic",
+    "recaptcha",
+    "payment",
+    "wallet-connect",
+}
+
+Column = tuple[str, Callable[[dict], Any]]
+
+
+def _join(value: Any) -> Any:
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    return value
+
+
+def _answer(block_id: str) -> Callable[[dict], Any]:
+    return lambda data: _join(data.get(block_id))
+
+
+def _matrix_cell(block_id: str, row: str) -> Callable[[dict], Any]:
+    def extract(data: dict) -> Any:
+        value = data.get(block_id)
+        return value.get(row) if isinstance(value, dict) else None
+
+    return extract
+
+
+def _file_field(block_id: str, field: str) -> Callable[[dict], Any]:
+    def extract(data: dict) -> Any:
+        value = data.get(block_id)
+        return value.get(field) if isinstance(value, dict) else None
+
+    return extract
+
+
+def build_columns(blocks: list[dict]) -> list[Column]:
+    """Derive flat export columns from a form's blocks.
+
+    Matrix blocks expand to one column per row, file uploads to their
+    metadata (the file payload itself is never exported), and list answers
+    such as checkboxes or rankings are joined into a single cell.
+    """
+    columns: list[Column] = []
+    seen_labels: set[str] = set()
+    for block in blocks:
+        block_id = block.get("id")
+        block_type = block.get("type")
+        if not block_id or block_type in NON_ANSWER_BLOCK_TYPES:
+            continue
+        label = (block.get("content") or "").strip() or block_id
+        if label in seen_labels:
+            label = f"{label} ({block_id})"
+        seen_labels.add(label)
+
+        if block_type == "matrix":
+            for row in block.get("rows") or []:
+                columns.append((f"{label} [{row}]", _matrix_cell(block_id, row)))
+        elif block_type == "file-upload":
+            for field in ("name", "type", "size"):
+                columns.append((f"{label} [{field}]", _file_field(block_id, field)))
+        else:
+            columns.append((label, _answer(block_id)))
+    return columns
+
+
+async def _iter_rows(form_id: int) -> AsyncIterator[tuple[int, Any, dict]]:
+    # The request-scoped session is closed before the body streams, so the
+    # export owns its session for the lifetime of the response.
+    async with SessionLocal() as db:
+        statement = (
+            select(Submission.id, Submission.created_at, Submission.data)
+            .where(Submission.form_id == form_id)
+            .order_by(Submission.created_at, Submission.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        result = await db.stream(statement)
+        async for submission_id, created_at, data in result:
+            yield submission_id, created_at, data or {}
+
+
+async def stream_csv(form_id: int, blocks: list[dict]) -> AsyncIterator[str]:
+    columns = build_columns(blocks)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Response ID", "Created At", *(name for name, _ in columns)])
+
+    index = 0
+    async for submission_id, created_at, data in _iter_rows(form_id):
+        index += 1
+        writer.writerow(
+            [submission_id, created_at.isoformat(), *(extract(data) for _, extract in columns)]
+        )
+        if index % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def stream_ndjson(form_id: int, blocks: list[dict]) -> AsyncIterator[str]:
+    columns = build_columns(blocks)
+    chunk: list[str] = []
+
+    async for submission_id, created_at, data in _iter_rows(form_id):
+        record = {"id": submission_id, "created_at": created_at.isoformat()}
+        record.update((name, extract(data)) for name, extract in columns)
+        chunk.append(json.dumps(record, default=str))
+        if len(chunk) == EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+
+    if chunk:
+        yield "\n".join(chunk) + "\n"
@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass
+
+from fastapi import HTTPException
+from sqlalchemy import Float, String, exists, func, literal, literal_column, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..models import Form
+
+NUMERIC_FILTER_TYPES = {"number", "rating", "linear-scale"}
+MULTI_VALUE_FILTER_TYPES = {"checkboxes"}
+UNFILTERABLE_TYPES = {"matrix", "file-upload", "signature"}
+
+TEXT_OPERATORS = {"eq", "ne", "contains"}
+NUMERIC_OPERATORS = {"eq", "ne", "gt", "gte", "lt", "lte"}
+MULTI_VALUE_OPERATORS = {"eq", "ne"}
+
+# Block ids are embedded in JSON paths as SQL literals rather than bound
+# parameters so filter expressions match the expression indexes built from
+# the same helper.
+BLOCK_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+@dataclass(frozen=True)
+class AnswerFilter:
+    block_id: str
+    op: str
+    value: str
+
+
+def parse_filter(raw: str) -> AnswerFilter:
+    """Parse ``block_id:op:value``; the value itself may contain colons."""
+    block_id, sep, rest = raw.partition(":")
+    op, sep2, value = rest.partition(":")
+    if not sep or not sep2 or not block_id or not op:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid filter '{raw}'. Use block_id:op:value.",
+        )
+    return AnswerFilter(block_id=block_id, op=op, value=value)
+
+
+def _json_path(block_id: str) -> str:
+    return f"'$.\"{block_id}\"'"
+
+
+def answer_sql(
+    dialect: str, block_id: str, numeric: bool = False, column: str = "submissions.data"
+) -> str:
+    """Raw SQL for one answer value, shared by filters and index DDL."""
+    if dialect == "postgresql":
+        sql = f"({column} ->> '{block_id}')"
+        return f"CAST({sql} AS DOUBLE PRECISION)" if numeric else sql
+    sql = f"json_extract({column}, {_json_path(block_id)})"
+    return f"CAST({sql} AS REAL)" if numeric else sql
+
+
+def _contains_option(dialect: str, block_id: str, value: str) -> ColumnElement:
+    if dialect == "postgresql":
+        answer = literal_column(f"(CAST(submissions.data AS JSONB) -> '{block_id}')")
+        return answer.op("@>")(func.jsonb_build_array(literal(value, String)))
+    options = func.json_each(
+        literal_column("submissions.data"), literal_column(_json_path(block_id))
+    ).table_valued("value")
+    return exists(select(1).select_from(options).where(options.c.value == value))
+
+
+def _compare(expression: ColumnElement, op: str, value: ColumnElement) -> ColumnElement:
+    if op == "eq":
+        return expression == value
+    if op == "ne":
+        return expression != value
+    if op == "gt":
+        return expression > value
+    if op == "gte":
+        return expression >= value
+    if op == "lt":
+        return expression < value
+    return expression <= value
+
+
+def compile_filter(dialect: str, blocks: dict[str, dict], item: AnswerFilter) -> ColumnElement:
+    block = blocks.get(item.block_id)
+    if block is None or not BLOCK_ID_PATTERN.match(item.block_id):
+        raise HTTPException(status_code=400, detail=f"Unknown block '{item.block_id}'")
+    block_type = block.get("type") or ""
+    if block_type in UNFILTERABLE_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Block '{item.block_id}' cannot be filtered"
+        )
+
+    if block_type in MULTI_VALUE_FILTER_TYPES:
+        allowed = MULTI_VALUE_OPERATORS
+    elif block_type in NUMERIC_FILTER_TYPES:
+        allowed = NUMERIC_OPERATORS
+    else:
+        allowed = TEXT_OPERATORS
+    if item.op not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Operator '{item.op}' is not supported for {block_type or 'this'} blocks. "
+            f"Use one of: {', '.join(sorted(allowed))}",
+        )
+
+    if block_type in MULTI_VALUE_FILTER_TYPES:
+        condition = _contains_option(dialect, item.block_id, item.value)
+        return condition if item.op == "eq" else ~condition
+
+    if block_type in NUMERIC_FILTER_TYPES:
+        try:
+            number = float(item.value)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Filter value for '{item.block_id}' must be a number",
+            ) from exc
+        expression = literal_column(answer_sql(dialect, item.block_id, numeric=True), Float)
+        return _compare(expression, item.op, literal(number, Float))
+
+    expression = literal_column(answer_sql(dialect, item.block_id), String)
+    if item.op == "contains":
+        escaped = re.sub(r"([/%_])", r"/\1", item.value)
+        return expression.ilike(literal(f"%{escaped}%", String), escape="/")
+    return _compare(expression, item.op, literal(item.value, String))
+
+
+def compile_filters(
+    dialect: str, form: Form, filters: list[AnswerFilter]
+) -> list[ColumnElement]:
+    """Compile answer filters into SQL conditions typed by the form's blocks."""
+    blocks = {block.get("id"): block for block in form.blocks or [] if block.get("id")}
+    return [compile_filter(dialect, blocks, item) for item in filters]
+
+
+def answer_index_name(block_id: str, numeric: bool) -> str:
+    kind = "num" if numeric else "text"
+    return f"ix_submissions_answer_{kind}_{block_id.replace('-', '_')}"
+
+
+def answer_index_ddl(dialect: str, block_id: str, numeric: bool = False) -> str:
+    """``CREATE INDEX`` for filtering one block id, scoped by ``form_id``."""
+    if not BLOCK_ID_PATTERN.match(block_id):
+        raise ValueError(f"Invalid block id {block_id!r}")
+    expression = answer_sql(dialect, block_id, numeric=numeric, column="data")
+    return (
+        f"CREATE INDEX IF NOT EXISTS {answer_index_name(block_id, numeric)} "
+        f"ON submissions (form_id, ({expression}))"
+    )
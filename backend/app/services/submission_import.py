@@ -0,0 +1,127 @@
+import os
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Form
+from ..schemas import ImportRowError, SubmissionImportResult
+from .submission_service import insert_submissions, store_file_answers
+from .submission_validation import get_form_validator
+
+# Valid rows are inserted and committed this many at a time.
+SUBMISSION_IMPORT_CHUNK_SIZE = int(os.getenv("SUBMISSION_IMPORT_CHUNK_SIZE", "500"))
+# Rejected rows are all counted, but only this many are described.
+SUBMISSION_IMPORT_MAX_ERRORS = int(os.getenv("SUBMISSION_IMPORT_MAX_ERRORS", "100"))
+SUBMISSION_IMPORT_MAX_LINE_BYTES = int(
+    os.getenv("SUBMISSION_IMPORT_MAX_LINE_BYTES", str(2 * 1024 * 1024))
+)
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without buffering the whole body."""
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > SUBMISSION_IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"NDJSON lines are limited to {SUBMISSION_IMPORT_MAX_LINE_BYTES} bytes",
+            )
+    if buffer:
+        yield buffer
+
+
+def parse_row(line: bytes) -> tuple[dict, datetime]:
+    """Read one ``{"data": {...}, "created_at": "..."}`` line.
+
+    ``created_at`` is optional, for keeping the original timestamps of
+    migrated responses; it is stored as naive UTC like the rest.
+    """
+    try:
+        row = orjson.loads(line)
+    except orjson.JSONDecodeError as exc:
+        raise ValueError(f"Invalid JSON: {exc}") from exc
+    if not isinstance(row, dict) or not isinstance(row.get("data"), dict):
+        raise ValueError('Each line must be an object with a "data" object')
+
+    created_at = row.get("created_at")
+    if created_at is None:
+        return row["data"], datetime.utcnow()
+    try:
+        parsed = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("created_at must be an ISO 8601 timestamp") from exc
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return row["data"], parsed
+
+
+async def import_submissions(
+    db: AsyncSession,
+    form: Form,
+    lines: AsyncIterator[bytes],
+    dry_run: bool = False,
+) -> SubmissionImportResult:
+    """Validate NDJSON submission rows and insert the valid ones.
+
+    Rows go through the form's compiled validator one after another and
+    invalid ones are reported by line number instead of failing the
+    import. Valid rows are written with ``insert_submissions`` in chunks of
+    ``SUBMISSION_IMPORT_CHUNK_SIZE``, one transaction per chunk, so a
+    failure part-way keeps the chunks already committed. reCAPTCHA tokens
+    are not verified: the caller is the form's owner.
+    """
+    form_id = form.id
+    validator = get_form_validator(form)
+    result = SubmissionImportResult()
+    chunk: list[dict] = []
+
+    def reject(line_number: int, errors: list[dict]) -> None:
+        result.failed += 1
+        if len(result.errors) < SUBMISSION_IMPORT_MAX_ERRORS:
+            result.errors.append(ImportRowError(line=line_number, errors=errors))
+        else:
+            result.errors_truncated = True
+
+    async def flush() -> None:
+        await insert_submissions(db, chunk)
+        await db.commit()
+        result.imported += len(chunk)
+        chunk.clear()
+
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            data, created_at = parse_row(line)
+        except ValueError as exc:
+            reject(line_number, [{"block_id": None, "message": str(exc)}])
+            continue
+        errors = validator.errors(data)
+        if errors:
+            reject(line_number, errors)
+            continue
+        try:
+            data = await store_file_answers(validator, data, write=not dry_run)
+        except HTTPException as exc:
+            reject(line_number, exc.detail["errors"])
+            continue
+        if dry_run:
+            # Nothing is written, so there is no reason to hold the rows.
+            result.imported += 1
+            continue
+        chunk.append({"form_id": form_id, "data": data, "created_at": created_at})
+        if len(chunk) >= SUBMISSION_IMPORT_CHUNK_SIZE:
+            await flush()
+
+    if chunk:
+        await flush()
+    return result
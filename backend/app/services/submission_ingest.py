@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import SessionLocal
+from ..models import Submission
+from ..schemas import SubmissionCreate
+from .submission_service import insert_submissions, prepare_submission_for_share
+
+logger = logging.getLogger(__name__)
+
+# "sync" writes each submission in its own transaction; "batched" queues
+# validated submissions for a background writer.
+SUBMISSION_INGEST_MODE = os.getenv("SUBMISSION_INGEST_MODE", "sync")
+SUBMISSION_INGEST_MAX_BATCH = int(os.getenv("SUBMISSION_INGEST_MAX_BATCH", "200"))
+SUBMISSION_INGEST_MAX_LATENCY_MS = int(
+    os.getenv("SUBMISSION_INGEST_MAX_LATENCY_MS", "50")
+)
+SUBMISSION_INGEST_QUEUE_SIZE = int(os.getenv("SUBMISSION_INGEST_QUEUE_SIZE", "10000"))
+# Queued submissions that cannot be written are appended here as NDJSON.
+SUBMISSION_INGEST_DEAD_LETTER_PATH = os.getenv(
+    "SUBMISSION_INGEST_DEAD_LETTER_PATH", "ingest-dead-letter.ndjson"
+)
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+@dataclass
+class PendingSubmission:
+    form_id: int
+    data: dict
+    provisional_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    queued_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class SubmissionIngestor:
+    """Background writer task that commits queued submissions in batches.
+
+    A batch is flushed once it reaches ``max_batch_size`` items or the
+    oldest item has waited ``max_latency`` seconds, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_batch_size: int = SUBMISSION_INGEST_MAX_BATCH,
+        max_latency: float = SUBMISSION_INGEST_MAX_LATENCY_MS / 1000,
+        queue_size: int = SUBMISSION_INGEST_QUEUE_SIZE,
+        dead_letter_path: str = SUBMISSION_INGEST_DEAD_LETTER_PATH,
+    ) -> None:
+        self.session_factory = session_factory
+        self.dead_letter_path = dead_letter_path
+        # Only touched from the event loop, so no lock is needed.
+        self.dead_lettered = 0
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.queue_size = queue_size
+        self._queue: "asyncio.Queue[PendingSubmission | None] | None" = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        """Start the writer on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(self.queue_size)
+        self._task = asyncio.create_task(self._run(), name="submission-ingest")
+
+    async def stop(self) -> None:
+        """Flush everything already queued, then stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def submit(self, form_id: int, data: dict) -> PendingSubmission:
+        if not self.running:
+            raise IngestQueueFull()
+        pending = PendingSubmission(form_id=form_id, data=data)
+        try:
+            self._queue.put_nowait(pending)
+        except asyncio.QueueFull as exc:
+            raise IngestQueueFull() from exc
+        return pending
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[PendingSubmission]) -> None:
+        rows = [{"form_id": item.form_id, "data": item.data} for item in batch]
+        async with self.session_factory() as db:
+            try:
+                await insert_submissions(db, rows)
+                await db.commit()
+                return
+            except Exception:
+                await db.rollback()
+                logger.exception(
+                    "Batch insert of %d submissions failed; retrying individually",
+                    len(rows),
+                )
+
+        # Isolate the offending rows so one bad submission does not drop the
+        # rest of the batch.
+        for item, row in zip(batch, rows):
+            async with self.session_factory() as db:
+                try:
+                    await insert_submissions(db, [row])
+                    await db.commit()
+                except Exception as exc:
+                    await db.rollback()
+                    logger.exception(
+                        "Queued submission %s for form %s failed; dead-lettering it",
+                        item.provisional_id,
+                        item.form_id,
+                    )
+                    await self._dead_letter(item, exc)
+
+    def _append_dead_letter(self, line: str) -> None:
+        with open(self.dead_letter_path, "a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+    async def _dead_letter(self, item: PendingSubmission, exc: Exception) -> None:
+        """Keep a submission the client was already told was accepted.
+
+        Lines carry ``data`` and ``created_at``, so once the cause is fixed
+        they can be replayed per form through the bulk import endpoint.
+        """
+        self.dead_lettered += 1
+        line = json.dumps(
+            {
+                "form_id": item.form_id,
+                "provisional_id": item.provisional_id,
+                "created_at": item.queued_at.isoformat(),
+                "data": item.data,
+                "error": repr(exc),
+            },
+            default=str,
+        )
+        try:
+            await asyncio.to_thread(self._append_dead_letter, line)
+        except OSError:
+            logger.exception(
+                "Could not dead-letter submission %s; payload follows: %s",
+                item.provisional_id,
+                line,
+            )
+
+
+ingestor = SubmissionIngestor()
+
+
+def is_batched() -> bool:
+    return SUBMISSION_INGEST_MODE == "batched"
+
+
+async def ingest_submission(
+    db: AsyncSession,
+    share_id: str,
+    payload: SubmissionCreate,
+) -> Submission | PendingSubmission:
+    """Validate a public submission and queue it for the batch writer.
+
+    Falls back to a synchronous write when the queue is full so that a
+    backlog slows submitters down instead of dropping their answers.
+    """
+    form, data = await prepare_submission_for_share(db, share_id, payload)
+    try:
+        return ingestor.submit(form.id, data)
+    except IngestQueueFull:
+        logger.warning("Submission ingest queue is full; writing synchronously")
+    [submission] = await insert_submissions(db, [{"form_id": form.id, "data": data}])
+    await db.commit()
+    return submission
@@ -1,96 +1,252 @@
-import os
+import base64
+import binascii
+from datetime import datetime
+from urllib.parse import unquote_to_bytes
 
-import requests
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import Form, Submission
 from ..schemas import SubmissionCreate
-from ..services.submission_validation import validate_submission
+from ..services import insights_service, recaptcha, search_service
+from ..services.blob_store import get_blob_store
+from ..services.submission_filters import AnswerFilter, compile_filters
+from ..services.submission_validation import (
+    FILE_UPLOAD_MAX_BYTES,
+    CompiledValidator,
+    get_form_validator,
+)
 
 
-def verify_recaptcha(token: str) -> bool:
-    """Verify reCAPTCHA token with Google."""
-    secret_key = os.getenv("RECAPTCHA_SECRET_KEY")
-    if not secret_key:
-        raise HTTPException(
-            status_code=500,
-            detail="reCAPTCHA is not configured on the server"
-        )
-    
+def encode_cursor(submission: Submission) -> str:
+    raw = f"{submission.created_at.isoformat()}|{submission.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
     try:
-        response = requests.post(
-            "https://www.google.com/recaptcha/api/siteverify",
-            data={
-                "secret": secret_key,
-                "response": token
-            },
-            timeout=10
-        )
-        result = response.json()
-        return result.get("success", False)
-    except Exception as exc:
-        raise HTTPException(
-            status_code=500,
-            detail=f"reCAPTCHA verification failed: {str(exc)}"
-        ) from exc
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, submission_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(submission_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
-def list_submissions_for_form(
-    db: Session,
+async def list_submissions_for_form(
+    db: AsyncSession,
     form_id: int,
     user_id: int,
-) -> list[Submission]:
-    form = (
-        db.query(Form)
-        .filter(Form.id == form_id, Form.user_id == user_id)
-        .first()
+    limit: int = 50,
+    cursor: str | None = None,
+    filters: list[AnswerFilter] | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list[Submission], str | None]:
+    """Return one page of submissions, newest first, and the next cursor.
+
+    Pages are keyed on ``(created_at, id)`` so every fetch is an index range
+    scan on ``ix_submissions_form_created_id`` regardless of depth. Answer
+    filters compile to JSON-path conditions evaluated in the database;
+    ``since`` is inclusive and ``until`` exclusive.
+    """
+    form = await db.scalar(
+        select(Form).where(Form.id == form_id, Form.user_id == user_id)
     )
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
 
-    return (
-        db.query(Submission)
-        .filter(Submission.form_id == form_id)
-        .order_by(Submission.created_at.desc())
-        .all()
+    statement = select(Submission).where(Submission.form_id == form_id)
+    if filters:
+        statement = statement.where(
+            *compile_filters(db.get_bind().dialect.name, form, filters)
+        )
+    if since:
+        statement = statement.where(Submission.created_at >= since)
+    if until:
+        statement = statement.where(Submission.created_at < until)
+    if cursor:
+        created_at, submission_id = decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                Submission.created_at < created_at,
+                and_(
+                    Submission.created_at == created_at,
+                    Submission.id < submission_id,
+                ),
+            )
+        )
+
+    rows = list(
+        await db.scalars(
+            statement.order_by(Submission.created_at.desc(), Submission.id.desc())
+            .limit(limit + 1)
+        )
+    )
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+async def get_submission_file(
+    db: AsyncSession,
+    form_id: int,
+    submission_id: int,
+    block_id: str,
+    user_id: int,
+) -> dict:
+    """Return the stored file answer for one block of a submission."""
+    submission = await db.scalar(
+        select(Submission)
+        .join(Form, Form.id == Submission.form_id)
+        .where(
+            Submission.id == submission_id,
+            Submission.form_id == form_id,
+            Form.user_id == user_id,
+        )
+    )
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    value = (submission.data or {}).get(block_id)
+    if not isinstance(value, dict) or not (value.get("blob_id") or value.get("data")):
+        raise HTTPException(status_code=404, detail="File not found")
+    return value
+
+
+def submission_payload(submission: Submission) -> dict:
+    """``SubmissionOut`` as a plain dict, with the stored answers as-is."""
+    return {
+        "id": submission.id,
+        "form_id": submission.form_id,
+        "data": submission.data,
+        "created_at": submission.created_at,
+    }
+
+
+async def insert_submissions(db: AsyncSession, rows: list[dict]) -> list[Submission]:
+    """Bulk insert submission rows and keep per-form counters, insights
+    rollups and the search index in step.
+
+    ``rows`` are ``{"form_id": ..., "data": ...}`` mappings. The caller owns
+    the transaction; nothing is committed here.
+    """
+    if not rows:
+        return []
+
+    submissions = list(
+        await db.scalars(insert(Submission).returning(Submission), rows)
+    )
+
+    counts: dict[int, int] = {}
+    for row in rows:
+        counts[row["form_id"]] = counts.get(row["form_id"], 0) + 1
+    owners: dict[int, tuple[int | None, list[dict]]] = {}
+    for form_id, count in counts.items():
+        result = await db.execute(
+            update(Form)
+            .where(Form.id == form_id)
+            .values(response_count=Form.response_count + count)
+            .returning(Form.user_id, Form.blocks)
+        )
+        owners[form_id] = tuple(result.one())
+    await insights_service.apply_rollups(
+        db, {form_id: blocks for form_id, (_, blocks) in owners.items()}, submissions
     )
+    await search_service.index_submissions(db, owners, submissions)
+    return submissions
+
+
+def decode_file_data(raw: str) -> bytes:
+    """Decode a file answer's ``data`` (a data URL or bare base64)."""
+    if raw.startswith("data:"):
+        header, _, body = raw.partition(",")
+        if ";base64" not in header:
+            return unquote_to_bytes(body)
+        raw = body
+    return base64.b64decode(raw, validate=True)
+
+
+async def store_file_answers(
+    validator: CompiledValidator, data: dict, write: bool = True
+) -> dict:
+    """Move file-upload payloads into the blob store.
+
+    Each inline ``data`` string is replaced by a ``blob_id`` reference so
+    submission rows only carry file metadata. With ``write=False`` the
+    payloads are only decoded and size-checked, and ``data`` is returned
+    unchanged.
+    """
+    if not validator.file_block_ids:
+        return data
 
+    stored = dict(data)
+    errors: list[dict] = []
+    for block_id in validator.file_block_ids:
+        value = stored.get(block_id)
+        if not isinstance(value, dict) or not isinstance(value.get("data"), str):
+            continue
+        try:
+            content = decode_file_data(value["data"])
+        except (binascii.Error, ValueError):
+            errors.append({"block_id": block_id, "message": "Upload a valid file."})
+            continue
+        if len(content) > FILE_UPLOAD_MAX_BYTES:
+            errors.append({"block_id": block_id, "message": "File exceeds size limit."})
+            continue
+        if not write:
+            continue
+        stored[block_id] = {
+            "name": value.get("name"),
+            "type": value.get("type"),
+            "size": len(content),
+            "blob_id": await get_blob_store().put(content),
+        }
 
-def create_submission_for_share(
-    db: Session,
+    if errors:
+        raise HTTPException(status_code=422, detail={"errors": errors})
+    return stored
+
+
+async def prepare_submission_for_share(
+    db: AsyncSession,
     share_id: str,
     payload: SubmissionCreate,
-) -> Submission:
-    form = db.query(Form).filter(Form.share_id == share_id).first()
+) -> tuple[Form, dict]:
+    """Look up the shared form, run reCAPTCHA and answer validation.
+
+    Returns the form and the answers as they should be stored.
+    """
+    form = await db.scalar(select(Form).where(Form.share_id == share_id))
     if not form:
         raise HTTPException(status_code=404, detail="Form not found")
     
-    # Check if form has reCAPTCHA block
-    has_recaptcha = any(
-        block.get("type") == "recaptcha" 
-        for block in (form.blocks or [])
-    )
-    
+    validator = get_form_validator(form)
+
     # Verify reCAPTCHA if required
-    if has_recaptcha:
+    if validator.requires_recaptcha:
         if not payload.recaptchaToken:
             raise HTTPException(
                 status_code=422,
                 detail="reCAPTCHA verification is required"
             )
-        if not verify_recaptcha(payload.recaptchaToken):
+        if not await recaptcha.verify_recaptcha(payload.recaptchaToken):
             raise HTTPException(
                 status_code=422,
                 detail="reCAPTCHA verification failed. Please try again."
             )
 
-    validate_submission(form.blocks or [], payload.data)
+    validator.validate(payload.data)
+    return form, await store_file_answers(validator, payload.data)
+
 
-    submission = Submission(form_id=form.id, data=payload.data)
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
+async def create_submission_for_share(
+    db: AsyncSession,
+    share_id: str,
+    payload: SubmissionCreate,
+) -> Submission:
+    form, data = await prepare_submission_for_share(db, share_id, payload)
+    [submission] = await insert_submissions(db, [{"form_id": form.id, "data": data}])
+    await db.commit()
     return submission
 
 
@@ -1,14 +1,41 @@
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
 from typing import Any
 from urllib.parse import urlparse
 
 from fastapi import HTTPException
 
+from ..metrics import submission_validation_seconds
+from ..models import Form
+from . import invalidation
+
 EMAIL_PATTERN = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
 PHONE_PATTERN = re.compile(r"^[+0-9()\s-]{6,}$")
 DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 TIME_PATTERN = re.compile(r"^\d{2}:\d{2}$")
 
+TEXT_BLOCK_TYPES = {
+    "short-answer",
+    "long-answer",
+    "text",
+    "paragraph",
+    "title",
+    "label",
+    "thank-you-page",
+}
+
+FILE_UPLOAD_MAX_BYTES = 1 * 1024 * 1024
+
+VALIDATOR_CACHE_SIZE = int(os.getenv("VALIDATOR_CACHE_SIZE", "256"))
+
+# A block check returns an error message, or None when the value is valid.
+BlockCheck = Callable[[Any], str | None]
+
 
 def _is_empty(value: Any) -> bool:
     if value is None:
@@ -59,158 +86,297 @@ def _matches_allowed_type(file_type: str, allowed: list[str], file_name: str | N
     return False
 
 
-def validate_submission(blocks: list[dict], data: dict) -> None:
-    errors: list[dict] = []
+def _pattern_check(pattern: re.Pattern, message: str) -> BlockCheck:
+    def check(value: Any) -> str | None:
+        if not isinstance(value, str) or not pattern.match(value):
+            return message
+        return None
 
-    for block in blocks:
-        block_id = block.get("id")
-        block_type = block.get("type")
-        required = bool(block.get("required"))
-        value = data.get(block_id)
+    return check
 
-        if block_type in {"payment", "wallet-connect"}:
-            # PAYMENT AND WALLET-CONNECT DISABLED - Skipping validation
-            continue
 
-        if required and _is_empty(value):
-            errors.append({"block_id": block_id, "message": "This field is required."})
-            continue
+def _check_text(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return "Must be text."
+    return None
 
-        if _is_empty(value):
-            continue
 
-        if block_type in {
-            "short-answer",
-            "long-answer",
-            "text",
-            "paragraph",
-            "title",
-            "label",
-            "thank-you-page",
-        }:
-            if not isinstance(value, str):
-                errors.append({"block_id": block_id, "message": "Must be text."})
-        elif block_type == "email":
-            if not isinstance(value, str) or not EMAIL_PATTERN.match(value):
-                errors.append({"block_id": block_id, "message": "Enter a valid email."})
-        elif block_type == "number":
-            if isinstance(value, (int, float)):
-                pass
-            elif isinstance(value, str):
-                try:
-                    float(value)
-                except ValueError:
-                    errors.append({"block_id": block_id, "message": "Enter a valid number."})
-            else:
-                errors.append({"block_id": block_id, "message": "Enter a valid number."})
-        elif block_type == "url":
-            if not isinstance(value, str) or not _is_valid_url(value):
-                errors.append({"block_id": block_id, "message": "Enter a valid URL."})
-        elif block_type == "phone":
-            if not isinstance(value, str) or not PHONE_PATTERN.match(value):
-                errors.append(
-                    {"block_id": block_id, "message": "Enter a valid phone number."}
-                )
-        elif block_type == "date":
-            if not isinstance(value, str) or not DATE_PATTERN.match(value):
-                errors.append({"block_id": block_id, "message": "Enter a valid date."})
-        elif block_type == "time":
-            if not isinstance(value, str) or not TIME_PATTERN.match(value):
-                errors.append({"block_id": block_id, "message": "Enter a valid time."})
-        elif block_type in {"multiple-choice", "dropdown"}:
-            options = block.get("options") or []
-            if not isinstance(value, str) or value not in options:
-                errors.append({"block_id": block_id, "message": "Select a valid option."})
-        elif block_type in {"checkboxes"}:
-            options = set(block.get("options") or [])
-            if not isinstance(value, list) or not all(
-                isinstance(item, str) and item in options for item in value
-            ):
-                errors.append({"block_id": block_id, "message": "Select valid options."})
-        elif block_type == "linear-scale":
-            scale_min = block.get("scaleMin", 1)
-            scale_max = block.get("scaleMax", 5)
-            try:
-                numeric = float(value)
-            except (TypeError, ValueError):
-                errors.append({"block_id": block_id, "message": "Select a valid value."})
-                continue
-            if numeric < scale_min or numeric > scale_max:
-                errors.append({"block_id": block_id, "message": "Select a valid value."})
-        elif block_type == "rating":
-            rating_max = block.get("ratingMax", 5)
-            try:
-                numeric = float(value)
-            except (TypeError, ValueError):
-                errors.append({"block_id": block_id, "message": "Select a valid rating."})
-                continue
-            if numeric < 1 or numeric > rating_max:
-                errors.append({"block_id": block_id, "message": "Select a valid rating."})
-        elif block_type == "matrix":
-            if not isinstance(value, dict):
-                errors.append({"block_id": block_id, "message": "Complete the matrix."})
-                continue
-            rows = block.get("rows") or []
-            columns = set(block.get("columns") or [])
-            for row in rows:
-                selected = value.get(row)
-                if required and (not selected or selected not in columns):
-                    errors.append({"block_id": block_id, "message": "Complete the matrix."})
-                    break
-                if selected and selected not in columns:
-                    errors.append({"block_id": block_id, "message": "Select valid options."})
-                    break
-        elif block_type == "ranking":
-            options = block.get("options") or []
-            if not isinstance(value, list):
-                errors.append({"block_id": block_id, "message": "Provide a ranking."})
-                continue
-            if len(set(value)) != len(value) or not all(
-                isinstance(item, str) and item in options for item in value
-            ):
-                errors.append({"block_id": block_id, "message": "Provide a valid ranking."})
-        elif block_type == "file-upload":
-            if not isinstance(value, dict):
-                errors.append({"block_id": block_id, "message": "Upload a valid file."})
+def _check_number(value: Any) -> str | None:
+    if isinstance(value, (int, float)):
+        return None
+    if isinstance(value, str):
+        try:
+            float(value)
+        except ValueError:
+            return "Enter a valid number."
+        return None
+    return "Enter a valid number."
+
+
+def _check_url(value: Any) -> str | None:
+    if not isinstance(value, str) or not _is_valid_url(value):
+        return "Enter a valid URL."
+    return None
+
+
+def _check_signature(value: Any) -> str | None:
+    if not isinstance(value, str) or not value.startswith("data:image/"):
+        return "Add a signature."
+    return None
+
+
+def _check_country(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return "Country is required."
+    return None
+
+
+def _check_recaptcha(value: Any) -> str | None:
+    if value != "verified":
+        return "Verify reCAPTCHA."
+    return None
+
+
+def _check_hidden_field(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return "Hidden field is invalid."
+    return None
+
+
+def _choice_check(block: dict) -> BlockCheck:
+    options = frozenset(block.get("options") or [])
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, str) or value not in options:
+            return "Select a valid option."
+        return None
+
+    return check
+
+
+def _checkboxes_check(block: dict) -> BlockCheck:
+    options = frozenset(block.get("options") or [])
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, list) or not all(
+            isinstance(item, str) and item in options for item in value
+        ):
+            return "Select valid options."
+        return None
+
+    return check
+
+
+def _range_check(low: float, high: float, message: str) -> BlockCheck:
+    def check(value: Any) -> str | None:
+        try:
+            numeric = float(value)
+        except (TypeError, ValueError):
+            return message
+        if numeric < low or numeric > high:
+            return message
+        return None
+
+    return check
+
+
+def _matrix_check(block: dict, required: bool) -> BlockCheck:
+    rows = tuple(block.get("rows") or [])
+    columns = frozenset(block.get("columns") or [])
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, dict):
+            return "Complete the matrix."
+        for row in rows:
+            selected = value.get(row)
+            if required and (not selected or selected not in columns):
+                return "Complete the matrix."
+            if selected and selected not in columns:
+                return "Select valid options."
+        return None
+
+    return check
+
+
+def _ranking_check(block: dict) -> BlockCheck:
+    options = frozenset(block.get("options") or [])
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, list):
+            return "Provide a ranking."
+        if len(set(value)) != len(value) or not all(
+            isinstance(item, str) and item in options for item in value
+        ):
+            return "Provide a valid ranking."
+        return None
+
+    return check
+
+
+def _file_upload_check(block: dict) -> BlockCheck:
+    allowed = list(block.get("fileAllowedTypes") or [])
+
+    def check(value: Any) -> str | None:
+        if not isinstance(value, dict):
+            return "Upload a valid file."
+        file_name = value.get("name")
+        file_type = value.get("type")
+        file_data = value.get("data")
+        file_size = value.get("size")
+        if not file_name or not file_type or not file_data or not isinstance(file_data, str):
+            return "Upload a valid file."
+        if isinstance(file_size, (int, float)) and file_size > FILE_UPLOAD_MAX_BYTES:
+            return "File exceeds size limit."
+        if not _matches_allowed_type(file_type, allowed, file_name):
+            return "File type not allowed."
+        return None
+
+    return check
+
+
+def _compile_block(block: dict, required: bool) -> BlockCheck | None:
+    block_type = block.get("type")
+
+    if block_type in TEXT_BLOCK_TYPES:
+        return _check_text
+    if block_type == "email":
+        return _pattern_check(EMAIL_PATTERN, "Enter a valid email.")
+    if block_type == "number":
+        return _check_number
+    if block_type == "url":
+        return _check_url
+    if block_type == "phone":
+        return _pattern_check(PHONE_PATTERN, "Enter a valid phone number.")
+    if block_type == "date":
+        return _pattern_check(DATE_PATTERN, "Enter a valid date.")
+    if block_type == "time":
+        return _pattern_check(TIME_PATTERN, "Enter a valid time.")
+    if block_type in {"multiple-choice", "dropdown"}:
+        return _choice_check(block)
+    if block_type == "checkboxes":
+        return _checkboxes_check(block)
+    if block_type == "linear-scale":
+        scale_min = block.get("scaleMin")
+        scale_max = block.get("scaleMax")
+        return _range_check(
+            1 if scale_min is None else scale_min,
+            5 if scale_max is None else scale_max,
+            "Select a valid value.",
+        )
+    if block_type == "rating":
+        rating_max = block.get("ratingMax")
+        return _range_check(
+            1, 5 if rating_max is None else rating_max, "Select a valid rating."
+        )
+    if block_type == "matrix":
+        return _matrix_check(block, required)
+    if block_type == "ranking":
+        return _ranking_check(block)
+    if block_type == "file-upload":
+        return _file_upload_check(block)
+    if block_type == "signature":
+        return _check_signature
+    # PAYMENT AND WALLET-CONNECT DISABLED - no checks are compiled for them,
+    # see the commented-out history of this module for the old rules.
+    if block_type == "respondent-country":
+        return _check_country
+    if block_type == "recaptcha":
+        return _check_recaptcha
+    if block_type == "hidden-field":
+        return _check_hidden_field
+    return None
+
+
+class CompiledValidator:
+    """Pre-built per-block checks for one version of a form's blocks."""
+
+    __slots__ = ("checks", "requires_recaptcha", "file_block_ids")
+
+    def __init__(self, blocks: list[dict]) -> None:
+        self.checks: list[tuple[Any, bool, BlockCheck | None]] = []
+        self.requires_recaptcha = False
+        self.file_block_ids: list[str] = []
+        for block in blocks:
+            block_type = block.get("type")
+            if block_type == "recaptcha":
+                self.requires_recaptcha = True
+            if block_type == "file-upload":
+                self.file_block_ids.append(block.get("id"))
+            if block_type in {"payment", "wallet-connect"}:
+                # PAYMENT AND WALLET-CONNECT DISABLED - Skipping validation
                 continue
-            file_name = value.get("name")
-            file_type = value.get("type")
-            file_data = value.get("data")
-            file_size = value.get("size")
-            if not file_name or not file_type or not file_data or not isinstance(file_data, str):
-                errors.append({"block_id": block_id, "message": "Upload a valid file."})
+            required = bool(block.get("required"))
+            self.checks.append(
+                (block.get("id"), required, _compile_block(block, required))
+            )
+
+    def errors(self, data: dict) -> list[dict]:
+        errors: list[dict] = []
+        for block_id, required, check in self.checks:
+            value = data.get(block_id)
+            if _is_empty(value):
+                if required:
+                    errors.append(
+                        {"block_id": block_id, "message": "This field is required."}
+                    )
                 continue
-            max_bytes = 1 * 1024 * 1024
-            if isinstance(file_size, (int, float)) and file_size > max_bytes:
-                errors.append({"block_id": block_id, "message": "File exceeds size limit."})
+            if check is None:
                 continue
-            allowed = block.get("fileAllowedTypes") or []
-            if not _matches_allowed_type(file_type, allowed, file_name):
-                errors.append({"block_id": block_id, "message": "File type not allowed."})
-        elif block_type == "signature":
-            if not isinstance(value, str) or not value.startswith("data:image/"):
-                errors.append({"block_id": block_id, "message": "Add a signature."})
-        # elif block_type == "payment":
-        #     # PAYMENT DISABLED - Validation commented out
-        #     if not isinstance(value, dict):
-        #         errors.append({"block_id": block_id, "message": "Payment is required."})
-        #         continue
-        #     status = value.get("status")
-        #     if status not in {"pending", "paid"}:
-        #         errors.append({"block_id": block_id, "message": "Payment is required."})
-        # elif block_type == "wallet-connect":
-        #     # WALLET-CONNECT DISABLED - Validation commented out
-        #     if not isinstance(value, dict) or not value.get("address"):
-        #         errors.append({"block_id": block_id, "message": "Connect a wallet."})
-        elif block_type == "respondent-country":
-            if not isinstance(value, str):
-                errors.append({"block_id": block_id, "message": "Country is required."})
-        elif block_type == "recaptcha":
-            if value != "verified":
-                errors.append({"block_id": block_id, "message": "Verify reCAPTCHA."})
-        elif block_type == "hidden-field":
-            if not isinstance(value, str):
-                errors.append({"block_id": block_id, "message": "Hidden field is invalid."})
-
-    if errors:
-        raise HTTPException(status_code=422, detail={"errors": errors})
+            message = check(value)
+            if message:
+                errors.append({"block_id": block_id, "message": message})
+        return errors
+
+    def validate(self, data: dict) -> None:
+        started = time.perf_counter()
+        errors = self.errors(data)
+        submission_validation_seconds.observe(time.perf_counter() - started)
+        if errors:
+            raise HTTPException(status_code=422, detail={"errors": errors})
+
+
+_validator_cache: "OrderedDict[int, tuple[datetime | None, CompiledValidator]]" = (
+    OrderedDict()
+)
+_validator_cache_lock = threading.Lock()
+
+
+def get_form_validator(form: Form) -> CompiledValidator:
+    """Return the compiled validator for a form, compiling on first use.
+
+    Entries are keyed by form id and reused while ``updated_at`` matches, so
+    an edited form recompiles on its next submission. Least recently used
+    forms are evicted beyond ``VALIDATOR_CACHE_SIZE``.
+    """
+    with _validator_cache_lock:
+        cached = _validator_cache.get(form.id)
+        if cached and cached[0] == form.updated_at:
+            _validator_cache.move_to_end(form.id)
+            return cached[1]
+
+    validator = CompiledValidator(form.blocks or [])
+    with _validator_cache_lock:
+        _validator_cache[form.id] = (form.updated_at, validator)
+        _validator_cache.move_to_end(form.id)
+        while len(_validator_cache) > VALIDATOR_CACHE_SIZE:
+            _validator_cache.popitem(last=False)
+    return validator
+
+
+def clear_validator_cache() -> None:
+    with _validator_cache_lock:
+        _validator_cache.clear()
+
+
+def discard_validator(form_id: int) -> None:
+    with _validator_cache_lock:
+        _validator_cache.pop(form_id, None)
+
+
+def _on_form_changed(event: dict) -> None:
+    discard_validator(event["form_id"])
+
+
+invalidation.subscribe(
+    invalidation.FORM_CHANGED, _on_form_changed, reset=clear_validator_cache
+)
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+UPLOADS_DIR = "uploads"
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 1024
+
+ALLOWED_IMAGE_TYPES_LABEL = "PNG, JPG, GIF, SVG"
+
+
+def sniff_image_extension(head: bytes) -> str | None:
+    """Identify an image from its leading bytes rather than the client's content type."""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<?xml", b"<svg", b"<!--", b"<!doctype svg")) and b"<svg" in text:
+        return ".svg"
+    return None
+
+
+def _open_temp_file() -> tuple[int, str]:
+    os.makedirs(UPLOADS_DIR, exist_ok=True)
+    return tempfile.mkstemp(dir=UPLOADS_DIR, prefix=".upload-")
+
+
+def _finalize(temp_path: str, filename: str) -> None:
+    final_path = os.path.join(UPLOADS_DIR, filename)
+    if os.path.exists(final_path):
+        # Identical content is already stored under this hash.
+        os.remove(temp_path)
+        return
+    os.chmod(temp_path, 0o644)
+    os.replace(temp_path, final_path)
+
+
+def _discard(temp_path: str) -> None:
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+
+async def save_image_upload(file: UploadFile, max_bytes: int) -> str:
+    """Stream an uploaded image to disk and return its public URL.
+
+    The file is copied in chunks with disk writes off the event loop, the
+    size limit is enforced as bytes arrive, and the stored name is the
+    SHA-256 of the content so re-uploads of the same image are deduplicated.
+    """
+    max_mb = max_bytes // (1024 * 1024)
+    too_large = HTTPException(
+        status_code=413, detail=f"File size exceeds maximum of {max_mb}MB"
+    )
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    fd, temp_path = await run_in_threadpool(_open_temp_file)
+    handle = os.fdopen(fd, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    extension: str | None = None
+    try:
+        while chunk := await file.read(CHUNK_SIZE):
+            if extension is None:
+                extension = sniff_image_extension(chunk[:SNIFF_BYTES])
+                if extension is None:
+                    raise HTTPException(
+                        status_code=415,
+                        detail=f"File type not allowed. Allowed types: {ALLOWED_IMAGE_TYPES_LABEL}",
+                    )
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large
+            digest.update(chunk)
+            await run_in_threadpool(handle.write, chunk)
+        await run_in_threadpool(handle.close)
+        if extension is None:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty")
+
+        filename = f"{digest.hexdigest()}{extension}"
+        await run_in_threadpool(_finalize, temp_path, filename)
+    except BaseException:
+        handle.close()
+        await run_in_threadpool(_discard, temp_path)
+        raise
+
+    return f"/uploads/{filename}"
@@ -0,0 +1,367 @@
+"""Benchmark the API hot paths against a throwaway database.
+
+Seeds users, forms and submissions into a temporary SQLite file (or the
+database in --database-url), drives the app in-process through httpx's
+ASGI transport and prints JSON results. Save a run with --output and pass
+it to --compare on a later commit to see relative changes.
+
+    python scripts/bench_api.py --requests 500 --concurrency 16 --output base.json
+    python scripts/bench_api.py --compare base.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# One block per answer type, with a valid answer, for realistic mixes.
+BLOCK_SAMPLES: list[tuple[dict, object]] = [
+    ({"type": "short-answer", "content": "Name", "required": True}, "Ada Lovelace"),
+    ({"type": "long-answer", "content": "Feedback"}, "Loved it. " * 20),
+    ({"type": "email", "content": "Email", "required": True}, "ada@example.com"),
+    ({"type": "number", "content": "Age"}, 36),
+    ({"type": "url", "content": "Website"}, "https://example.com/ada"),
+    ({"type": "phone", "content": "Phone"}, "+44 20 7946 0958"),
+    ({"type": "date", "content": "Date"}, "2024-05-01"),
+    ({"type": "time", "content": "Time"}, "09:30"),
+    (
+        {"type": "multiple-choice", "content": "Plan", "options": ["Free", "Pro", "Team"]},
+        "Pro",
+    ),
+    (
+        {"type": "dropdown", "content": "Country", "options": ["UK", "US", "DE", "FR"]},
+        "UK",
+    ),
+    (
+        {"type": "checkboxes", "content": "Topics", "options": ["API", "UI", "Docs", "Billing"]},
+        ["API", "Docs"],
+    ),
+    ({"type": "rating", "content": "Rating", "ratingMax": 5}, 4),
+    ({"type": "linear-scale", "content": "NPS", "scaleMin": 0, "scaleMax": 10}, 9),
+    (
+        {
+            "type": "matrix",
+            "content": "Satisfaction",
+            "rows": ["Speed", "Design", "Support"],
+            "columns": ["Bad", "OK", "Good"],
+        },
+        {"Speed": "Good", "Design": "OK", "Support": "Good"},
+    ),
+    (
+        {"type": "ranking", "content": "Priorities", "options": ["Price", "Speed", "Quality"]},
+        ["Quality", "Speed", "Price"],
+    ),
+]
+
+
+def realistic_form() -> tuple[list[dict], dict]:
+    blocks: list[dict] = [{"id": "title", "type": "title", "content": "Customer survey"}]
+    answers: dict = {}
+    for index, (block, value) in enumerate(BLOCK_SAMPLES):
+        block_id = f"b{index}"
+        blocks.append({**block, "id": block_id})
+        answers[block_id] = value
+    return blocks, answers
+
+
+def summarize(durations: list[float], wall: float) -> dict:
+    ordered = sorted(durations)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p * len(ordered)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / wall, 1) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+async def drive(requests: int, concurrency: int, call) -> dict:
+    """Run ``call(i)`` ``requests`` times across ``concurrency`` workers."""
+    durations: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            ok = await call(index)
+            durations.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**summarize(durations, time.perf_counter() - started), "errors": errors}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    sys.path.insert(0, str(BACKEND_DIR))
+    import httpx
+    from sqlalchemy import insert
+
+    from app.db import SessionLocal, engine
+    from app.main import app
+    from app.models import Form, User
+    from app.services import auth_service, submission_service
+    from app.services.submission_validation import CompiledValidator
+
+    await app.router.startup()
+    blocks, answers = realistic_form()
+
+    async def seed_user(name: str) -> tuple[int, str]:
+        async with SessionLocal() as db:
+            user = User(username=name, hashed_password="!bench")
+            db.add(user)
+            await db.commit()
+            return user.id, auth_service.create_user_token(user)
+
+    async def seed_forms(user_id: int, count: int, prefix: str) -> list[tuple[int, str]]:
+        rows = [
+            {
+                "user_id": user_id,
+                "title": f"{prefix} {i}",
+                "blocks": blocks,
+                "share_id": f"{prefix}-{i}",
+            }
+            for i in range(count)
+        ]
+        async with SessionLocal() as db:
+            result = await db.execute(
+                insert(Form).returning(Form.id, Form.share_id), rows
+            )
+            forms = [tuple(row) for row in result]
+            await db.commit()
+        return forms
+
+    async def seed_submissions(form_id: int, count: int) -> None:
+        for start in range(0, count, 1000):
+            async with SessionLocal() as db:
+                await submission_service.insert_submissions(
+                    db,
+                    [
+                        {"form_id": form_id, "data": answers}
+                        for _ in range(min(1000, count - start))
+                    ],
+                )
+                await db.commit()
+
+    results: dict = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        user_id, token = await seed_user("bench-owner")
+        auth = {"Authorization": f"Bearer {token}"}
+        [(form_id, share_id)] = await seed_forms(user_id, 1, "hot")
+        await seed_submissions(form_id, args.submissions)
+
+        if "public_form" in args.scenarios:
+            async def get_form(_: int) -> bool:
+                response = await client.get(f"/s/{share_id}")
+                return response.status_code == 200
+
+            results["public_form_get"] = await drive(args.requests, args.concurrency, get_form)
+
+        if "submit" in args.scenarios:
+            async def submit(_: int) -> bool:
+                response = await client.post(
+                    f"/s/{share_id}/submissions", json={"data": answers}
+                )
+                return response.status_code in (200, 202)
+
+            results["public_submit"] = await drive(args.requests, args.concurrency, submit)
+
+        if "list_forms" in args.scenarios:
+            series = {}
+            for count in args.form_counts:
+                owner_id, owner_token = await seed_user(f"bench-forms-{count}")
+                await seed_forms(owner_id, count, f"list{count}")
+                headers = {"Authorization": f"Bearer {owner_token}"}
+
+                async def list_forms(_: int, headers=headers) -> bool:
+                    response = await client.get("/forms", headers=headers)
+                    return response.status_code == 200
+
+                series[str(count)] = await drive(args.latency_requests, 1, list_forms)
+            results["get_forms_vs_form_count"] = series
+
+        if "list_submissions" in args.scenarios:
+            series = {}
+            for count in args.submission_counts:
+                [(sized_form_id, _)] = await seed_forms(user_id, 1, f"subs{count}")
+                await seed_submissions(sized_form_id, count)
+
+                async def first_page(_: int, form_id=sized_form_id) -> bool:
+                    response = await client.get(
+                        f"/forms/{form_id}/submissions", headers=auth, params={"limit": 50}
+                    )
+                    return response.status_code == 200
+
+                async def filtered_page(_: int, form_id=sized_form_id) -> bool:
+                    response = await client.get(
+                        f"/forms/{form_id}/submissions",
+                        headers=auth,
+                        params={"limit": 50, "filter": "b11:gte:4"},
+                    )
+                    return response.status_code == 200
+
+                series[str(count)] = {
+                    "first_page": await drive(args.latency_requests, 1, first_page),
+                    "filtered_page": await drive(args.latency_requests, 1, filtered_page),
+                }
+            results["list_submissions_vs_submission_count"] = series
+
+    if "validate" in args.scenarios:
+        per_type = {}
+        for block, value in BLOCK_SAMPLES:
+            validator = CompiledValidator([{**block, "id": "q"}])
+            data = {"q": value}
+            iterations = 0
+            started = time.perf_counter()
+            deadline = started + args.micro_seconds
+            while time.perf_counter() < deadline:
+                for _ in range(1000):
+                    validator.validate(data)
+                iterations += 1000
+            per_type[block["type"]] = round(iterations / (time.perf_counter() - started))
+        full = CompiledValidator(blocks)
+        iterations = 0
+        started = time.perf_counter()
+        while time.perf_counter() < started + args.micro_seconds:
+            for _ in range(1000):
+                full.validate(answers)
+            iterations += 1000
+        per_type["realistic_form"] = round(iterations / (time.perf_counter() - started))
+        results["validate_ops_per_sec"] = per_type
+
+    await app.router.shutdown()
+    await engine.dispose()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict) -> dict[str, str]:
+    """Relative change per metric; for *_ms lower is better, else higher."""
+    now, before = flatten(current), flatten(baseline)
+    changes = {}
+    for name, value in now.items():
+        old = before.get(name)
+        if not old or name.endswith(("requests", "errors")):
+            continue
+        changes[name] = f"{(value - old) / old * 100:+.1f}%"
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="Use this database instead of a temp SQLite file")
+    parser.add_argument("--submissions", type=int, default=2000, help="Submissions seeded on the hot form")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per throughput scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-requests", type=int, default=50, help="Sequential requests per latency point")
+    parser.add_argument("--form-counts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--submission-counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--micro-seconds", type=float, default=0.5, help="Time per validator micro-benchmark")
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        default=["public_form", "submit", "list_forms", "list_submissions", "validate"],
+    )
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    args = parser.parse_args()
+    # Relative to where the script was started, not the temp directory the
+    # run happens in.
+    output_path = Path(args.output).resolve() if args.output else None
+    compare_path = Path(args.compare).resolve() if args.compare else None
+    original_cwd = Path.cwd()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app reads its configuration at import time, so the environment
+        # is fixed up before run() imports it. Limits and external calls are
+        # switched off so the numbers measure the app itself.
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        os.environ.setdefault("SUBMISSION_RATE_LIMIT_PER_IP", "0")
+        os.environ.setdefault("SUBMISSION_RATE_LIMIT_PER_FORM", "0")
+        os.environ.setdefault("RECAPTCHA_VERIFIER", "stub")
+        os.environ.setdefault("BLOB_STORE_DIR", str(Path(tmp) / "blobs"))
+        # Files the app writes relative to the working directory (uploads,
+        # the invalidation log) land in the temp directory too.
+        os.chdir(tmp)
+        started = time.perf_counter()
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            os.chdir(original_cwd)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "database": "custom" if args.database_url else "sqlite-temp",
+            "db_profile": os.getenv("DB_PROFILE", "default"),
+            "ingest_mode": os.getenv("SUBMISSION_INGEST_MODE", "sync"),
+            "seconds": round(time.perf_counter() - started, 1),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if compare_path:
+        baseline = json.loads(compare_path.read_text())
+        report["comparison"] = {
+            "baseline_commit": baseline.get("meta", {}).get("commit"),
+            "changes": compare(results, baseline.get("results", {})),
+        }
+    output = json.dumps(report, indent=2)
+    if output_path:
+        output_path.write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare concurrent submit + read throughput across DB_PROFILE settings.
+
+Each profile runs in a fresh interpreter against its own temporary SQLite
+file, because the engine is configured when ``app.db`` is imported.
+
+    python scripts/bench_db_profile.py --seconds 5 --writers 4 --readers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+async def run_workload(seconds: float, writers: int, readers: int) -> dict:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from sqlalchemy import select
+
+    from app.db import SessionLocal, engine, init_db
+    from app.models import Form, Submission
+    from app.services import submission_service
+
+    await init_db()
+    async with SessionLocal() as db:
+        form = Form(title="bench", blocks=[], share_id="bench")
+        db.add(form)
+        await db.commit()
+        form_id = form.id
+
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds
+
+    async def writer() -> None:
+        while loop.time() < deadline:
+            async with SessionLocal() as session:
+                try:
+                    await submission_service.insert_submissions(
+                        session, [{"form_id": form_id, "data": {"q": "answer"}}]
+                    )
+                    await session.commit()
+                    counts["writes"] += 1
+                except Exception:
+                    await session.rollback()
+                    counts["errors"] += 1
+
+    async def reader() -> None:
+        while loop.time() < deadline:
+            async with SessionLocal() as session:
+                try:
+                    await session.get(Form, form_id)
+                    await session.execute(
+                        select(Submission)
+                        .where(Submission.form_id == form_id)
+                        .order_by(Submission.created_at.desc(), Submission.id.desc())
+                        .limit(50)
+                    )
+                    counts["reads"] += 1
+                except Exception:
+                    counts["errors"] += 1
+
+    await asyncio.gather(
+        *(writer() for _ in range(writers)), *(reader() for _ in range(readers))
+    )
+    await engine.dispose()
+
+    return {
+        "writes_per_sec": round(counts["writes"] / seconds, 1),
+        "reads_per_sec": round(counts["reads"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--profiles", nargs="+", default=["default", "performance"])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(run_workload(args.seconds, args.writers, args.readers))
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for profile in args.profiles:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DB_PROFILE": profile,
+                "DATABASE_URL": f"sqlite:///{Path(tmp) / 'bench.db'}",
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    "--seconds",
+                    str(args.seconds),
+                    "--writers",
+                    str(args.writers),
+                    "--readers",
+                    str(args.readers),
+                ],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            results[profile] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.db import engine, init_db  # noqa: E402
+from app.services.submission_filters import answer_index_ddl  # noqa: E402
+
+
+async def main(block_ids: list[str], numeric: bool) -> None:
+    await init_db()
+    async with engine.begin() as connection:
+        for block_id in block_ids:
+            ddl = answer_index_ddl(connection.dialect.name, block_id, numeric=numeric)
+            await connection.execute(text(ddl))
+            print(ddl)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Create expression indexes for frequently filtered answer blocks."
+    )
+    parser.add_argument("block_ids", nargs="+")
+    parser.add_argument(
+        "--numeric",
+        action="store_true",
+        help="Index the numeric value (for gt/gte/lt/lte filters on rating, scale or number blocks)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.block_ids, args.numeric))
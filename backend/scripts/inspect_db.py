@@ -6,7 +6,10 @@ DB_PATH = Path(__file__).resolve().parents[1] / "app.db"
 
 
 def dump_table(cur: sqlite3.Cursor, table: str) -> None:
-    rows = cur.execute(f"SELECT * FROM {table} ORDER BY id DESC").fetchall()
+    columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    # Tables with a composite key (insight_rollups) have no id column.
+    order = "id" if "id" in columns else "rowid"
+    rows = cur.execute(f"SELECT * FROM {table} ORDER BY {order} DESC").fetchall()
     columns = [d[0] for d in cur.description]
     print(f"\n{table} ({len(rows)} rows)")
     for row in rows:
@@ -29,14 +32,24 @@ def main() -> None:
     conn = sqlite3.connect(str(DB_PATH))
     cur = conn.cursor()
 
-    tables = cur.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+    rows = cur.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY name"
     ).fetchall()
-    print("Tables:", [t[0] for t in tables])
-
-    for (name,) in tables:
-        if name.startswith("sqlite_"):
-            continue
+    # Full-text indexes (search_documents) are virtual tables backed by
+    # <name>_config, <name>_data, ... shadow tables; neither holds app rows.
+    virtual = [
+        name for name, sql in rows if (sql or "").upper().startswith("CREATE VIRTUAL TABLE")
+    ]
+    tables = [
+        name
+        for name, _ in rows
+        if not name.startswith("sqlite_")
+        and name not in virtual
+        and not any(name.startswith(f"{parent}_") for parent in virtual)
+    ]
+    print("Tables:", tables)
+
+    for name in tables:
         dump_table(cur, name)
 
     conn.close()
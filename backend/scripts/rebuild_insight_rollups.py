@@ -0,0 +1,30 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.db import SessionLocal, engine, init_db  # noqa: E402
+from app.models import Form  # noqa: E402
+from app.services import insights_service  # noqa: E402
+
+
+async def main(form_ids: list[int]) -> None:
+    await init_db()
+    async with SessionLocal() as db:
+        query = select(Form).order_by(Form.id)
+        if form_ids:
+            query = query.where(Form.id.in_(form_ids))
+        rebuilt = 0
+        for form in list(await db.scalars(query)):
+            await insights_service.rebuild_rollups(db, form)
+            await db.commit()
+            rebuilt += 1
+    await engine.dispose()
+    print(f"Rebuilt insights rollups for {rebuilt} form(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]]))
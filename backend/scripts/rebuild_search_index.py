@@ -0,0 +1,20 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db import SessionLocal, engine, init_db  # noqa: E402
+from app.services import search_service  # noqa: E402
+
+
+async def main() -> None:
+    await init_db()
+    async with SessionLocal() as db:
+        total = await search_service.rebuild_index(db)
+    await engine.dispose()
+    print(f"Indexed {total} search document(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,20 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db import SessionLocal, engine, init_db  # noqa: E402
+from app.services import form_service  # noqa: E402
+
+
+async def main() -> None:
+    await init_db()
+    async with SessionLocal() as db:
+        fixed = await form_service.reconcile_response_counts(db)
+    await engine.dispose()
+    print(f"Reconciled response_count on {fixed} form(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import os
+import tempfile
+
+import pytest
+
+# Settings are read when the app modules are imported, so point every
+# on-disk store at a throwaway directory first.
+_workdir = tempfile.mkdtemp(prefix="forms-tests-")
+os.chdir(_workdir)
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ["BLOB_STORE_DIR"] = os.path.join(_workdir, "blobs")
+os.environ["SUBMISSION_RATE_LIMIT_PER_IP"] = "0"
+os.environ["SUBMISSION_RATE_LIMIT_PER_FORM"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+BLOCKS = [
+    {"id": "name", "type": "short-answer", "content": "Name", "required": True},
+    {"id": "color", "type": "multiple-choice", "content": "Color", "options": ["red", "blue"]},
+    {"id": "score", "type": "rating", "content": "Score", "ratingMax": 5},
+]
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    response = client.post(
+        "/auth/login", data={"username": "test-user", "password": "test-user"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def form(client, auth_headers):
+    response = client.post(
+        "/forms", json={"title": "Survey", "blocks": BLOCKS}, headers=auth_headers
+    )
+    assert response.status_code in (200, 201), response.text
+    return response.json()
+
+
+def submit(client, form, **answers):
+    response = client.post(f"/s/{form['share_id']}/submissions", json={"data": answers})
+    assert response.status_code in (200, 201, 202), response.text
+    return response.json()
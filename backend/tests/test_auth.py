@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+
+from app.services import auth_service
+
+
+@pytest.fixture
+def account(client):
+    username = f"user-{uuid.uuid4().hex[:8]}"
+    response = client.post(
+        "/auth/register", json={"username": username, "password": "first-password"}
+    )
+    assert response.status_code == 201, response.text
+    return username, response.json()["access_token"]
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def login(client, username: str, password: str):
+    return client.post("/auth/login", data={"username": username, "password": password})
+
+
+def test_password_change_revokes_earlier_tokens(client, account):
+    username, old_token = account
+    second_session = login(client, username, "first-password").json()["access_token"]
+    assert client.get("/auth/me", headers=bearer(old_token)).status_code == 200
+
+    response = client.patch(
+        "/auth/me", json={"password": "second-password"}, headers=bearer(old_token)
+    )
+    assert response.status_code == 200, response.text
+    new_token = response.json()["access_token"]
+
+    assert client.get("/auth/me", headers=bearer(old_token)).status_code == 401
+    assert client.get("/auth/me", headers=bearer(second_session)).status_code == 401
+    assert client.get("/auth/me", headers=bearer(new_token)).status_code == 200
+    assert login(client, username, "first-password").status_code == 401
+    assert login(client, username, "second-password").status_code == 200
+
+
+def test_username_change_revokes_earlier_tokens(client, account):
+    _, old_token = account
+    renamed = f"renamed-{uuid.uuid4().hex[:8]}"
+    response = client.patch("/auth/me", json={"username": renamed}, headers=bearer(old_token))
+    assert response.status_code == 200, response.text
+    assert response.json()["username"] == renamed
+
+    assert client.get("/auth/me", headers=bearer(old_token)).status_code == 401
+    me = client.get("/auth/me", headers=bearer(response.json()["access_token"]))
+    assert me.json()["username"] == renamed
+
+
+def test_tokens_without_a_version_claim_count_as_version_zero(client, account):
+    username, token = account
+    user_id = client.get("/auth/me", headers=bearer(token)).json()["id"]
+    legacy = auth_service.create_access_token({"sub": username, "uid": user_id})
+    assert client.get("/auth/me", headers=bearer(legacy)).status_code == 200
+
+    client.patch("/auth/me", json={"password": "second-password"}, headers=bearer(token))
+    assert client.get("/auth/me", headers=bearer(legacy)).status_code == 401
+
+
+def test_garbage_token_is_401(client):
+    assert client.get("/auth/me", headers=bearer("not-a-jwt")).status_code == 401
@@ -0,0 +1,45 @@
+def test_stale_block_patch_returns_409(client, auth_headers, form):
+    url = f"/forms/{form['id']}/blocks"
+    version = form["version"]
+    rename = {"op": "update", "id": "name", "changes": {"content": "Full name"}}
+
+    first = client.patch(url, json={"version": version, "ops": [rename]}, headers=auth_headers)
+    assert first.status_code == 200, first.text
+    assert first.json()["version"] == version + 1
+
+    stale = client.patch(
+        url,
+        json={"version": version, "ops": [{"op": "delete", "id": "score"}]},
+        headers=auth_headers,
+    )
+    assert stale.status_code == 409
+
+    current = client.get(f"/forms/{form['id']}", headers=auth_headers).json()
+    assert current["version"] == version + 1
+    assert [block["id"] for block in current["blocks"]] == ["name", "color", "score"]
+
+
+def test_block_operations_apply_in_order(client, auth_headers, form):
+    ops = [
+        {"op": "insert", "block": {"id": "email", "type": "email", "content": "Email"}, "after": None},
+        {"op": "move", "id": "score", "after": "email"},
+        {"op": "delete", "id": "color"},
+    ]
+    response = client.patch(
+        f"/forms/{form['id']}/blocks",
+        json={"version": form["version"], "ops": ops},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200, response.text
+
+    current = client.get(f"/forms/{form['id']}", headers=auth_headers).json()
+    assert [block["id"] for block in current["blocks"]] == ["email", "score", "name"]
+
+
+def test_unknown_block_id_is_rejected(client, auth_headers, form):
+    response = client.patch(
+        f"/forms/{form['id']}/blocks",
+        json={"version": form["version"], "ops": [{"op": "delete", "id": "nope"}]},
+        headers=auth_headers,
+    )
+    assert response.status_code == 422
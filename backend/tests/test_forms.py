@@ -0,0 +1,25 @@
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def test_form_payload_returns_stored_images(client, auth_headers, form):
+    fresh = client.get(f"/forms/{form['id']}", headers=auth_headers).json()
+    assert (fresh["logo_url"], fresh["cover_url"], fresh["cover_height"]) == (None, None, 200)
+
+    logo = client.post(
+        f"/forms/{form['id']}/logo",
+        files={"file": ("logo.png", PNG, "image/png")},
+        headers=auth_headers,
+    )
+    assert logo.status_code == 200, logo.text
+    cover = client.post(
+        f"/forms/{form['id']}/cover",
+        files={"file": ("cover.png", PNG + b"\x01", "image/png")},
+        headers=auth_headers,
+    )
+    assert cover.status_code == 200, cover.text
+
+    owned = client.get(f"/forms/{form['id']}", headers=auth_headers).json()
+    public = client.get(f"/s/{form['share_id']}").json()
+    for payload in (owned, public):
+        assert payload["logo_url"] == logo.json()["logo_url"]
+        assert payload["cover_url"] == cover.json()["cover_url"]
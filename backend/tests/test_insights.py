@@ -0,0 +1,214 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.db import SessionLocal
+from app.models import Form, InsightRollup
+from app.services import insights_service
+from conftest import submit
+
+ALL_TYPES_BLOCKS = [
+    {"id": "text", "type": "short-answer", "content": "Text"},
+    {"id": "choice", "type": "multiple-choice", "content": "Choice", "options": ["a", "b"]},
+    {"id": "pick", "type": "dropdown", "content": "Pick", "options": ["x", "y"]},
+    {"id": "many", "type": "checkboxes", "content": "Many", "options": ["p", "q", "r"]},
+    {"id": "stars", "type": "rating", "content": "Stars", "ratingMax": 5},
+    {"id": "scale", "type": "linear-scale", "content": "Scale", "scaleMin": 0, "scaleMax": 10},
+    {"id": "grid", "type": "matrix", "content": "Grid", "rows": ["r1", "r2"], "columns": ["c1", "c2"]},
+]
+
+
+def insights(client, auth_headers, form):
+    response = client.get(f"/forms/{form['id']}/insights", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def response_count(client, auth_headers, form):
+    forms = client.get("/forms", headers=auth_headers).json()
+    return next(item["response_count"] for item in forms if item["id"] == form["id"])
+
+
+def test_rollup_totals_match_response_count(client, auth_headers, form):
+    for color, score in [("red", 5), ("blue", 3), ("red", 4)]:
+        submit(client, form, name="x", color=color, score=score)
+
+    result = insights(client, auth_headers, form)
+    assert result["total_submissions"] == response_count(client, auth_headers, form) == 3
+    assert sum(result["daily_counts"].values()) == 3
+    color = next(block for block in result["blocks"] if block["block_id"] == "color")
+    assert color["counts"] == {"red": 2, "blue": 1}
+
+
+def test_missing_rollups_are_rebuilt_from_submissions(client, auth_headers, form):
+    for color in ["red", "blue"]:
+        submit(client, form, name="x", color=color)
+
+    async def drop_rollups():
+        async with SessionLocal() as db:
+            await db.execute(delete(InsightRollup).where(InsightRollup.form_id == form["id"]))
+            await db.commit()
+
+    client.portal.call(drop_rollups)
+    # A submission after the loss only rolls up itself.
+    submit(client, form, name="x", color="red")
+
+    result = insights(client, auth_headers, form)
+    assert result["total_submissions"] == 3
+    color = next(block for block in result["blocks"] if block["block_id"] == "color")
+    assert color["counts"] == {"red": 2, "blue": 1}
+
+
+def rollup_rows(client, form_id: int) -> dict:
+    async def load() -> dict:
+        async with SessionLocal() as db:
+            result = await db.execute(
+                select(InsightRollup.block_id, InsightRollup.bucket, InsightRollup.count).where(
+                    InsightRollup.form_id == form_id
+                )
+            )
+            return {(block_id, bucket): count for block_id, bucket, count in result}
+
+    return client.portal.call(load)
+
+
+def full_scan(client, form_id: int) -> dict:
+    async def aggregate() -> dict:
+        async with SessionLocal() as db:
+            form = await db.get(Form, form_id)
+            return dict(await insights_service._aggregate_submissions(db, form))
+
+    return client.portal.call(aggregate)
+
+
+def wait_for_rebuilds(client) -> None:
+    async def wait() -> None:
+        while insights_service._rebuild_tasks:
+            await asyncio.gather(*insights_service._rebuild_tasks)
+
+    client.portal.call(wait)
+
+
+@pytest.fixture
+def typed_form(client, auth_headers):
+    response = client.post(
+        "/forms", json={"title": "Types", "blocks": ALL_TYPES_BLOCKS}, headers=auth_headers
+    )
+    assert response.status_code in (200, 201), response.text
+    form = response.json()
+    answers = [
+        {"text": "hi", "choice": "a", "pick": "y", "many": ["p", "r"], "stars": 4, "scale": 7,
+         "grid": {"r1": "c1", "r2": "c2"}},
+        {"text": " ", "choice": "b", "many": ["p"], "stars": 4, "grid": {"r1": "c2"}},
+        {"choice": "a", "pick": "x", "many": [], "scale": 10},
+    ]
+    for data in answers:
+        submit(client, form, **data)
+    return form
+
+
+def test_incremental_rollups_match_a_full_scan_for_every_block_type(
+    client, auth_headers, typed_form
+):
+    rows = rollup_rows(client, typed_form["id"])
+    assert rows == full_scan(client, typed_form["id"])
+
+    result = insights(client, auth_headers, typed_form)
+    blocks = {block["block_id"]: block for block in result["blocks"]}
+    assert blocks["text"]["responses"] == 1
+    assert blocks["choice"]["counts"] == {"a": 2, "b": 1}
+    assert blocks["pick"]["counts"] == {"x": 1, "y": 1}
+    assert blocks["many"]["counts"] == {"p": 2, "q": 0, "r": 1}
+    assert blocks["many"]["responses"] == 2
+    assert blocks["stars"]["counts"] == {"4": 2}
+    assert blocks["stars"]["mean"] == 4
+    assert blocks["scale"]["counts"] == {"7": 1, "10": 1}
+    assert blocks["grid"]["matrix"] == {"r1": {"c1": 1, "c2": 1}, "r2": {"c1": 0, "c2": 1}}
+
+
+def test_consistent_rollups_are_served_without_a_rebuild(
+    client, auth_headers, typed_form, monkeypatch
+):
+    async def fail_rebuild(db, form):
+        raise AssertionError("rollups were rebuilt")
+
+    monkeypatch.setattr(insights_service, "rebuild_rollups", fail_rebuild)
+    assert insights(client, auth_headers, typed_form)["total_submissions"] == 3
+
+    async def load_with_stale_form():
+        async with SessionLocal() as db:
+            form = await db.get(Form, typed_form["id"])
+            # As if loaded before another submission committed.
+            form.response_count -= 1
+            return await insights_service.load_insights(db, form)
+
+    assert client.portal.call(load_with_stale_form).total_submissions == 3
+
+
+def test_count_drift_triggers_a_rebuild(client, auth_headers, typed_form, monkeypatch):
+    rebuilt = []
+    real_rebuild = insights_service.rebuild_rollups
+
+    async def spy_rebuild(db, form):
+        rebuilt.append(form.id)
+        return await real_rebuild(db, form)
+
+    monkeypatch.setattr(insights_service, "rebuild_rollups", spy_rebuild)
+
+    async def inflate_rollups():
+        async with SessionLocal() as db:
+            await db.execute(
+                update(InsightRollup)
+                .where(
+                    InsightRollup.form_id == typed_form["id"],
+                    InsightRollup.block_id == insights_service.SUBMISSIONS_KEY,
+                )
+                .values(count=InsightRollup.count + 5)
+            )
+            await db.commit()
+
+    client.portal.call(inflate_rollups)
+    assert insights(client, auth_headers, typed_form)["total_submissions"] == 3
+    assert rebuilt == [typed_form["id"]]
+    assert rollup_rows(client, typed_form["id"]) == full_scan(client, typed_form["id"])
+
+
+def test_removed_and_relabelled_blocks_do_not_rescan(
+    client, auth_headers, typed_form, monkeypatch
+):
+    scheduled = []
+    monkeypatch.setattr(insights_service, "schedule_rebuild", scheduled.append)
+    blocks = [block for block in ALL_TYPES_BLOCKS if block["id"] != "grid"]
+    blocks[1] = {**blocks[1], "content": "Renamed", "options": ["a", "b", "c"]}
+    # Same bucketing family: choice answers stay valid tallies.
+    blocks[2] = {**blocks[2], "type": "multiple-choice"}
+
+    response = client.patch(
+        f"/forms/{typed_form['id']}", json={"blocks": blocks}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    assert scheduled == []
+    rows = rollup_rows(client, typed_form["id"])
+    assert not any(block_id == "grid" for block_id, _ in rows)
+    assert rows[("choice", "a")] == 2
+    assert rows[("pick", "x")] == 1
+
+
+def test_retyped_block_is_rebuilt_in_the_background(client, auth_headers, typed_form):
+    patch = {
+        "version": 1,
+        "ops": [{"op": "update", "id": "text", "changes": {"type": "rating", "ratingMax": 5}}],
+    }
+    current = client.get(f"/forms/{typed_form['id']}", headers=auth_headers).json()
+    patch["version"] = current["version"]
+    response = client.patch(
+        f"/forms/{typed_form['id']}/blocks", json=patch, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    wait_for_rebuilds(client)
+    rows = rollup_rows(client, typed_form["id"])
+    assert ("text", "hi") not in rows
+    assert rows == full_scan(client, typed_form["id"])
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import metrics
+from app.main import require_metrics_token
+
+
+def check(authorization):
+    asyncio.run(require_metrics_token(authorization))
+
+
+def test_metrics_are_refused_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "")
+    with pytest.raises(HTTPException) as excinfo:
+        check("Bearer ")
+    assert excinfo.value.status_code == 403
+
+
+def test_metrics_require_the_configured_token(monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_TOKEN", "s3cret")
+    for authorization in (None, "Bearer wrong", "s3cret"):
+        with pytest.raises(HTTPException) as excinfo:
+            check(authorization)
+        assert excinfo.value.status_code == 401
+    check("Bearer s3cret")
+
+
+def test_counters_are_exported_with_counter_type():
+    lines = metrics.counter_lines("jobs_total", "Jobs done.", 3)
+    assert "# TYPE jobs_total counter" in lines
+    assert lines[-1] == "jobs_total 3"
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.password_hasher import PasswordHasherPool, hasher_pool
+
+
+def test_full_pool_rejects_with_429():
+    pool = PasswordHasherPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as excinfo:
+            await pool.run(lambda: None)
+        release.set()
+        await running
+        return excinfo.value
+
+    rejection = asyncio.run(scenario())
+    assert rejection.status_code == 429
+    assert rejection.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected"] == 1
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_finishes():
+    pool = PasswordHasherPool(workers=1, max_pending=4)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        held = pool.pending
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        return held
+
+    assert asyncio.run(scenario()) == 1
+    assert pool.pending == 0
+    assert pool.completed == 1
+
+
+def test_only_successful_jobs_count_as_completed():
+    pool = PasswordHasherPool(workers=2, max_pending=4)
+
+    def fail():
+        raise ValueError("bad hash")
+
+    async def scenario():
+        assert await pool.run(lambda: 42) == 42
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    stats = pool.stats()
+    assert (stats["completed"], stats["in_flight"], stats["queued"]) == (1, 0, 0)
+
+
+def test_login_is_refused_while_the_pool_is_saturated(client, monkeypatch):
+    monkeypatch.setattr(hasher_pool, "max_pending", 0)
+    response = client.post("/auth/login", data={"username": "test-user", "password": "test-user"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
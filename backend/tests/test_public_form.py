@@ -0,0 +1,51 @@
+from app.services import public_form_cache
+
+
+def test_public_form_revalidates_with_etag(client, auth_headers, form):
+    url = f"/s/{form['share_id']}"
+    first = client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    weak = client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+    assert weak.status_code == 304
+
+
+def test_edit_changes_the_etag(client, auth_headers, form):
+    url = f"/s/{form['share_id']}"
+    etag = client.get(url).headers["ETag"]
+
+    response = client.patch(
+        f"/forms/{form['id']}", json={"title": "Renamed"}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    fresh = client.get(url, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()["title"] == "Renamed"
+    assert fresh.headers["ETag"] != etag
+
+
+def test_cached_body_is_rendered_per_host(client, form):
+    url = f"/s/{form['share_id']}"
+    first = client.get(url)
+    other = client.get(url, headers={"Host": "forms.example.com"})
+    assert other.status_code == 200
+    assert other.json()["share_url"] != first.json()["share_url"]
+
+
+def test_unknown_share_id_is_404(client):
+    assert client.get("/s/does-not-exist").status_code == 404
+
+
+def test_etag_matching():
+    assert public_form_cache.etag_matches('"a", "b"', '"b"')
+    assert public_form_cache.etag_matches("*", '"b"')
+    assert not public_form_cache.etag_matches(None, '"b"')
+    assert not public_form_cache.etag_matches('"a"', '"b"')
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import rate_limit
+from app.services.rate_limit import MemoryRateLimitBackend
+from conftest import submit
+
+
+class CountingSession:
+    """Stands in for AsyncSession: no form matches, and lookups are counted."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self
+
+    def first(self):
+        return None
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limit, "_backend", MemoryRateLimitBackend())
+    rate_limit._clear_form_limits()
+    yield
+    rate_limit._clear_form_limits()
+
+
+def test_bucket_allows_a_minute_of_burst_then_waits():
+    backend = MemoryRateLimitBackend()
+
+    async def take_four():
+        return [await backend.take("k", 3) for _ in range(4)]
+
+    waits = asyncio.run(take_four())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 19 < waits[3] <= 20
+
+
+def test_bucket_store_is_bounded():
+    backend = MemoryRateLimitBackend(max_keys=2)
+
+    async def fill():
+        for key in ("a", "b", "c"):
+            await backend.take(key, 10)
+
+    asyncio.run(fill())
+    assert list(backend._buckets) == ["b", "c"]
+
+
+def test_unknown_share_id_is_cached_as_404(limiter):
+    db = CountingSession()
+
+    async def enforce():
+        await rate_limit.enforce_submission_limits(db, "missing", "1.2.3.4")
+
+    for _ in range(3):
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(enforce())
+        assert excinfo.value.status_code == 404
+    assert db.queries == 1
+
+    rate_limit.invalidate_form("missing")
+    with pytest.raises(HTTPException):
+        asyncio.run(enforce())
+    assert db.queries == 2
+
+
+def test_per_ip_limit_is_checked_before_the_database(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, "SUBMISSION_RATE_LIMIT_PER_IP", 1)
+    db = CountingSession()
+
+    async def enforce():
+        await rate_limit.enforce_submission_limits(db, "missing", "1.2.3.4")
+
+    with pytest.raises(HTTPException) as first:
+        asyncio.run(enforce())
+    assert first.value.status_code == 404
+    with pytest.raises(HTTPException) as second:
+        asyncio.run(enforce())
+    assert second.value.status_code == 429
+    assert int(second.value.headers["Retry-After"]) >= 1
+    assert db.queries == 1
+
+
+def test_form_limit_rejects_with_retry_after(client, auth_headers, form, limiter):
+    response = client.patch(
+        f"/forms/{form['id']}", json={"submission_rate_limit": 2}, headers=auth_headers
+    )
+    assert response.status_code == 200, response.text
+
+    submit(client, form, name="one")
+    submit(client, form, name="two")
+    rejected = client.post(f"/s/{form['share_id']}/submissions", json={"data": {"name": "three"}})
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+
+
+def test_forwarded_for_is_only_used_when_trusted(monkeypatch):
+    class FakeRequest:
+        headers = {"x-forwarded-for": "203.0.113.7, 10.0.0.1"}
+
+        class client:
+            host = "10.0.0.1"
+
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUST_FORWARDED", False)
+    assert rate_limit.client_ip(FakeRequest()) == "10.0.0.1"
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_TRUST_FORWARDED", True)
+    assert rate_limit.client_ip(FakeRequest()) == "203.0.113.7"
@@ -0,0 +1,141 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.cache import TTLCache
+from app.services import recaptcha
+from app.services.recaptcha import CircuitBreaker, RecaptchaVerifier, VerifierUnavailable
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedVerifier(RecaptchaVerifier):
+    """Fails while ``down`` is set, otherwise accepts tokens starting with "ok"."""
+
+    def __init__(self) -> None:
+        self.down = False
+        self.calls = 0
+
+    async def verify(self, token: str) -> bool:
+        self.calls += 1
+        if self.down:
+            raise VerifierUnavailable("down")
+        return token.startswith("ok")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    # Only the breaker's clock is faked; asyncio and TTLCache keep the real one.
+    monkeypatch.setattr(recaptcha, "time", SimpleNamespace(monotonic=fake))
+    return fake
+
+
+@pytest.fixture
+def verifier(monkeypatch, clock):
+    scripted = ScriptedVerifier()
+    monkeypatch.setattr(recaptcha, "_verifier", scripted)
+    monkeypatch.setattr(recaptcha, "breaker", CircuitBreaker(threshold=2, cooldown=30))
+    monkeypatch.setattr(recaptcha, "_rejected_tokens", TTLCache(maxsize=10, ttl=60))
+    return scripted
+
+
+def verify(token: str) -> bool:
+    return asyncio.run(recaptcha.verify_recaptcha(token))
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.short_circuited == 1
+    assert breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow(), "only one trial call is let through"
+
+
+def test_failed_trial_reopens_and_successful_trial_closes(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast_without_calling_the_verifier(verifier, clock):
+    verifier.down = True
+    for _ in range(2):
+        with pytest.raises(HTTPException) as excinfo:
+            verify("ok-token")
+        assert excinfo.value.status_code == 503
+    assert verifier.calls == 2
+
+    with pytest.raises(HTTPException) as excinfo:
+        verify("ok-token")
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["Retry-After"] == "30"
+    assert verifier.calls == 2
+    assert recaptcha.breaker.short_circuited == 1
+
+    verifier.down = False
+    clock.now += 30
+    assert verify("ok-token") is True
+    assert recaptcha.breaker.state == "closed"
+
+
+def test_configuration_errors_release_the_trial_slot(verifier, clock, monkeypatch):
+    recaptcha.breaker.record_failure()
+    recaptcha.breaker.record_failure()
+    clock.now += 30
+
+    async def misconfigured(token: str) -> bool:
+        raise HTTPException(status_code=500, detail="not configured")
+
+    monkeypatch.setattr(verifier, "verify", misconfigured)
+    with pytest.raises(HTTPException) as excinfo:
+        verify("ok-token")
+    assert excinfo.value.status_code == 500
+    assert not recaptcha.breaker.trial_in_flight
+    assert recaptcha.breaker.state == "half-open"
+
+
+def test_rejected_tokens_are_cached(verifier):
+    assert verify("bad-token") is False
+    assert verify("bad-token") is False
+    assert verifier.calls == 1
+    assert verify("ok-token") is True
+    assert verify("ok-token") is True
+    assert verifier.calls == 3
@@ -0,0 +1,89 @@
+import uuid
+
+from sqlalchemy import create_engine, text
+
+from app.db import SessionLocal, ensure_search_index, table_columns
+from app.services import search_service
+from conftest import submit
+
+
+def search(client, headers, query: str) -> list[dict]:
+    response = client.get("/search", params={"q": query}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def other_user_headers(client) -> dict:
+    response = client.post(
+        "/auth/register",
+        json={"username": f"user-{uuid.uuid4().hex[:8]}", "password": "other-password"},
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_match_query_keeps_only_word_tokens():
+    assert search_service.build_match_query('Ada "OR owner:u1', postgres=False) == (
+        '"ada"* "or"* "owner"* "u1"*'
+    )
+    assert search_service.build_match_query("Ada Love", postgres=True) == "ada:* & love:*"
+    assert search_service.build_match_query(" -*() ", postgres=False) is None
+
+
+def test_scope_match_query_filters_on_the_owner_column():
+    assert search_service.scope_match_query('"ada"*', 7) == (
+        'owner : u7 AND {title body} : ("ada"*)'
+    )
+
+
+def test_search_only_returns_the_callers_documents(client, auth_headers, form):
+    token = f"zebra{uuid.uuid4().hex[:8]}"
+    submission = submit(client, form, name=f"Ada {token}")
+
+    [hit] = search(client, auth_headers, token)
+    assert hit["kind"] == "submission"
+    assert hit["form_id"] == form["id"]
+    assert hit["submission_id"] == submission["id"]
+    assert token in hit["snippet"]
+
+    assert search(client, other_user_headers(client), token) == []
+
+
+def test_owner_tokens_in_the_query_do_not_widen_the_scope(client, auth_headers, form):
+    submit(client, form, name="owner u1 shared words")
+    headers = other_user_headers(client)
+    assert search(client, headers, "owner u1") == []
+    assert search(client, headers, "owner : u1") == []
+
+
+def test_old_search_table_without_owner_is_recreated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.connect() as connection:
+        connection.execute(
+            text(
+                "CREATE VIRTUAL TABLE search_documents USING fts5("
+                "kind UNINDEXED, form_id UNINDEXED, user_id UNINDEXED, title, body)"
+            )
+        )
+        connection.commit()
+
+        ensure_search_index(connection)
+
+        assert "owner" in table_columns(connection, "search_documents")
+    engine.dispose()
+
+
+def test_startup_backfills_an_empty_index(client, auth_headers, form):
+    token = f"yak{uuid.uuid4().hex[:8]}"
+    submit(client, form, name=token)
+
+    async def empty_then_backfill() -> None:
+        async with SessionLocal() as db:
+            await db.execute(text("DELETE FROM search_documents"))
+            await db.commit()
+            await search_service.ensure_index_populated(db)
+
+    client.portal.call(empty_then_backfill)
+
+    [hit] = search(client, auth_headers, token)
+    assert hit["form_id"] == form["id"]
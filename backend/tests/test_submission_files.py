@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.db import SessionLocal
+from app.models import Submission
+from app.services.blob_store import BlobNotFound, LocalBlobStore, parse_byte_range
+from conftest import submit
+
+CONTENT = b"0123456789"
+FILE_BLOCKS = [{"id": "upload", "type": "file-upload", "content": "Upload"}]
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("bytes=0-3", (0, 3)),
+        ("bytes=4-", (4, 9)),
+        ("bytes=-3", (7, 9)),
+        ("bytes=-50", (0, 9)),
+        ("bytes=8-50", (8, 9)),
+        ("bytes=-", None),
+        ("items=0-3", None),
+        ("bytes=0-1,4-5", None),
+    ],
+)
+def test_range_parsing(header, expected):
+    assert parse_byte_range(header, len(CONTENT)) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=5-2", "bytes=-0"])
+def test_unsatisfiable_ranges_are_416(header):
+    with pytest.raises(HTTPException) as excinfo:
+        parse_byte_range(header, len(CONTENT))
+    assert excinfo.value.status_code == 416
+    assert excinfo.value.headers["Content-Range"] == "bytes */10"
+
+
+def test_local_store_deduplicates_and_reads_ranges(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+
+    async def scenario():
+        blob_id = await store.put(CONTENT)
+        assert await store.put(CONTENT) == blob_id
+        assert await store.size(blob_id) == len(CONTENT)
+        chunks = [chunk async for chunk in store.iter_range(blob_id, 2, 5)]
+        with pytest.raises(BlobNotFound):
+            await store.size("0" * 64)
+        return b"".join(chunks)
+
+    assert asyncio.run(scenario()) == b"2345"
+
+
+@pytest.fixture
+def file_submission(client, auth_headers):
+    form = client.post(
+        "/forms", json={"title": "Files", "blocks": FILE_BLOCKS}, headers=auth_headers
+    ).json()
+    encoded = "data:text/plain;base64,MDEyMzQ1Njc4OQ=="
+    answer = {"name": "digits.txt", "type": "text/plain", "size": 10, "data": encoded}
+    submission = submit(client, form, upload=answer)
+    return form, submission
+
+
+def file_url(form, submission) -> str:
+    return f"/forms/{form['id']}/submissions/{submission['id']}/files/upload"
+
+
+def test_file_download_supports_ranges(client, auth_headers, file_submission):
+    form, submission = file_submission
+    assert "data" not in submission["data"]["upload"]
+    url = file_url(form, submission)
+
+    full = client.get(url, headers=auth_headers)
+    assert full.status_code == 200
+    assert full.content == CONTENT
+    assert full.headers["Accept-Ranges"] == "bytes"
+
+    partial = client.get(url, headers={**auth_headers, "Range": "bytes=-4"})
+    assert partial.status_code == 206
+    assert partial.content == b"6789"
+    assert partial.headers["Content-Range"] == "bytes 6-9/10"
+
+    beyond = client.get(url, headers={**auth_headers, "Range": "bytes=20-"})
+    assert beyond.status_code == 416
+
+
+def test_legacy_inline_file_with_bad_data_is_404(client, auth_headers, file_submission):
+    form, submission = file_submission
+
+    async def store_inline():
+        async with SessionLocal() as db:
+            await db.execute(
+                update(Submission)
+                .where(Submission.id == submission["id"])
+                .values(data={"upload": {"name": "old.txt", "data": "!!not base64!!"}})
+            )
+            await db.commit()
+
+    client.portal.call(store_inline)
+    response = client.get(file_url(form, submission), headers=auth_headers)
+    assert response.status_code == 404
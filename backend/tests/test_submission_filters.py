@@ -0,0 +1,124 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.services.submission_filters import (
+    AnswerFilter,
+    answer_index_ddl,
+    compile_filter,
+    parse_filter,
+)
+from conftest import BLOCKS, submit
+
+BLOCKS_BY_ID = {
+    **{block["id"]: block for block in BLOCKS},
+    "tags": {"id": "tags", "type": "checkboxes", "options": ["a", "b"]},
+    "upload": {"id": "upload", "type": "file-upload"},
+}
+DIALECTS = {"sqlite": sqlite.dialect(), "postgresql": postgresql.dialect()}
+
+
+def compiled_sql(dialect: str, raw: str) -> str:
+    condition = compile_filter(dialect, BLOCKS_BY_ID, parse_filter(raw))
+    return str(
+        condition.compile(
+            dialect=DIALECTS[dialect], compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_parse_filter_keeps_colons_in_the_value():
+    assert parse_filter("name:eq:a:b") == AnswerFilter(block_id="name", op="eq", value="a:b")
+    assert parse_filter("name:eq:") == AnswerFilter(block_id="name", op="eq", value="")
+
+
+@pytest.mark.parametrize("raw", ["name", "name:eq", ":eq:x", "name::x"])
+def test_parse_filter_rejects_malformed_input(raw):
+    with pytest.raises(HTTPException) as excinfo:
+        parse_filter(raw)
+    assert excinfo.value.status_code == 400
+
+
+def test_text_filters_compile_per_dialect():
+    assert compiled_sql("sqlite", "name:eq:Ada") == (
+        "json_extract(submissions.data, '$.\"name\"') = 'Ada'"
+    )
+    assert compiled_sql("postgresql", "name:eq:Ada") == "(submissions.data ->> 'name') = 'Ada'"
+
+
+def test_contains_escapes_like_wildcards():
+    sql = compiled_sql("sqlite", "name:contains:50%_off")
+    assert "LIKE lower('%50/%/_off%') ESCAPE '/'" in sql
+    # The postgres driver's pyformat paramstyle doubles literal percent signs.
+    assert "ILIKE '%%50/%%/_off%%' ESCAPE '/'" in compiled_sql(
+        "postgresql", "name:contains:50%_off"
+    )
+
+
+def test_numeric_filters_cast_per_dialect():
+    assert compiled_sql("sqlite", "score:gte:4") == (
+        "CAST(json_extract(submissions.data, '$.\"score\"') AS REAL) >= 4.0"
+    )
+    assert compiled_sql("postgresql", "score:lt:2.5") == (
+        "CAST((submissions.data ->> 'score') AS DOUBLE PRECISION) < 2.5"
+    )
+
+
+def test_multi_value_filters_compile_per_dialect():
+    assert "json_each(submissions.data, '$.\"tags\"')" in compiled_sql("sqlite", "tags:eq:a")
+    assert compiled_sql("sqlite", "tags:ne:a").startswith("NOT (EXISTS")
+    assert compiled_sql("postgresql", "tags:eq:a") == (
+        "(CAST(submissions.data AS JSONB) -> 'tags') @> jsonb_build_array('a')"
+    )
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "missing:eq:x",
+        "upload:eq:x",
+        "name:gt:x",
+        "score:contains:4",
+        "tags:contains:a",
+        "score:eq:high",
+    ],
+)
+def test_invalid_filters_are_rejected(raw):
+    with pytest.raises(HTTPException) as excinfo:
+        compile_filter("sqlite", BLOCKS_BY_ID, parse_filter(raw))
+    assert excinfo.value.status_code == 400
+
+
+def test_block_ids_that_cannot_be_inlined_are_rejected():
+    blocks = {"x'); --": {"id": "x'); --", "type": "short-answer"}}
+    with pytest.raises(HTTPException):
+        compile_filter("sqlite", blocks, AnswerFilter(block_id="x'); --", op="eq", value="v"))
+    with pytest.raises(ValueError):
+        answer_index_ddl("sqlite", "x'); --")
+
+
+def test_index_ddl_uses_the_filter_expression():
+    assert answer_index_ddl("postgresql", "score", numeric=True) == (
+        "CREATE INDEX IF NOT EXISTS ix_submissions_answer_num_score "
+        "ON submissions (form_id, (CAST((data ->> 'score') AS DOUBLE PRECISION)))"
+    )
+
+
+def test_filters_narrow_the_submission_list(client, auth_headers, form):
+    submit(client, form, name="Ada Lovelace", color="red", score=5)
+    submit(client, form, name="Alan Turing", color="blue", score=3)
+    submit(client, form, name="Grace Hopper", color="red", score=4)
+
+    def names(*filters):
+        response = client.get(
+            f"/forms/{form['id']}/submissions",
+            params={"filter": list(filters)},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200, response.text
+        return sorted(item["data"]["name"] for item in response.json()["items"])
+
+    assert names("color:eq:red") == ["Ada Lovelace", "Grace Hopper"]
+    assert names("score:gte:4", "name:contains:grace") == ["Grace Hopper"]
+    assert names("score:lt:4") == ["Alan Turing"]
+    assert names("name:ne:Ada Lovelace", "color:eq:red") == ["Grace Hopper"]
@@ -0,0 +1,65 @@
+import os
+
+import orjson
+
+
+def test_import_reports_rejected_rows_by_line(client, auth_headers, form):
+    lines = [
+        orjson.dumps({"data": {"name": "ok"}}),
+        b"{not json",
+        orjson.dumps({"data": {"color": "green"}}),
+        b"",
+        orjson.dumps({"answers": {}}),
+        orjson.dumps({"data": {"name": "also ok"}, "created_at": "2024-01-02T03:04:05Z"}),
+    ]
+    body = b"\n".join(lines)
+    url = f"/forms/{form['id']}/submissions/import"
+
+    dry = client.post(url, params={"dry_run": "true"}, content=body, headers=auth_headers)
+    assert dry.status_code == 200, dry.text
+    assert dry.json()["imported"] == 2
+    listed = client.get(f"/forms/{form['id']}/submissions", headers=auth_headers).json()
+    assert listed["items"] == []
+
+    response = client.post(url, content=body, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == 2
+    assert result["failed"] == 3
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+    assert {error["block_id"] for error in result["errors"][1]["errors"]} >= {"name"}
+
+    listed = client.get(f"/forms/{form['id']}/submissions", headers=auth_headers).json()
+    assert sorted(item["data"]["name"] for item in listed["items"]) == ["also ok", "ok"]
+
+
+FILE_BLOCKS = [{"id": "upload", "type": "file-upload", "content": "Upload"}]
+
+
+def test_dry_run_validates_file_answers_without_storing_them(client, auth_headers):
+    form = client.post(
+        "/forms", json={"title": "Files", "blocks": FILE_BLOCKS}, headers=auth_headers
+    ).json()
+    file_answer = {"name": "a.txt", "type": "text/plain", "size": 5}
+    body = b"\n".join(
+        [
+            orjson.dumps({"data": {"upload": {**file_answer, "data": "aGVsbG8="}}}),
+            orjson.dumps({"data": {"upload": {**file_answer, "data": "!!not base64!!"}}}),
+        ]
+    )
+    blobs = os.environ["BLOB_STORE_DIR"]
+    before = sum(len(files) for _, _, files in os.walk(blobs))
+
+    response = client.post(
+        f"/forms/{form['id']}/submissions/import",
+        params={"dry_run": "true"},
+        content=body,
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["imported"] == 1
+    assert [error["line"] for error in result["errors"]] == [2]
+    assert result["errors"][0]["errors"][0]["block_id"] == "upload"
+    assert sum(len(files) for _, _, files in os.walk(blobs)) == before
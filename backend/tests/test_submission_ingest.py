@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db import SessionLocal
+from app.models import Submission
+from app.schemas import SubmissionCreate
+from app.services import submission_ingest
+from app.services.submission_ingest import PendingSubmission, SubmissionIngestor
+
+MISSING_FORM_ID = 10**9
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    """Record the size of every insert_submissions call the writer makes."""
+    sizes: list[int] = []
+    real_insert = submission_ingest.insert_submissions
+
+    async def recording_insert(db, rows):
+        sizes.append(len(rows))
+        return await real_insert(db, rows)
+
+    monkeypatch.setattr(submission_ingest, "insert_submissions", recording_insert)
+    return sizes
+
+
+def stored_count(client, form_id: int) -> int:
+    async def count() -> int:
+        async with SessionLocal() as db:
+            return await db.scalar(
+                select(func.count()).select_from(Submission).where(Submission.form_id == form_id)
+            )
+
+    return client.portal.call(count)
+
+
+def run_ingestor(client, ingestor: SubmissionIngestor, rows: list[dict], wait: float = 0.0):
+    async def scenario() -> None:
+        ingestor.start()
+        for row in rows:
+            ingestor.submit(row["form_id"], row["data"])
+        await asyncio.sleep(wait)
+
+    client.portal.call(scenario)
+
+
+def stop(client, ingestor: SubmissionIngestor) -> None:
+    client.portal.call(ingestor.stop)
+
+
+def test_full_batch_is_flushed_without_waiting(client, form, batches, tmp_path):
+    ingestor = SubmissionIngestor(
+        max_batch_size=3, max_latency=30, dead_letter_path=str(tmp_path / "dead.ndjson")
+    )
+    rows = [{"form_id": form["id"], "data": {"name": f"n{i}"}} for i in range(3)]
+    run_ingestor(client, ingestor, rows, wait=0.2)
+    try:
+        assert batches == [3]
+        assert stored_count(client, form["id"]) == 3
+    finally:
+        stop(client, ingestor)
+
+
+def test_partial_batch_is_flushed_after_max_latency(client, form, batches, tmp_path):
+    ingestor = SubmissionIngestor(
+        max_batch_size=100, max_latency=0.05, dead_letter_path=str(tmp_path / "dead.ndjson")
+    )
+    rows = [{"form_id": form["id"], "data": {"name": f"n{i}"}} for i in range(2)]
+    run_ingestor(client, ingestor, rows, wait=0.3)
+    try:
+        assert batches == [2]
+        assert stored_count(client, form["id"]) == 2
+    finally:
+        stop(client, ingestor)
+
+
+def test_stop_flushes_what_is_queued(client, form, batches, tmp_path):
+    ingestor = SubmissionIngestor(
+        max_batch_size=100, max_latency=30, dead_letter_path=str(tmp_path / "dead.ndjson")
+    )
+    rows = [{"form_id": form["id"], "data": {"name": f"n{i}"}} for i in range(4)]
+    run_ingestor(client, ingestor, rows)
+    stop(client, ingestor)
+    assert batches == [4]
+    assert stored_count(client, form["id"]) == 4
+    assert not ingestor.running
+
+
+def test_failed_batch_is_retried_per_row_and_bad_rows_dead_lettered(
+    client, form, batches, tmp_path
+):
+    dead_letter = tmp_path / "dead.ndjson"
+    ingestor = SubmissionIngestor(dead_letter_path=str(dead_letter))
+    batch = [
+        PendingSubmission(form_id=form["id"], data={"name": "first"}),
+        PendingSubmission(form_id=MISSING_FORM_ID, data={"name": "orphan"}),
+        PendingSubmission(form_id=form["id"], data={"name": "last"}),
+    ]
+
+    client.portal.call(ingestor._flush, batch)
+
+    assert batches == [3, 1, 1, 1]
+    assert stored_count(client, form["id"]) == 2
+    assert ingestor.dead_lettered == 1
+    [line] = dead_letter.read_text().splitlines()
+    entry = json.loads(line)
+    assert entry["form_id"] == MISSING_FORM_ID
+    assert entry["provisional_id"] == batch[1].provisional_id
+    assert entry["data"] == {"name": "orphan"}
+    assert entry["created_at"] == batch[1].queued_at.isoformat()
+    assert entry["error"]
+
+
+def test_dead_letter_write_failure_is_logged_not_raised(client, tmp_path, caplog):
+    ingestor = SubmissionIngestor(dead_letter_path=str(tmp_path / "missing" / "dead.ndjson"))
+    item = PendingSubmission(form_id=1, data={"name": "kept in the log"})
+
+    client.portal.call(ingestor._dead_letter, item, RuntimeError("boom"))
+
+    assert ingestor.dead_lettered == 1
+    assert "kept in the log" in caplog.text
+
+
+def test_ingest_submission_queues_while_the_writer_runs(client, form, monkeypatch, tmp_path):
+    ingestor = SubmissionIngestor(max_latency=30, dead_letter_path=str(tmp_path / "dead.ndjson"))
+    monkeypatch.setattr(submission_ingest, "ingestor", ingestor)
+    payload = SubmissionCreate(data={"name": "queued"})
+
+    async def scenario():
+        ingestor.start()
+        async with SessionLocal() as db:
+            return await submission_ingest.ingest_submission(db, form["share_id"], payload)
+
+    result = client.portal.call(scenario)
+    try:
+        assert isinstance(result, PendingSubmission)
+        assert result.form_id == form["id"]
+        assert stored_count(client, form["id"]) == 0
+    finally:
+        stop(client, ingestor)
+    assert stored_count(client, form["id"]) == 1
+
+
+def test_ingest_submission_writes_synchronously_when_the_queue_is_full(
+    client, form, monkeypatch, tmp_path
+):
+    ingestor = SubmissionIngestor(queue_size=1, dead_letter_path=str(tmp_path / "dead.ndjson"))
+    monkeypatch.setattr(submission_ingest, "ingestor", ingestor)
+    # A writer that never drains the queue, so the single slot stays taken.
+    monkeypatch.setattr(ingestor, "_run", lambda: asyncio.Event().wait())
+    payload = SubmissionCreate(data={"name": "overflow"})
+
+    async def scenario():
+        ingestor.start()
+        ingestor.submit(form["id"], {"name": "queued"})
+        async with SessionLocal() as db:
+            result = await submission_ingest.ingest_submission(db, form["share_id"], payload)
+        ingestor._task.cancel()
+        return result
+
+    result = client.portal.call(scenario)
+    assert isinstance(result, Submission)
+    assert result.data == {"name": "overflow"}
+    assert stored_count(client, form["id"]) == 1
+
+
+def test_ingest_submission_writes_synchronously_without_a_writer(client, form, monkeypatch):
+    monkeypatch.setattr(submission_ingest, "ingestor", SubmissionIngestor())
+    payload = SubmissionCreate(data={"name": "direct"})
+
+    async def scenario():
+        async with SessionLocal() as db:
+            return await submission_ingest.ingest_submission(db, form["share_id"], payload)
+
+    assert isinstance(client.portal.call(scenario), Submission)
+    assert stored_count(client, form["id"]) == 1
@@ -0,0 +1,33 @@
+from conftest import submit
+
+
+def test_cursor_pagination_walks_every_submission_once(client, auth_headers, form):
+    created = [submit(client, form, name=f"n{i}")["id"] for i in range(7)]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(
+            f"/forms/{form['id']}/submissions", params=params, headers=auth_headers
+        )
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= 3
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(created, reverse=True)
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers, form):
+    response = client.get(
+        f"/forms/{form['id']}/submissions",
+        params={"cursor": "not-a-cursor"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Form
+from app.services import invalidation, submission_validation
+from app.services.submission_validation import get_form_validator
+
+BLOCKS = [{"id": "name", "type": "short-answer", "content": "Name", "required": True}]
+EDITED = datetime(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    submission_validation.clear_validator_cache()
+    yield
+    submission_validation.clear_validator_cache()
+
+
+def make_form(form_id: int, updated_at: datetime = EDITED, blocks=BLOCKS) -> Form:
+    return Form(id=form_id, blocks=blocks, updated_at=updated_at)
+
+
+def test_validator_is_reused_while_the_form_is_unchanged():
+    first = get_form_validator(make_form(1))
+    assert get_form_validator(make_form(1)) is first
+
+
+def test_edited_form_is_recompiled():
+    first = get_form_validator(make_form(1))
+    edited = make_form(1, EDITED + timedelta(seconds=1), blocks=[])
+    second = get_form_validator(edited)
+    assert second is not first
+    second.validate({})
+
+
+def test_form_changed_event_discards_the_validator():
+    first = get_form_validator(make_form(1))
+    invalidation.dispatch(invalidation.FORM_CHANGED, {"form_id": 1, "share_id": "s"})
+    assert get_form_validator(make_form(1)) is not first
+
+
+def test_cache_evicts_least_recently_used_forms(monkeypatch):
+    monkeypatch.setattr(submission_validation, "VALIDATOR_CACHE_SIZE", 2)
+    one = get_form_validator(make_form(1))
+    get_form_validator(make_form(2))
+    assert get_form_validator(make_form(1)) is one
+    get_form_validator(make_form(3))
+    assert list(submission_validation._validator_cache) == [1, 3]
+
+
+def test_invalid_answers_raise_422_with_block_errors():
+    validator = get_form_validator(make_form(1))
+    with pytest.raises(HTTPException) as excinfo:
+        validator.validate({})
+    assert excinfo.value.status_code == 422
+    assert [error["block_id"] for error in excinfo.value.detail["errors"]] == ["name"]
+    validator.validate({"name": "Ada"})
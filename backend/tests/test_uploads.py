@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from app.services.upload_service import UPLOADS_DIR, sniff_image_extension
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 16
+
+
+@pytest.mark.parametrize(
+    ("head", "extension"),
+    [
+        (PNG, ".png"),
+        (b"\xff\xd8\xff\xe0rest", ".jpg"),
+        (b"GIF89a...", ".gif"),
+        (b"\xef\xbb\xbf  <?xml version='1.0'?><svg xmlns='x'/>", ".svg"),
+        (b"<svg xmlns='http://www.w3.org/2000/svg'/>", ".svg"),
+        (b"<html><body>not an image</body></html>", None),
+        (b"<?xml version='1.0'?><note/>", None),
+        (b"MZ\x90\x00", None),
+    ],
+)
+def test_images_are_identified_by_their_bytes(head, extension):
+    assert sniff_image_extension(head) == extension
+
+
+def leftover_temp_files() -> list[str]:
+    if not os.path.isdir(UPLOADS_DIR):
+        return []
+    return [name for name in os.listdir(UPLOADS_DIR) if name.startswith(".upload-")]
+
+
+def upload_logo(client, auth_headers, form, content: bytes, content_type="image/png"):
+    return client.post(
+        f"/forms/{form['id']}/logo",
+        files={"file": ("logo.png", content, content_type)},
+        headers=auth_headers,
+    )
+
+
+def test_claimed_content_type_is_not_trusted(client, auth_headers, form):
+    response = upload_logo(client, auth_headers, form, b"<html>hi</html>")
+    assert response.status_code == 415
+    assert leftover_temp_files() == []
+
+
+def test_oversized_upload_is_rejected_and_cleaned_up(client, auth_headers, form):
+    response = upload_logo(client, auth_headers, form, PNG + b"\x00" * (1024 * 1024))
+    assert response.status_code == 413
+    assert leftover_temp_files() == []
+
+
+def test_empty_upload_is_rejected(client, auth_headers, form):
+    response = upload_logo(client, auth_headers, form, b"")
+    assert response.status_code == 400
+
+
+def test_identical_uploads_share_one_file(client, auth_headers, form):
+    first = upload_logo(client, auth_headers, form, PNG, "application/octet-stream")
+    second = upload_logo(client, auth_headers, form, PNG)
+    assert first.status_code == second.status_code == 200
+    url = first.json()["logo_url"]
+    assert url == second.json()["logo_url"]
+    assert url.endswith(".png")
+
+    served = client.get(url)
+    assert served.status_code == 200
+    assert served.content == PNG
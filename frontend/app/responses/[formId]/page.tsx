@@ -2,7 +2,14 @@
 
 import { useEffect, useState } from "react";
 import { useParams } from "next/navigation";
-import { getFormById, listFormSubmissions } from "@/lib/api";
+import {
+  downloadSubmissionFile,
+  exportSubmissions,
+  getFormById,
+  listFormSubmissionsPage,
+} from "@/lib/api";
+
+const PAGE_SIZE = 50;
 
 type SubmissionRow = {
   id: number;
@@ -15,12 +22,15 @@ type FileAnswer = {
   name?: string;
   type?: string;
   data?: string;
+  blob_id?: string;
 };
 
 export default function ResponsesPage() {
   const params = useParams<{ formId: string }>();
   const formId = Number(params?.formId);
   const [rows, setRows] = useState<SubmissionRow[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [questionMap, setQuestionMap] = useState<Record<string, string>>({});
   const [formTitle, setFormTitle] = useState<string>("");
   const [error, setError] = useState<string | null>(null);
@@ -30,9 +40,13 @@ export default function ResponsesPage() {
   useEffect(() => {
     if (!Number.isFinite(formId)) return;
     setIsLoading(true);
-    Promise.all([listFormSubmissions(formId), getFormById(formId)])
-      .then(([data, form]) => {
-        setRows(data);
+    Promise.all([
+      listFormSubmissionsPage(formId, null, PAGE_SIZE),
+      getFormById(formId),
+    ])
+      .then(([page, form]) => {
+        setRows(page.items);
+        setNextCursor(page.next_cursor);
         setFormTitle(form.title);
         const nextMap: Record<string, string> = {};
         form.blocks.forEach((block) => {
@@ -48,6 +62,20 @@ export default function ResponsesPage() {
       .finally(() => setIsLoading(false));
   }, [formId]);
 
+  const loadMore = () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    listFormSubmissionsPage(formId, nextCursor, PAGE_SIZE)
+      .then((page) => {
+        setRows((current) => [...current, ...page.items]);
+        setNextCursor(page.next_cursor);
+      })
+      .catch((err) => {
+        setError(err instanceof Error ? err.message : "Failed to load");
+      })
+      .finally(() => setIsLoadingMore(false));
+  };
+
   const formatValue = (value: unknown) => {
     if (typeof value === "string") return value;
     if (typeof value === "number" || typeof value === "boolean") {
@@ -61,16 +89,14 @@ export default function ResponsesPage() {
     if (!value || typeof value !== "object" || Array.isArray(value))
       return false;
     const record = value as FileAnswer;
-    return Boolean(record.name && record.data);
+    return Boolean(record.name && (record.data || record.blob_id));
   };
 
   const isSignature = (value: unknown): boolean => {
     return typeof value === "string" && value.startsWith("data:image/");
   };
 
-  const downloadDataUrl = async (dataUrl: string, filename: string) => {
-    const response = await fetch(dataUrl);
-    const blob = await response.blob();
+  const downloadBlob = (blob: Blob, filename: string) => {
     const url = URL.createObjectURL(blob);
     const link = document.createElement("a");
     link.href = url;
@@ -86,47 +112,20 @@ export default function ResponsesPage() {
     for (const [key, value] of entries) {
       if (!isFileAnswer(value)) continue;
       const safeName = value.name || `${key}.bin`;
-      await downloadDataUrl(value.data ?? "", safeName);
+      const blob = value.data
+        ? await (await fetch(value.data)).blob()
+        : await downloadSubmissionFile(row.form_id, row.id, key);
+      downloadBlob(blob, safeName);
     }
   };
 
-  const buildCsv = () => {
-    const headers = ["Response ID", "Created At", ...Object.keys(questionMap)];
-    const rowsCsv = rows.map((row) => {
-      const base = [row.id, row.created_at];
-      const values = Object.keys(questionMap).map((key) =>
-        JSON.stringify(formatValue(row.data[key])),
-      );
-      return [...base, ...values].join(",");
-    });
-    return [headers.join(","), ...rowsCsv].join("\n");
-  };
-
-  const downloadCsv = () => {
-    const csv = buildCsv();
-    const blob = new Blob([csv], { type: "text/csv;charset=utf-8;" });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement("a");
-    link.href = url;
-    link.download = `${formTitle || "form"}-responses.csv`;
-    document.body.appendChild(link);
-    link.click();
-    link.remove();
-    URL.revokeObjectURL(url);
-  };
-
-  const downloadJson = () => {
-    const blob = new Blob([JSON.stringify(rows, null, 2)], {
-      type: "application/json",
-    });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement("a");
-    link.href = url;
-    link.download = `${formTitle || "form"}-responses.json`;
-    document.body.appendChild(link);
-    link.click();
-    link.remove();
-    URL.revokeObjectURL(url);
+  const downloadExport = async (format: "csv" | "ndjson") => {
+    try {
+      const blob = await exportSubmissions(formId, format);
+      downloadBlob(blob, `${formTitle || "form"}-responses.${format}`);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Download failed");
+    }
   };
 
   return (
@@ -147,17 +146,17 @@ export default function ResponsesPage() {
         <div className="mt-4 flex flex-wrap gap-2">
           <button
             type="button"
-            onClick={downloadCsv}
+            onClick={() => downloadExport("csv")}
             className="px-3 py-1.5 rounded-md border border-border text-sm"
           >
             Download CSV
           </button>
           <button
             type="button"
-            onClick={downloadJson}
+            onClick={() => downloadExport("ndjson")}
             className="px-3 py-1.5 rounded-md border border-border text-sm"
           >
-            Download JSON
+            Download NDJSON
           </button>
         </div>
 
@@ -218,6 +217,16 @@ export default function ResponsesPage() {
                 </div>
               </div>
             ))}
+            {nextCursor ? (
+              <button
+                type="button"
+                onClick={loadMore}
+                disabled={isLoadingMore}
+                className="w-full px-3 py-2 rounded-md border border-border text-sm disabled:opacity-50"
+              >
+                {isLoadingMore ? "Loading..." : "Load more"}
+              </button>
+            ) : null}
           </div>
         )}
       </div>
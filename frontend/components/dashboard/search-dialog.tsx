@@ -1,6 +1,6 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import {
   Dialog,
@@ -8,8 +8,11 @@ import {
   DialogHeader,
   DialogTitle,
 } from "@/components/ui/dialog";
-import { Search, Plus, ArrowRight, Folder } from "lucide-react";
+import { Search, Plus, ArrowRight, Folder, FileText } from "lucide-react";
 import { PricingDialog } from "./pricing-dialog";
+import { searchForms } from "@/lib/api";
+
+type SearchHit = Awaited<ReturnType<typeof searchForms>>["items"][number];
 
 interface SearchDialogProps {
   open: boolean;
@@ -19,8 +22,31 @@ interface SearchDialogProps {
 export function SearchDialog({ open, onOpenChange }: SearchDialogProps) {
   const [query, setQuery] = useState("");
   const [pricingOpen, setPricingOpen] = useState(false);
+  const [hits, setHits] = useState<SearchHit[]>([]);
   const router = useRouter();
 
+  useEffect(() => {
+    const trimmed = query.trim();
+    if (!trimmed) {
+      setHits([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      searchForms(trimmed)
+        .then((results) => {
+          if (!cancelled) setHits(results.items);
+        })
+        .catch(() => {
+          if (!cancelled) setHits([]);
+        });
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
   const handleAction = (path: string) => {
     onOpenChange(false);
     router.push(path);
@@ -53,6 +79,41 @@ export function SearchDialog({ open, onOpenChange }: SearchDialogProps) {
         </div>
 
         <div className="p-4">
+          {hits.length > 0 && (
+            <div className="mb-4">
+              <div className="text-xs font-medium text-muted-foreground mb-2">
+                Results
+              </div>
+              <div className="space-y-1">
+                {hits.map((hit) => (
+                  <button
+                    key={`${hit.kind}-${hit.submission_id ?? hit.form_id}`}
+                    onClick={() =>
+                      handleAction(
+                        hit.kind === "submission"
+                          ? `/responses/${hit.form_id}`
+                          : `/dashboard/forms/${hit.form_id}`,
+                      )
+                    }
+                    className="w-full flex items-start gap-3 px-3 py-2 text-sm rounded-md hover:bg-accent transition-colors text-left"
+                  >
+                    <FileText className="h-4 w-4 mt-0.5 shrink-0" />
+                    <span className="min-w-0">
+                      <span className="block truncate">
+                        {hit.form_title || "Untitled"}
+                      </span>
+                      {hit.snippet && (
+                        <span className="block truncate text-xs text-muted-foreground">
+                          {hit.snippet}
+                        </span>
+                      )}
+                    </span>
+                  </button>
+                ))}
+              </div>
+            </div>
+          )}
+
           <div className="mb-4">
             <div className="text-xs font-medium text-muted-foreground mb-2">
               Actions
@@ -12,6 +12,7 @@ type FormResponse = {
   share_id: string;
   share_url: string | null;
   response_count: number;
+  version: number;
   created_at: string;
   updated_at: string;
 };
@@ -21,6 +22,17 @@ type FormUpdatePayload = {
   blocks?: FormBlock[];
 };
 
+export type BlockOperation =
+  | { op: "insert"; block: FormBlock; after?: string | null }
+  | { op: "move"; id: string; after?: string | null }
+  | { op: "update"; id: string; changes: Partial<FormBlock> }
+  | { op: "delete"; id: string };
+
+type FormBlocksPatchedResponse = {
+  version: number;
+  updated_at: string;
+};
+
 type SubmissionCreatePayload = {
   data: Record<string, unknown>;
   recaptchaToken?: string;
@@ -33,6 +45,35 @@ type SubmissionResponse = {
   created_at: string;
 };
 
+type SubmissionPageResponse = {
+  items: SubmissionResponse[];
+  next_cursor: string | null;
+};
+
+type SubmissionImportResponse = {
+  imported: number;
+  failed: number;
+  errors: {
+    line: number;
+    errors: { block_id: string | null; message: string }[];
+  }[];
+  errors_truncated: boolean;
+};
+
+type SearchHitResponse = {
+  kind: "form" | "submission";
+  form_id: number;
+  form_title: string;
+  submission_id: number | null;
+  snippet: string;
+  score: number;
+};
+
+type SearchResultsResponse = {
+  items: SearchHitResponse[];
+  next_offset: number | null;
+};
+
 type PaymentSessionPayload = {
   block_id: string;
 };
@@ -122,7 +163,10 @@ export async function updateUser(username?: string, password?: string) {
     headers: { "Content-Type": "application/json", ...authHeaders() },
     body: JSON.stringify({ username, password }),
   });
-  return handleJson<UserResponse>(res);
+  // The change revokes the current token; keep the session on the new one.
+  const data = await handleJson<UserResponse & TokenResponse>(res);
+  setAuthToken(data.access_token);
+  return data;
 }
 
 export async function createForm(payload: FormCreatePayload) {
@@ -163,11 +207,79 @@ export async function createPaymentSession(
   return handleJson<PaymentSessionResponse>(res);
 }
 
-export async function listFormSubmissions(formId: number) {
-  const res = await fetch(`${API_BASE}/forms/${formId}/submissions`, {
-    headers: { ...authHeaders() },
-  });
-  return handleJson<SubmissionResponse[]>(res);
+export type SubmissionFilters = {
+  filters?: string[];
+  since?: string;
+  until?: string;
+};
+
+export async function listFormSubmissionsPage(
+  formId: number,
+  cursor?: string | null,
+  limit = 100,
+  query: SubmissionFilters = {},
+) {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.set("cursor", cursor);
+  for (const filter of query.filters ?? []) params.append("filter", filter);
+  if (query.since) params.set("since", query.since);
+  if (query.until) params.set("until", query.until);
+  const res = await fetch(
+    `${API_BASE}/forms/${formId}/submissions?${params.toString()}`,
+    { headers: { ...authHeaders() } },
+  );
+  return handleJson<SubmissionPageResponse>(res);
+}
+
+// Streams every submission from the server, so downloads do not depend
+// on how many pages the caller has loaded.
+export async function exportSubmissions(
+  formId: number,
+  format: "csv" | "ndjson" = "csv",
+) {
+  const res = await fetch(
+    `${API_BASE}/forms/${formId}/submissions/export?format=${format}`,
+    { headers: { ...authHeaders() } },
+  );
+  if (!res.ok) {
+    if (res.status === 401) {
+      throw new Error("Unauthorized. Please sign in.");
+    }
+    throw new Error((await res.text()) || "Download failed");
+  }
+  return res.blob();
+}
+
+// `ndjson` holds one {"data": {...}, "created_at"?: "..."} object per line.
+export async function importSubmissions(
+  formId: number,
+  ndjson: Blob | string,
+  dryRun = false,
+) {
+  const res = await fetch(
+    `${API_BASE}/forms/${formId}/submissions/import?dry_run=${dryRun}`,
+    {
+      method: "POST",
+      headers: { "Content-Type": "application/x-ndjson", ...authHeaders() },
+      body: ndjson,
+    },
+  );
+  return handleJson<SubmissionImportResponse>(res);
+}
+
+export async function downloadSubmissionFile(
+  formId: number,
+  submissionId: number,
+  blockId: string,
+) {
+  const res = await fetch(
+    `${API_BASE}/forms/${formId}/submissions/${submissionId}/files/${encodeURIComponent(blockId)}`,
+    { headers: { ...authHeaders() } },
+  );
+  if (!res.ok) {
+    throw new Error((await res.text()) || "Download failed");
+  }
+  return res.blob();
 }
 
 export async function getFormById(formId: number) {
@@ -186,6 +298,33 @@ export async function updateForm(formId: number, payload: FormUpdatePayload) {
   return handleJson<FormResponse>(res);
 }
 
+// Sends only the changed blocks. Throws if the form has moved past
+// `version` (409); reload it and retry.
+export async function patchFormBlocks(
+  formId: number,
+  version: number,
+  ops: BlockOperation[],
+) {
+  const res = await fetch(`${API_BASE}/forms/${formId}/blocks`, {
+    method: "PATCH",
+    headers: { "Content-Type": "application/json", ...authHeaders() },
+    body: JSON.stringify({ version, ops }),
+  });
+  return handleJson<FormBlocksPatchedResponse>(res);
+}
+
+export async function searchForms(query: string, offset = 0, limit = 20) {
+  const params = new URLSearchParams({
+    q: query,
+    offset: String(offset),
+    limit: String(limit),
+  });
+  const res = await fetch(`${API_BASE}/search?${params.toString()}`, {
+    headers: { ...authHeaders() },
+  });
+  return handleJson<SearchResultsResponse>(res);
+}
+
 export async function listForms() {
   const res = await fetch(`${API_BASE}/forms`, {
     headers: { ...authHeaders() },